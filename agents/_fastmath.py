@@ -0,0 +1,238 @@
+"""
+交易数值计算模块
+
+使用 Numba 编译交易循环中的标量计算，避免解释器开销。
+函数声明了显式签名，在导入时即完成编译，避免首次调用的 JIT 延迟。
+"""
+
+import numpy as np
+from numba import njit
+
+# 信心水平编码
+CONFIDENCE_HIGH: int = 0  # 高
+CONFIDENCE_MEDIUM: int = 1  # 中
+CONFIDENCE_LOW: int = 2  # 低
+
+
+@njit("float64(float64, float64, int64)", cache=True, fastmath=True)
+def calc_position_size(balance: float, price: float, conf_code: int) -> float:
+    """
+    计算仓位大小
+
+    Args:
+        balance: 可用余额
+        price: 当前价格
+        conf_code: 信心水平编码
+
+    Returns:
+        仓位大小（保留6位小数）
+    """
+    # 根据信心水平确定仓位比例
+    if conf_code == CONFIDENCE_HIGH:
+        ratio = 0.3  # 高信心使用30%资金
+    elif conf_code == CONFIDENCE_MEDIUM:
+        ratio = 0.2  # 中等信心使用20%资金
+    else:
+        ratio = 0.1  # 低信心使用10%资金
+
+    if price <= 0.0:
+        return 0.0
+    return round(balance * ratio / price, 6)
+
+
+@njit("Tuple((float64, float64, float64, int64, int64, float64, float64))(int64, float64, float64, float64, int64, int64, float64, float64)",
+      cache=True, fastmath=True)
+def position_update(side: int, size: float, entry: float, curr: float,
+                    holding: int, idle: int, max_p: float, max_l: float):
+    """
+    更新持仓的未实现盈亏、持仓时间和最大浮盈浮亏
+
+    Args:
+        side: 持仓方向，1为多，-1为空，0为空仓
+        size: 持仓大小
+        entry: 入场价格
+        curr: 当前价格
+        holding: 持仓时间
+        idle: 空仓时间
+        max_p: 最大浮盈
+        max_l: 最大浮亏
+
+    Returns:
+        (size, entry, upnl, holding, idle, max_p, max_l)
+    """
+    if side == 0:
+        return 0.0, 0.0, 0.0, 0, idle + 1, max_p, max_l
+
+    if side == 1:  # 多头
+        upnl = (curr - entry) * size
+    else:  # 空头
+        upnl = (entry - curr) * size
+
+    # 更新最大浮盈和浮亏
+    if upnl > max_p:
+        max_p = upnl
+    elif upnl < max_l:
+        max_l = upnl
+    return size, entry, upnl, holding + 1, 0, max_p, max_l
+
+
+@njit("Tuple((boolean, float64, float64))(float64, float64, float64, float64)",
+      cache=True, fastmath=True)
+def position_open(price: float, size: float, balance: float, fee: float):
+    """
+    开仓资金计算
+
+    Args:
+        price: 当前价格
+        size: 开仓数量
+        balance: 账户余额
+        fee: 手续费率
+
+    Returns:
+        (是否成功, 开仓后余额, 成本)
+    """
+    if size <= 0.0000000001:
+        return False, balance, 0.0
+    amount = size * price  # 开仓金额
+    commission = amount * fee  # 手续费
+    # 检查余额
+    if balance < commission + amount:
+        return False, balance, 0.0
+    return True, balance - commission - amount, amount + commission
+
+
+@njit("UniTuple(float64, 2)(int64, float64, float64, float64, float64, float64)",
+      cache=True, fastmath=True)
+def position_close(side: int, size: float, entry: float, price: float,
+                   balance: float, fee: float):
+    """
+    平仓资金计算
+
+    Args:
+        side: 持仓方向
+        size: 持仓大小
+        entry: 入场价格
+        price: 当前价格
+        balance: 账户余额
+        fee: 手续费率
+
+    Returns:
+        (已实现盈亏, 平仓后余额)
+    """
+    amount = size * price  # 平仓金额
+    if side == 1:  # 多仓
+        realized_pnl = (price - entry) * size
+    else:  # 空仓
+        realized_pnl = (entry - price) * size
+
+    balance = balance + amount - amount * fee
+    if balance < 0:
+        balance = 0.0
+        realized_pnl = -balance
+    return realized_pnl, balance
+
+
+@njit("float64(int64, float64, float64, float64)", cache=True, fastmath=True)
+def position_commission(side: int, size: float, price: float, fee: float) -> float:
+    """
+    计算平仓手续费
+
+    Args:
+        side: 持仓方向
+        size: 持仓大小
+        price: 当前价格
+        fee: 手续费率
+
+    Returns:
+        手续费
+    """
+    if side == 0 or size == 0.0:
+        return 0.0
+    return size * price * fee
+
+
+
+@njit("float64(float64[:], float64[:], float64, int64[:], int8[:], float64[:], float64[:], float64)",
+      cache=True, fastmath=True)
+def apply_fills(sizes, entries, balance, symbol_ids, sides, quantities, prices, fee):
+    """
+    批量应用成交，原地更新各交易对的持仓数量和入场价格
+
+    Args:
+        sizes: 持仓数量数组（按交易对行号），正为多，负为空
+        entries: 入场价格数组（按交易对行号）
+        balance: 账户余额
+        symbol_ids: 每笔成交的交易对行号
+        sides: 每笔成交方向，1为买，-1为卖
+        quantities: 每笔成交数量
+        prices: 每笔成交价格
+        fee: 手续费率
+
+    Returns:
+        扣除手续费后的余额
+    """
+    for i in range(symbol_ids.shape[0]):
+        row = symbol_ids[i]
+        qty = quantities[i]
+        price = prices[i]
+        old_size = sizes[row]
+        new_size = old_size + sides[i] * qty
+        abs_new = abs(new_size)
+
+        # 按数量加权平均的入场价格；fastmath 下乘加被合并为 FMA 指令
+        blended = (abs(old_size) * entries[row] + qty * price) / max(abs_new, 1e-12)
+        # 持仓方向改变时入场价格取成交价，持仓为0时清零（条件选择，无分支）
+        flip = old_size * new_size <= 0.0
+        entry = price if flip else blended
+        entries[row] = entry if abs_new != 0.0 else 0.0
+        sizes[row] = new_size
+
+        balance -= price * qty * fee
+    return balance
+
+
+# 权益可能为0（收益率出现 inf/nan），不使用 fastmath
+@njit("UniTuple(float64, 4)(float64[::1], float64[::1])", cache=True)
+def backtest_metrics(equity, pnl):
+    """
+    一次遍历计算回测指标
+
+    Args:
+        equity: 每日权益
+        pnl: 每日盈亏
+
+    Returns:
+        (总收益率%, 最大回撤%, 夏普比率, 胜率%)，权益曲线为空时全部为0
+    """
+    n = equity.shape[0]
+    if n == 0:
+        return 0.0, 0.0, 0.0, 0.0
+    total_return = (equity[n - 1] / equity[0] - 1.0) * 100.0 if equity[0] > 0.0 else 0.0
+
+    # 最大回撤与收益率的均值/方差（Welford 递推）同一次遍历完成
+    max_drawdown = 0.0
+    peak = equity[0]
+    mean = 0.0
+    m2 = 0.0
+    for i in range(n):
+        value = equity[i]
+        if value > peak:
+            peak = value
+        if peak > 0.0:
+            drawdown = (peak - value) / peak * 100.0
+            if drawdown > max_drawdown:
+                max_drawdown = drawdown
+        if i > 0:
+            r = (value - equity[i - 1]) / equity[i - 1]
+            delta = r - mean
+            mean += delta / i
+            m2 += delta * (r - mean)
+    std = np.sqrt(m2 / (n - 1)) if n > 1 else 0.0
+    sharpe_ratio = mean / std * np.sqrt(252.0) if std > 0.0 else 0.0
+
+    wins = 0
+    for p in pnl:
+        if p > 0.0:
+            wins += 1
+    win_rate = wins / pnl.shape[0] * 100.0 if pnl.shape[0] > 0 else 0.0
+    return total_return, max_drawdown, sharpe_ratio, win_rate
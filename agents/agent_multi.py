@@ -7,23 +7,197 @@ from agents.client_interface import ClientInterface
 实现更复杂的交易策略和决策过程。
 """
 import datetime
-
-from typing import Dict, Any
+import logging
+import multiprocessing as mp
+import os
+import tempfile
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from typing import Dict, Any, List, Optional, Tuple, Union
+import numpy as np
+import torch
+from gymnasium import spaces
 from stable_baselines3 import PPO, A2C, SAC
-from stable_baselines3.common.vec_env import DummyVecEnv
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv, VecEnv, VecMonitor
 from envs.env_trading_transformer_v2 import EnvTradingTransformerV2
 from agents.agent_utils import (
     interpret_trend,
     interpret_position,
     interpret_execution,
     final_action,
+    action_display,
 )
 
-from feature.feature import Feature
+from agents._fastmath import calc_position_size, CONFIDENCE_MEDIUM
+from const.const import ActionCode
+from feature.feature import Feature, share_feature, attach_feature
 from utils import Logger
 
 logger = Logger.get_logger()
 
+# 交易记录时间格式
+_TIME_FMT = "%Y-%m-%d %H:%M:%S"
+
+# 各智能体对应的算法
+AGENT_ALGOS = {
+    "trend": A2C,
+    "position": PPO,
+    "execution": SAC,
+}
+
+
+def make_env(config: Dict[str, Any], feature: Union[Feature, Dict[str, Any]], env_type: str, rank: int = 0):
+    """
+    构造环境工厂函数，供向量化环境在子进程中创建环境
+
+    Args:
+        config: 配置字典
+        feature: 特征数据，或 share_feature 生成的共享特征句柄
+        env_type: 环境类型 trend/position/execution
+        rank: 环境序号
+
+    Returns:
+        创建环境的函数
+    """
+    symbol = config["symbol"]
+    env_config = {**config, "env_type": env_type}
+
+    def _init():
+        # 子进程中只挂载共享内存，避免每个环境复制一份特征数据
+        env_feature = attach_feature(feature) if isinstance(feature, dict) else feature
+        return EnvTradingTransformerV2(env_config, env_feature, uuid=f"{env_type}_{symbol}_{rank}")
+
+    return _init
+
+
+def make_vec_env(config: Dict[str, Any], feature: Union[Feature, Dict[str, Any]], env_type: str) -> VecEnv:
+    """
+    创建并行向量化环境
+
+    Args:
+        config: 配置字典，num_envs 为并行环境数量
+        feature: 特征数据，或 share_feature 生成的共享特征句柄
+        env_type: 环境类型 trend/position/execution
+
+    Returns:
+        向量化环境
+    """
+    num_envs = config.get("num_envs", 1)
+    env_fns = [make_env(config, feature, env_type, i) for i in range(num_envs)]
+    vec_env = SubprocVecEnv(env_fns) if num_envs > 1 else DummyVecEnv(env_fns)
+    # 汇总各子环境的回合统计
+    return VecMonitor(vec_env)
+
+
+class _DeterministicPolicy(torch.nn.Module):
+    """
+    策略网络的确定性推理封装，供 torch.jit.trace 追踪
+
+    只追踪网络前向，输出的是带批维的原始动作（SAC 为 [-1, 1] 区间的压缩动作），
+    反缩放/裁剪与去批维由 _postprocess_actions 在追踪图外完成
+    """
+
+    def __init__(self, policy):
+        super().__init__()
+        self.policy = policy
+
+    def forward(self, obs):
+        return self.policy._predict(obs, deterministic=True)
+
+
+def _postprocess_actions(policy, actions: np.ndarray, vectorized_env: bool) -> np.ndarray:
+    """
+    网络输出的动作后处理，与 BasePolicy.predict 一致
+
+    Args:
+        policy: 策略网络
+        actions: 网络输出的动作，第0维为批大小
+        vectorized_env: 观察数据是否带批维
+
+    Returns:
+        动作：Box 动作空间反缩放或裁剪到动作范围，单条观察去掉批维
+    """
+    action_space = policy.action_space
+    actions = actions.reshape((-1, *action_space.shape))
+    if isinstance(action_space, spaces.Box):
+        if policy.squash_output:
+            actions = policy.unscale_action(actions)
+        else:
+            actions = np.clip(actions, action_space.low, action_space.high)
+    if not vectorized_env:
+        actions = actions.squeeze(axis=0)
+    return actions
+
+
+def _cpu_sets(n: int) -> List[Optional[List[int]]]:
+    """
+    将可用CPU划分为n个互不相交的集合
+
+    Args:
+        n: 集合数量
+
+    Returns:
+        CPU集合列表，不支持绑核的平台返回None
+    """
+    if not hasattr(os, "sched_getaffinity"):
+        return [None] * n
+    cpus = sorted(os.sched_getaffinity(0))
+    if len(cpus) < n:
+        return [None] * n
+    size = len(cpus) // n
+    return [cpus[i * size:(i + 1) * size] for i in range(n)]
+
+
+def _release_shared(blocks: list):
+    """释放共享特征占用的共享内存"""
+    for shm in blocks:
+        shm.close()
+        shm.unlink()
+
+
+def _train_one(env_type: str, model_path: str, config: Dict[str, Any], feature: Dict[str, Any],
+               total_timesteps: int, cpus: Optional[List[int]] = None):
+    """
+    在子进程中训练单个智能体
+
+    Args:
+        env_type: 智能体类型 trend/position/execution
+        model_path: 模型文件路径，训练前从此加载，训练后保存回此路径
+        config: 配置字典
+        feature: 共享特征句柄
+        total_timesteps: 总训练步数
+        cpus: 绑定的CPU集合
+    """
+    # 绑核，避免多个进程的PyTorch线程互相争抢
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+        torch.set_num_threads(len(cpus))
+
+    symbol = config["symbol"]
+    env = make_vec_env(config, feature, env_type)
+
+    agent = AGENT_ALGOS[env_type].load(model_path, env=env)
+    agent.learn(total_timesteps=total_timesteps, tb_log_name=f"{env_type}_{symbol}")
+    agent.save(model_path)
+
+
+def _stack_observations(batch: List[Any]) -> Any:
+    """
+    把多条观察数据沿新的第0维拼接，字典按键递归拼接
+
+    Args:
+        batch: 观察数据列表
+
+    Returns:
+        拼接后的观察数据
+    """
+    first = batch[0]
+    if isinstance(first, dict):
+        return {key: _stack_observations([item[key] for item in batch]) for key in first}
+    return np.stack([np.asarray(item) for item in batch])
+
 
 class AgentMulti:
     """
@@ -46,89 +220,42 @@ class AgentMulti:
         self.feature: Feature = feature
         self.symbol: str = config["symbol"]
         self.uuid: str = uuid
-
-        # 创建环境
-        self.env_trend = self._create_env_trend(feature, self.symbol)
-        self.env_position = self._create_env_position(feature, self.symbol)
-        self.env_execution = self._create_env_execution(feature, self.symbol)
+        # 训练时的并行环境数量，rollout 总步数在各环境间均分
+        self.num_envs: int = config.get("num_envs", 1)
+        # 共享内存中的特征句柄，首次训练时才创建
+        self._feature_handle: Optional[Dict[str, Any]] = None
+        self._finalizer: Optional[weakref.finalize] = None
 
         # 创建智能体
         self.agent_trend = self._create_agent_trend(self.symbol)
         self.agent_position = self._create_agent_position(self.symbol)
         self.agent_execution = self._create_agent_execution(self.symbol)
+        self._cache_policies()
 
         # 交易状态
         self.trading_state = {}
 
-        logger.info(f"多智能体管理器初始化完成，管理交易对: {self.symbol}")
+        # 价格缓存: symbol -> (价格, 过期时间)，减少重复的 REST 请求
+        self._price_cache: Dict[str, Tuple[float, float]] = {}
+        self._price_cache_ttl: float = config.get("price_cache_ttl", 1.0)
 
-    def _create_env_trend(self, feature: Feature, symbol: str):
-        """
-        创建趋势预测环境
-
-        Args:
-            feature: 特征数据
-            symbol: 交易对名称
-
-        Returns:
-            趋势预测环境
-        """
-        # 复制配置并修改为趋势预测环境的配置
-        trend_config = self.config.copy()
-        trend_config["symbol"] = symbol
-        trend_config["env_type"] = "trend"
-
-        # 创建环境
-        env = EnvTradingTransformerV2(trend_config, feature, uuid=f"trend_{symbol}")
-        return env
-
-    def _create_env_position(
-        self, feature: Feature, symbol: str
-    ) -> EnvTradingTransformerV2:
-        """
-        创建仓位管理环境
-
-        Args:
-            feature: 特征数据
-            symbol: 交易对名称
-
-        Returns:
-            仓位管理环境
-        """
-        # 复制配置并修改为仓位管理环境的配置
-        position_config = self.config.copy()
-        position_config["symbol"] = symbol
-        position_config["env_type"] = "position"
+        # 时间字符串缓存，按秒更新
+        self._last_ts_sec: int = 0
+        self._last_ts_str: str = ""
 
-        # 创建环境
-        env = EnvTradingTransformerV2(
-            position_config, feature, uuid=f"position_{symbol}"
-        )
-        return env
+        logger.info(f"多智能体管理器初始化完成，管理交易对: {self.symbol}")
 
-    def _create_env_execution(
-        self, feature: Feature, symbol: str
-    ) -> EnvTradingTransformerV2:
+    def _model_env(self, env_type: str) -> VecEnv:
         """
-        创建执行策略环境
+        创建构造智能体用的单进程环境，只提供观察/动作空间；并行训练环境在训练子进程中创建
 
         Args:
-            feature: 特征数据
-            symbol: 交易对名称
+            env_type: 环境类型 trend/position/execution
 
         Returns:
-            执行策略环境
+            向量化环境
         """
-        # 复制配置并修改为执行策略环境的配置
-        execution_config = self.config.copy()
-        execution_config["symbol"] = symbol
-        execution_config["env_type"] = "execution"
-
-        # 创建环境
-        env = EnvTradingTransformerV2(
-            execution_config, feature, uuid=f"execution_{symbol}"
-        )
-        return env
+        return make_vec_env({**self.config, "num_envs": 1}, self.feature, env_type)
 
     def _create_agent_trend(self, symbol: str) -> A2C:
         """
@@ -141,12 +268,12 @@ class AgentMulti:
             趋势预测智能体
         """
         # 使用A2C算法，适合趋势预测任务
-        env = DummyVecEnv([lambda: self.env_trend])
+        env = self._model_env("trend")
         agent = A2C(
             "MultiInputPolicy",
             env,
             learning_rate=0.0005,
-            n_steps=64,
+            n_steps=max(64 // self.num_envs, 1),
             gamma=0.99,
             verbose=1,
             tensorboard_log=f"{self.config['tensorboard_log']}/trend_{symbol}",
@@ -164,12 +291,12 @@ class AgentMulti:
             仓位管理智能体
         """
         # 使用PPO算法，适合仓位管理任务
-        env = DummyVecEnv([lambda: self.env_position[symbol]])
+        env = self._model_env("position")
         agent = PPO(
             "MultiInputPolicy",
             env,
             learning_rate=0.0003,
-            n_steps=1024,
+            n_steps=max(1024 // self.num_envs, 1),
             batch_size=64,
             n_epochs=10,
             gamma=0.99,
@@ -191,12 +318,14 @@ class AgentMulti:
             执行策略智能体
         """
         # 使用SAC算法，适合执行策略任务
-        env = DummyVecEnv([lambda: self.env_execution[symbol]])
+        env = self._model_env("execution")
         agent = SAC(
             "MultiInputPolicy",
             env,
             learning_rate=0.0003,
-            buffer_size=100000,
+            # 字典观察使用 DictReplayBuffer，不支持 optimize_memory_usage，
+            # 因此通过配置缩小缓冲区来控制内存
+            buffer_size=self.config.get("sac_buffer_size", 100000),
             batch_size=256,
             gamma=0.99,
             tau=0.005,
@@ -209,22 +338,50 @@ class AgentMulti:
         """
         训练所有智能体
 
+        三个智能体在推理前互不依赖，因此各自在独立进程中并行训练
+
         Args:
             total_timesteps: 总训练步数
         """
         logger.info(f"开始训练多智能体系统，总步数: {total_timesteps}")
 
-        # 第一阶段：训练趋势预测智能体
-        logger.info("第一阶段：训练趋势预测智能体")
-        self.agent_trend.learn(total_timesteps=total_timesteps)
+        agents = {
+            "trend": self.agent_trend,
+            "position": self.agent_position,
+            "execution": self.agent_execution,
+        }
+
+        # 特征数据放入共享内存，训练子进程中的环境挂载同一份只读视图
+        if self._feature_handle is None:
+            self._feature_handle, shared_blocks = share_feature(self.feature)
+            self._finalizer = weakref.finalize(self, _release_shared, shared_blocks)
+
+        # spawn 方式启动子进程，保证CUDA安全
+        ctx = mp.get_context("spawn")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            processes = []
+            for (env_type, agent), cpus in zip(agents.items(), _cpu_sets(len(agents))):
+                model_path = os.path.join(tmp_dir, f"{env_type}_{self.symbol}")
+                agent.save(model_path)
+                process = ctx.Process(
+                    target=_train_one,
+                    args=(env_type, model_path, self.config, self._feature_handle, total_timesteps, cpus),
+                    name=f"train_{env_type}_{self.symbol}",
+                )
+                process.start()
+                processes.append((env_type, model_path, process))
+                logger.info(f"启动 {env_type} 智能体训练进程: pid={process.pid}")
 
-        # 第二阶段：训练仓位管理智能体
-        logger.info("第二阶段：训练仓位管理智能体")
-        self.agent_position.learn(total_timesteps=total_timesteps)
+            for env_type, model_path, process in processes:
+                process.join()
+                if process.exitcode != 0:
+                    raise RuntimeError(f"{env_type} 智能体训练失败，退出码: {process.exitcode}")
 
-        # 第三阶段：训练执行策略智能体
-        logger.info("第三阶段：训练执行策略智能体")
-        self.agent_execution.learn(total_timesteps=total_timesteps)
+            # 加载训练后的模型
+            for env_type, model_path, _ in processes:
+                agent = AGENT_ALGOS[env_type].load(model_path, env=agents[env_type].get_env())
+                setattr(self, f"agent_{env_type}", agent)
+        self._cache_policies()
 
         logger.info("多智能体系统训练完成")
 
@@ -240,17 +397,17 @@ class AgentMulti:
         """
 
         # 1. 趋势预测
-        trend_action, _ = self.agent_trend.predict(market_data)
+        trend_action = self._policy_act("trend", market_data)
 
         # 2. 仓位管理 - 结合趋势预测结果
         position_data = self._combine_data(market_data, {"trend": trend_action})
-        position_action, _ = self.agent_position.predict(position_data)
+        position_action = self._policy_act("position", position_data)
 
         # 3. 执行策略 - 结合趋势和仓位结果
         execution_data = self._combine_data(
             position_data, {"position": position_action}
         )
-        execution_action, _ = self.agent_execution.predict(execution_data)
+        execution_action = self._policy_act("execution", execution_data)
 
         # 整合结果
         results = {
@@ -264,6 +421,112 @@ class AgentMulti:
 
         return results
 
+    def predict_batch(self, market_data_batch: List[Dict[str, Any]]) -> List[Dict[str, Dict[str, Any]]]:
+        """
+        批量预测：把多个时刻的观察数据沿第0维拼成一个批次，每个智能体只做一次前向推理
+
+        Args:
+            market_data_batch: 观察数据列表，每个元素的格式同 predict 的 market_data
+
+        Returns:
+            与输入一一对应的预测结果列表
+        """
+        if not market_data_batch:
+            return []
+        batch = len(market_data_batch)
+        market_data = _stack_observations(market_data_batch)
+
+        # 追踪图按批大小区分缓存，避免与单条推理的追踪结果混用
+        trend_action = self._policy_act("trend", market_data, cache_key=("trend", batch))
+        position_data = self._combine_data(market_data, {"trend": trend_action})
+        position_action = self._policy_act("position", position_data, cache_key=("position", batch))
+        execution_data = self._combine_data(position_data, {"position": position_action})
+        execution_action = self._policy_act("execution", execution_data, cache_key=("execution", batch))
+
+        # 逐条整合结果
+        return [
+            {
+                "trend": interpret_trend(trend_action[i]),
+                "position": interpret_position(position_action[i]),
+                "execution": interpret_execution(execution_action[i]),
+                "final_action": final_action(trend_action[i], position_action[i], execution_action[i]),
+            }
+            for i in range(batch)
+        ]
+
+    def _cache_policies(self):
+        """缓存各智能体的策略网络，并切换到推理模式"""
+        self.trend_policy = self.agent_trend.policy
+        self.position_policy = self.agent_position.policy
+        self.execution_policy = self.agent_execution.policy
+        for policy in (self.trend_policy, self.position_policy, self.execution_policy):
+            policy.set_training_mode(False)
+        # 策略网络变化后，已追踪的推理图失效
+        self._traced_policies: Dict[str, Any] = {}
+
+    def _quantize_policies(self):
+        """
+        将推理用策略网络的 Linear 层动态量化为 int8
+
+        只替换推理缓存的策略网络，智能体自身的网络保持FP32以便继续训练；
+        量化仅对CPU推理有效，GPU上跳过
+        """
+        for name in AGENT_ALGOS:
+            policy = getattr(self, f"{name}_policy")
+            if policy.device.type != "cpu":
+                logger.info(f"{name} 策略网络位于 {policy.device}，跳过int8量化")
+                continue
+            quantized = torch.quantization.quantize_dynamic(policy, {torch.nn.Linear}, dtype=torch.qint8)
+            setattr(self, f"{name}_policy", quantized)
+        self._traced_policies = {}
+        logger.info("推理策略网络已量化为int8")
+
+    def _policy_act(self, name: str, observation: Dict[str, Any], cache_key: Any = None):
+        """
+        调用 TorchScript 追踪后的策略网络进行确定性推理，跳过 SB3 predict 的封装开销
+
+        首次调用时以真实观察数据追踪计算图，之后复用追踪结果
+
+        Args:
+            name: 智能体名称 trend/position/execution
+            observation: 观察数据
+            cache_key: 追踪结果的缓存键，缺省为智能体名称
+
+        Returns:
+            动作
+        """
+        policy = getattr(self, f"{name}_policy")
+        obs_tensor, vectorized_env = policy.obs_to_tensor(observation)
+        key = name if cache_key is None else cache_key
+        with torch.no_grad():
+            traced = self._traced_policies.get(key)
+            if traced is None:
+                traced = self._trace_policy(name, policy, obs_tensor, key)
+            actions = traced(obs_tensor)
+        return _postprocess_actions(policy, actions.cpu().numpy(), vectorized_env)
+
+    def _trace_policy(self, name: str, policy, obs_tensor, cache_key: Any = None):
+        """
+        追踪策略网络的确定性推理计算图
+
+        Args:
+            name: 智能体名称
+            policy: 策略网络
+            obs_tensor: 示例观察张量
+            cache_key: 追踪结果的缓存键，缺省为智能体名称
+
+        Returns:
+            追踪后的模块，追踪失败时返回原始推理模块
+        """
+        module = _DeterministicPolicy(policy).eval()
+        try:
+            traced = torch.jit.trace(module, (obs_tensor,), strict=False, check_trace=False)
+        except Exception as e:
+            logger.warning(f"{name} 策略网络追踪失败，使用原始网络推理: {str(e)}")
+            traced = module
+        self._traced_policies[name if cache_key is None else cache_key] = traced
+        return traced
+
     def _combine_data(
         self, base_data: Dict[str, Any], additional_data: Dict[str, Any]
     ) -> Dict[str, Any]:
@@ -277,10 +540,8 @@ class AgentMulti:
         Returns:
             组合后的数据
         """
-        combined = base_data.copy()
-        for key, value in additional_data.items():
-            combined[key] = value
-        return combined
+        # 策略网络要求 dict 输入，这里用一次 C 层合并代替逐键赋值
+        return {**base_data, **additional_data}
 
     def save_models(self, path: str):
         """
@@ -309,14 +570,19 @@ class AgentMulti:
             :param date_tag: 日期标签
         """
         try:
-            # 加载趋势预测模型
-            self.agent_trend = A2C.load(f"{path}/trend_{self.symbol}_{date_tag}")
-            # 加载仓位管理模型
-            self.agent_position = PPO.load(f"{path}/position_{self.symbol}_{date_tag}")
-            # 加载执行策略模型
-            self.agent_execution = SAC.load(
-                f"{path}/execution_{self.symbol}_{date_tag}"
-            )
+            # 三个模型互不依赖，并行加载（磁盘IO与 torch.load 期间释放GIL）
+            with ThreadPoolExecutor(max_workers=len(AGENT_ALGOS)) as pool:
+                futures = {
+                    env_type: pool.submit(algo.load, f"{path}/{env_type}_{self.symbol}_{date_tag}")
+                    for env_type, algo in AGENT_ALGOS.items()
+                }
+                agents = {env_type: future.result() for env_type, future in futures.items()}
+            self.agent_trend = agents["trend"]
+            self.agent_position = agents["position"]
+            self.agent_execution = agents["execution"]
+            self._cache_policies()
+            if self.config.get("inference_quantize", False):
+                self._quantize_policies()
             logger.info(f"成功加载 {self.symbol}_{date_tag} 的模型")
         except Exception as e:
             logger.error(f"加载 {self.symbol}_{date_tag} 模型失败: {str(e)}")
@@ -331,23 +597,44 @@ class AgentMulti:
             client: 币安客户端
             predictions: 预测结果
         """
-        for symbol, prediction in predictions.items():
-            final_action = prediction.get("final_action", {})
-            action = final_action.get("action", "未知")
+        if not predictions:
+            return
 
-            # 获取当前持仓
-            position_info = self._get_position_info(client, symbol)
-            current_position = position_info.get("position", 0)
+        symbols = list(predictions)
+        actions = [predictions[symbol].get("final_action", {}) for symbol in symbols]
+        codes = np.fromiter(
+            (action.get("action", ActionCode.UNKNOWN) for action in actions), dtype=np.int8, count=len(symbols)
+        )
 
-            # 执行交易
-            if action == "买入" and current_position <= 0:
-                self._execute_buy(client, symbol, final_action)
-            elif action == "卖出" and current_position >= 0:
-                self._execute_sell(client, symbol, final_action)
-            elif action == "空仓" and current_position != 0:
-                self._execute_close(client, symbol)
-            else:
-                logger.info(f"{symbol}: 保持当前状态，不执行交易")
+        # 只有买入/卖出/空仓需要查询持仓，观望与未知直接跳过
+        tradable = np.flatnonzero((codes == ActionCode.BUY) | (codes == ActionCode.SELL) | (codes == ActionCode.CLOSE))
+        position_infos: Dict[int, Dict[str, Any]] = {}
+        positions = np.zeros(len(symbols), dtype=np.float64)
+        for i in tradable:
+            position_infos[i] = self._get_position_info(client, symbols[i])
+            positions[i] = position_infos[i].get("position", 0)
+
+        buy_mask = (codes == ActionCode.BUY) & (positions <= 0)
+        sell_mask = (codes == ActionCode.SELL) & (positions >= 0)
+        close_mask = (codes == ActionCode.CLOSE) & (positions != 0)
+        hold_mask = ~(buy_mask | sell_mask | close_mask)
+
+        if buy_mask.any() or sell_mask.any():
+            # 每轮只获取一次账户余额和全部标记价格
+            balance_info = self._get_account_balance(client)
+            self._prefetch_prices(client)
+            for i in np.flatnonzero(buy_mask):
+                self._execute_buy(client, symbols[i], actions[i], balance_info)
+            for i in np.flatnonzero(sell_mask):
+                self._execute_sell(client, symbols[i], actions[i], balance_info)
+
+        for i in np.flatnonzero(close_mask):
+            self._execute_close(client, symbols[i], position_infos[i])
+
+        # 日志级别高于 INFO 时跳过显示名称的查询与格式化
+        if logger.isEnabledFor(logging.INFO):
+            for i in np.flatnonzero(hold_mask):
+                logger.info("%s: %s，保持当前状态，不执行交易", symbols[i], action_display(int(codes[i])))
 
     def _get_position_info(self, client, symbol: str) -> Dict[str, Any]:
         """
@@ -384,7 +671,7 @@ class AgentMulti:
                 "unrealized_pnl": 0,
             }
         except Exception as e:
-            logger.error(f"获取 {symbol} 持仓信息失败: {str(e)}")
+            logger.error("获取 %s 持仓信息失败: %s", symbol, e)
             return {
                 "position": 0,
                 "entry_price": 0,
@@ -393,7 +680,8 @@ class AgentMulti:
                 "unrealized_pnl": 0,
             }
 
-    def _execute_buy(self, client, symbol: str, action_info: Dict[str, Any]):
+    def _execute_buy(self, client, symbol: str, action_info: Dict[str, Any],
+                     balance_info: Optional[Dict[str, float]] = None):
         """
         执行买入操作
 
@@ -401,17 +689,19 @@ class AgentMulti:
             client: 币安客户端
             symbol: 交易对
             action_info: 动作信息
+            balance_info: 账户余额信息，为空时实时查询
         """
         try:
             # 获取账户余额
-            balance_info = self._get_account_balance(client)
+            if balance_info is None:
+                balance_info = self._get_account_balance(client)
             available_balance = balance_info.get("available", 0)
 
             # 获取当前价格
             current_price = self._get_current_price(client, symbol)
 
             # 计算买入数量
-            confidence = action_info.get("confidence", "中")
+            confidence = action_info.get("confidence_code", CONFIDENCE_MEDIUM)
             position_size = self._calculate_position_size(
                 available_balance, current_price, confidence
             )
@@ -421,16 +711,16 @@ class AgentMulti:
             if execution_type == "分批执行":
                 # 分批买入
                 batch_size = position_size / 3
-                logger.info(f"{symbol}: 分批买入 - 第1批 {batch_size:.6f}")
+                logger.info("%s: 分批买入 - 第1批 %.6f", symbol, batch_size)
                 client.place_market_order(
                     symbol=symbol, side="BUY", quantity=batch_size
                 )
 
                 # 后续批次在实际应用中可以通过定时任务执行
-                logger.info(f"{symbol}: 分批买入 - 剩余批次将在后续执行")
+                logger.info("%s: 分批买入 - 剩余批次将在后续执行", symbol)
             else:
                 # 立即买入
-                logger.info(f"{symbol}: 立即买入 {position_size:.6f}")
+                logger.info("%s: 立即买入 %.6f", symbol, position_size)
                 client.place_market_order(
                     symbol=symbol, side="BUY", quantity=position_size
                 )
@@ -444,9 +734,10 @@ class AgentMulti:
             }
 
         except Exception as e:
-            logger.error(f"执行 {symbol} 买入操作失败: {str(e)}")
+            logger.error("执行 %s 买入操作失败: %s", symbol, e)
 
-    def _execute_sell(self, client, symbol: str, action_info: Dict[str, Any]):
+    def _execute_sell(self, client, symbol: str, action_info: Dict[str, Any],
+                     balance_info: Optional[Dict[str, float]] = None):
         """
         执行卖出操作
 
@@ -454,17 +745,19 @@ class AgentMulti:
             client: 币安客户端
             symbol: 交易对
             action_info: 动作信息
+            balance_info: 账户余额信息，为空时实时查询
         """
         try:
             # 获取账户余额
-            balance_info = self._get_account_balance(client)
+            if balance_info is None:
+                balance_info = self._get_account_balance(client)
             available_balance = balance_info.get("available", 0)
 
             # 获取当前价格
             current_price = self._get_current_price(client, symbol)
 
             # 计算卖出数量
-            confidence = action_info.get("confidence", "中")
+            confidence = action_info.get("confidence_code", CONFIDENCE_MEDIUM)
             position_size = self._calculate_position_size(
                 available_balance, current_price, confidence
             )
@@ -474,16 +767,16 @@ class AgentMulti:
             if execution_type == "分批执行":
                 # 分批卖出
                 batch_size = position_size / 3
-                logger.info(f"{symbol}: 分批卖出 - 第1批 {batch_size:.6f}")
+                logger.info("%s: 分批卖出 - 第1批 %.6f", symbol, batch_size)
                 client.place_market_order(
                     symbol=symbol, side="SELL", quantity=batch_size
                 )
 
                 # 后续批次在实际应用中可以通过定时任务执行
-                logger.info(f"{symbol}: 分批卖出 - 剩余批次将在后续执行")
+                logger.info("%s: 分批卖出 - 剩余批次将在后续执行", symbol)
             else:
                 # 立即卖出
-                logger.info(f"{symbol}: 立即卖出 {position_size:.6f}")
+                logger.info("%s: 立即卖出 %.6f", symbol, position_size)
                 client.place_market_order(
                     symbol=symbol, side="SELL", quantity=position_size
                 )
@@ -497,23 +790,25 @@ class AgentMulti:
             }
 
         except Exception as e:
-            logger.error(f"执行 {symbol} 卖出操作失败: {str(e)}")
+            logger.error("执行 %s 卖出操作失败: %s", symbol, e)
 
-    def _execute_close(self, client, symbol: str):
+    def _execute_close(self, client, symbol: str, position_info: Optional[Dict[str, Any]] = None):
         """
         执行平仓操作
 
         Args:
             client: 币安客户端
             symbol: 交易对
+            position_info: 持仓信息，为空时实时查询
         """
         try:
             # 获取当前持仓
-            position_info = self._get_position_info(client, symbol)
+            if position_info is None:
+                position_info = self._get_position_info(client, symbol)
             current_position = position_info.get("position", 0)
 
             if current_position == 0:
-                logger.info(f"{symbol}: 当前无持仓，无需平仓")
+                logger.info("%s: 当前无持仓，无需平仓", symbol)
                 return
 
             # 确定平仓方向
@@ -521,7 +816,7 @@ class AgentMulti:
             quantity = abs(current_position)
 
             # 执行平仓
-            logger.info(f"{symbol}: 平仓 {quantity:.6f}")
+            logger.info("%s: 平仓 %.6f", symbol, quantity)
             client.place_market_order(
                 symbol=symbol, side=side, quantity=quantity, reduce_only=True
             )
@@ -535,7 +830,7 @@ class AgentMulti:
             }
 
         except Exception as e:
-            logger.error(f"执行 {symbol} 平仓操作失败: {str(e)}")
+            logger.error("执行 %s 平仓操作失败: %s", symbol, e)
 
     def _get_account_balance(self, client: ClientInterface) -> Dict[str, float]:
         """
@@ -558,12 +853,29 @@ class AgentMulti:
 
             return {"total": 0, "available": 0}
         except Exception as e:
-            logger.error(f"获取账户余额失败: {str(e)}")
+            logger.error("获取账户余额失败: %s", e)
             return {"total": 0, "available": 0}
 
+    def _prefetch_prices(self, client):
+        """
+        一次请求获取全部交易对的标记价格并写入缓存
+
+        Args:
+            client: 币安客户端
+        """
+        try:
+            mark_prices = client.get_mark_price()
+            if not isinstance(mark_prices, list):
+                return
+            expiry = time.monotonic() + self._price_cache_ttl
+            for item in mark_prices:
+                self._price_cache[item["symbol"]] = (float(item["markPrice"]), expiry)
+        except Exception as e:
+            logger.error("批量获取标记价格失败: %s", e)
+
     def _get_current_price(self, client, symbol: str) -> float:
         """
-        获取当前价格
+        获取当前价格（带短时缓存）
 
         Args:
             client: 币安客户端
@@ -572,21 +884,29 @@ class AgentMulti:
         Returns:
             当前价格
         """
+        cached = self._price_cache.get(symbol)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+
         try:
             mark_price = client.get_mark_price(symbol=symbol)
+            price = 0
             if isinstance(mark_price, dict):
-                return float(mark_price["markPrice"])
+                price = float(mark_price["markPrice"])
             else:
                 for item in mark_price:
                     if item["symbol"] == symbol:
-                        return float(item["markPrice"])
-            return 0
+                        price = float(item["markPrice"])
+                        break
+            if price:
+                self._price_cache[symbol] = (price, time.monotonic() + self._price_cache_ttl)
+            return price
         except Exception as e:
-            logger.error(f"获取 {symbol} 当前价格失败: {str(e)}")
+            logger.error("获取 %s 当前价格失败: %s", symbol, e)
             return 0
 
     def _calculate_position_size(
-        self, available_balance: float, current_price: float, confidence: str
+        self, available_balance: float, current_price: float, confidence: int
     ) -> float:
         """
         计算仓位大小
@@ -594,24 +914,12 @@ class AgentMulti:
         Args:
             available_balance: 可用余额
             current_price: 当前价格
-            confidence: 信心水平
+            confidence: 信心水平编码
 
         Returns:
             仓位大小
         """
-        # 根据信心水平确定仓位比例
-        confidence_ratio = {
-            "高": 0.3,  # 高信心使用30%资金
-            "中": 0.2,  # 中等信心使用20%资金
-            "低": 0.1,  # 低信心使用10%资金
-        }.get(confidence, 0.1)
-
-        # 计算仓位大小
-        position_value = available_balance * confidence_ratio
-        position_size = position_value / current_price
-
-        # 四舍五入到6位小数
-        return round(position_size, 6)
+        return calc_position_size(float(available_balance), float(current_price), int(confidence))
 
     def _get_current_time(self) -> str:
         """
@@ -620,9 +928,12 @@ class AgentMulti:
         Returns:
             当前时间字符串
         """
-        from datetime import datetime
-
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        now = int(time.time())
+        # 同一秒内复用已格式化的字符串
+        if now != self._last_ts_sec:
+            self._last_ts_sec = now
+            self._last_ts_str = time.strftime(_TIME_FMT, time.localtime(now))
+        return self._last_ts_str
 
     def get_trading_summary(self) -> Dict[str, Any]:
         """
@@ -1,6 +1,58 @@
-from typing import Dict, List, Tuple, Any, Optional
+from types import MappingProxyType
+from typing import Dict, List, Tuple, Any, Optional, Mapping
 
-from const.const import Trend, Position, Execution
+import numpy as np
+
+from agents._fastmath import CONFIDENCE_HIGH, CONFIDENCE_MEDIUM, CONFIDENCE_LOW
+from const.const import Trend, Position, Execution, ActionCode
+
+# 动作解释表，按动作值索引
+_TREND = ("震荡", "上涨", "下跌")  # Trend.Sideways / Trend.Up / Trend.Down
+_POSITION = ("空仓", "持多", "持空")  # Position.Empty / Position.Long / Position.Short
+_EXEC = ("立即执行", "等待", "分批执行")  # Execution.Immediate / Execution.Wait / Execution.Batch
+
+# 最终交易动作的显示名称，仅用于日志和报表
+_DISPLAY = {
+    ActionCode.UNKNOWN: "未知",
+    ActionCode.BUY: "买入",
+    ActionCode.SELL: "卖出",
+    ActionCode.CLOSE: "空仓",
+    ActionCode.HOLD: "观望",
+    ActionCode.WAIT: "等待",
+}
+_CONFIDENCE_CODES = {"高": CONFIDENCE_HIGH, "中": CONFIDENCE_MEDIUM, "低": CONFIDENCE_LOW}
+
+
+def _action_index(action: Any) -> int:
+    """
+    将动作转换为整数索引
+
+    Args:
+        action: 动作（枚举、整数，或 SB3 输出的0维/单元素数组）
+
+    Returns:
+        整数索引
+
+    Raises:
+        ValueError: 动作数组包含多个元素
+    """
+    if isinstance(action, np.ndarray):
+        # 多元素数组说明动作形状有误，由 item() 抛出 ValueError，不当作未知动作吞掉
+        return int(action.item())
+    return int(getattr(action, "value", action))
+
+
+def action_display(action: int) -> str:
+    """
+    获取最终交易动作的显示名称
+
+    Args:
+        action: 最终交易动作编码
+
+    Returns:
+        显示名称
+    """
+    return _DISPLAY.get(action, "未知")
 
 
 def interpret_trend(action: Trend) -> str:
@@ -13,12 +65,8 @@ def interpret_trend(action: Trend) -> str:
     Returns:
         趋势解释
     """
-    trend_map = {
-        Trend.Sideways: "震荡",
-        Trend.Up: "上涨",
-        Trend.Down: "下跌"
-    }
-    return trend_map.get(action, "未知<震荡>")
+    idx = _action_index(action)
+    return _TREND[idx] if 0 <= idx < len(_TREND) else "未知<震荡>"
 
 
 def interpret_position(position: Position) -> str:
@@ -31,12 +79,8 @@ def interpret_position(position: Position) -> str:
     Returns:
         仓位解释
     """
-    position_map = {
-        Position.Empty: "空仓",
-        Position.Long: "持多",
-        Position.Short: "持空"
-    }
-    return position_map.get(position, "未知<空仓>")
+    idx = _action_index(position)
+    return _POSITION[idx] if 0 <= idx < len(_POSITION) else "未知<空仓>"
 
 
 def interpret_execution(action: int) -> str:
@@ -49,58 +93,96 @@ def interpret_execution(action: int) -> str:
     Returns:
         执行策略解释
     """
-    execution_map = {
-        0: "立即执行",
-        1: "等待",
-        2: "分批执行"
-    }
-    return execution_map.get(action, "未知<立即>")
+    idx = _action_index(action)
+    return _EXEC[idx] if 0 <= idx < len(_EXEC) else "未知<立即>"
 
 
-def final_action(trend: Trend, position: Position, execution: int) -> Dict[str, Any]:
+def _build_decision(position: int, trend: int, execution: int) -> Dict[str, Any]:
     """
-    获取最终交易动作
+    根据三个智能体的输出综合决策（用于预先生成决策表）
 
     Args:
-        trend: 趋势预测动作
-        position: 仓位管理动作
-        execution: 执行策略动作
+        position: 仓位管理动作值
+        trend: 趋势预测动作值
+        execution: 执行策略动作值
 
     Returns:
         最终交易动作
     """
-    # 根据三个智能体的输出综合决策
     if position == Position.Empty:  # 空仓
-        return {"action": "空仓", "reason": "仓位管理建议空仓"}
+        return {"action": ActionCode.CLOSE, "reason": "仓位管理建议空仓"}
 
     if position == Position.Long:  # 持多
         if trend == Trend.Up:  # 上涨
             confidence = "高" if execution == Execution.Immediate else "中"
             return {
-                "action": "买入",
+                "action": ActionCode.BUY,
                 "confidence": confidence,
                 "execution": interpret_execution(execution),
                 "reason": "趋势向上，仓位管理建议持多"
             }
         else:
             return {
-                "action": "观望",
+                "action": ActionCode.HOLD,
                 "reason": "趋势不明确，但仓位管理建议持多"
             }
 
-    if position == Position.Long:  # 持空
+    if position == Position.Short:  # 持空
         if trend == Trend.Down:  # 下跌
             confidence = "高" if execution == Execution.Immediate else "中"
             return {
-                "action": "卖出",
+                "action": ActionCode.SELL,
                 "confidence": confidence,
                 "execution": interpret_execution(execution),
                 "reason": "趋势向下，仓位管理建议持空"
             }
         else:
             return {
-                "action": "观望",
+                "action": ActionCode.HOLD,
                 "reason": "趋势不明确，但仓位管理建议持空"
             }
 
-    return {"action": "未知", "reason": "无法确定交易动作"}
+    return {"action": ActionCode.UNKNOWN, "reason": "无法确定交易动作"}
+
+
+# 决策表：(仓位, 趋势, 执行) -> 最终交易动作，-1 表示未知动作；结果只读，避免调用方修改共享状态
+def _frozen_decision(position: int, trend: int, execution: int) -> Mapping[str, Any]:
+    """生成只读决策，并附带信心编码"""
+    decision = _build_decision(position, trend, execution)
+    if "confidence" in decision:
+        decision["confidence_code"] = _CONFIDENCE_CODES[decision["confidence"]]
+    return MappingProxyType(decision)
+
+
+_DECISION_TABLE: Dict[Tuple[int, int, int], Mapping[str, Any]] = {
+    (p, t, e): _frozen_decision(p, t, e)
+    for p in range(-1, len(_POSITION))
+    for t in range(-1, len(_TREND))
+    for e in range(-1, len(_EXEC))
+}
+
+
+def _table_index(action: Any, size: int) -> int:
+    """将动作转换为决策表索引，越界时返回-1"""
+    idx = _action_index(action)
+    return idx if 0 <= idx < size else -1
+
+
+def final_action(trend: Trend, position: Position, execution: int) -> Mapping[str, Any]:
+    """
+    获取最终交易动作
+
+    Args:
+        trend: 趋势预测动作
+        position: 仓位管理动作
+        execution: 执行策略动作
+
+    Returns:
+        最终交易动作（只读）
+    """
+    key = (
+        _table_index(position, len(_POSITION)),
+        _table_index(trend, len(_TREND)),
+        _table_index(execution, len(_EXEC)),
+    )
+    return _DECISION_TABLE[key]
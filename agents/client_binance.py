@@ -10,15 +10,23 @@
 - 期货交易
 """
 
-import json
-import uuid
-from datetime import datetime
-from time import sleep, time_ns
-from typing import Optional, Dict, List, Any
-
-import pandas as pd
-import numpy as np
-from binance.client import Client
+import asyncio
+import hashlib
+import hmac
+import itertools
+import logging
+from collections import OrderedDict, deque
+from decimal import Decimal, ROUND_DOWN
+import functools
+from functools import lru_cache
+from time import monotonic, time_ns
+from typing import TYPE_CHECKING, Optional, Dict, List, Any, Tuple, Callable, Type
+
+import orjson
+import requests
+import websockets
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from binance.exceptions import BinanceAPIException
 from binance.um_futures import UMFutures
 from binance.enums import (
@@ -33,12 +41,113 @@ from binance.websocket.um_futures.websocket_client import UMFuturesWebsocketClie
 from agents.client_interface import ClientInterface
 from utils.logger import Logger
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = Logger.get_logger()
 
 
+def _safe(default: Optional[Callable[[], Any]] = None, exceptions: Type[BaseException] = Exception):
+    """
+    接口调用异常保护装饰器：记录错误日志并返回默认值
+
+    Args:
+        default: 默认值工厂（如 list/dict），每次返回新对象；None 表示返回 None
+        exceptions: 需要捕获的异常类型
+
+    Returns:
+        装饰器
+    """
+    def decorator(fn):
+        name = fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                return fn(*args, **kwargs)
+            except exceptions as e:
+                logger.error("%s failed: %s", name, e)
+                return default() if default is not None else None
+
+        return wrapper
+
+    return decorator
+
+
+# 批量下单接口单次最多订单数
+BATCH_ORDER_LIMIT: int = 5
+
+# 批量撤单接口单次最多订单数
+BATCH_CANCEL_LIMIT: int = 10
+
+# 交易规则缓存有效期（秒）
+EXCHANGE_INFO_TTL: float = 3600.0
+
+# 最近提交订单缓存数量
+SUBMITTED_ORDER_CACHE_SIZE: int = 10000
+
+# listenKey 续期间隔（秒）
+LISTEN_KEY_KEEPALIVE_INTERVAL: float = 1500.0
+
+# 服务器时差校准间隔（秒）
+CLOCK_SYNC_INTERVAL: float = 3600.0
+
+# 空结果缓存有效期与清理间隔（秒）
+NEGATIVE_CACHE_TTL: float = 5.0
+NEGATIVE_CACHE_SWEEP: float = 60.0
+
+# 合约组合行情流地址
+WS_STREAM_URL: str = "wss://fstream.binance.com"
+WS_STREAM_URL_TESTNET: str = "wss://stream.binancefuture.com"
+
+
+class _UMFuturesSynced(UMFutures):
+    """
+    合约客户端扩展：
+    - 使用本地时钟加服务器时差生成签名时间戳，避免签名请求前再查询服务器时间
+    - 预先用密钥初始化 HMAC，每次签名只复制状态，省去重复的密钥初始化
+    """
+
+    clock_offset_ms: int = 0
+
+    def __init__(self, key=None, secret=None, **kwargs):
+        super().__init__(key=key, secret=secret, **kwargs)
+        self._hmac_proto = hmac.new(secret.encode(), digestmod=hashlib.sha256) if secret else None
+
+    def _get_sign(self, payload):
+        if self._hmac_proto is None:
+            return super()._get_sign(payload)
+        h = self._hmac_proto.copy()
+        h.update(payload.encode())
+        return h.hexdigest()
+
+    def sign_request(self, http_method, url_path, payload=None, special=False):
+        if payload is None:
+            payload = {}
+        payload["timestamp"] = time_ns() // 1_000_000 + self.clock_offset_ms
+        query_string = self._prepare_params(payload, special)
+        payload["signature"] = self._get_sign(query_string)
+        return self.send_request(http_method, url_path, payload, special)
+
+
 class ClientBinance(ClientInterface):
     """币安客户端"""
 
+    # K线字段及类型，与接口返回的字段顺序一致（忽略最后的 ignore 字段）
+    KLINE_COLUMNS: Dict[str, str] = {
+        'open_time': 'int64',
+        'open': 'float64',
+        'high': 'float64',
+        'low': 'float64',
+        'close': 'float64',
+        'volume': 'float64',
+        'close_time': 'int64',
+        'quote_volume': 'float64',
+        'count': 'int64',
+        'taker_buy_volume': 'float64',
+        'taker_buy_quote_volume': 'float64',
+    }
+
     def __init__(self, config: Dict[str, any] = None):
         """
         初始化 客户端
@@ -57,15 +166,79 @@ class ClientBinance(ClientInterface):
         self.window_size = config['window_size']
 
         # 合约客户端
-        self.futures_client = UMFutures(key=self.api_key,secret=self.api_secret,testnet=self.testnet)
+        self.futures_client = _UMFuturesSynced(key=self.api_key,secret=self.api_secret,testnet=self.testnet)
+        self._clock_synced_at: float = 0.0
+        self.sync_clock()
+        # 复用连接池，避免冷连接上的 TCP+TLS 握手
+        self._mount_connection_pool(self.futures_client.session, config.get('http_pool_size', 32))
 
         # WebSocket客户端
         self.ws_client = None
         self.listen_key = None
+        # listenKey 续期任务，与WebSocket运行在同一事件循环上
+        self._keepalive_task: Optional[asyncio.Task] = None
+        self._closed = False
+        # WebSocket 请求ID
+        self._ws_id = itertools.count(1)
+        # WebSocket 消息环形缓冲区，满时自动丢弃最旧的消息
+        self._rx_buf: deque = deque(maxlen=config.get('ws_buffer_size', 10000))
+        # 异步行情流: 读取协程将原始消息放入有界队列，由策略侧消费
+        self._ws: Optional[Any] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._in_q: Optional[asyncio.Queue] = None
+
+        # 空结果缓存: 查询条件 -> 返回空结果的时间，短时间内不再重复请求
+        self._neg_cache: Dict[Tuple, float] = {}
+        self._neg_cache_swept: float = monotonic()
 
         # 交易配置
         self.default_leverage = config['leverage']  # 默认杠杆
         self.default_margin_type = config['margin_type']  # 默认保证金类型 ISOLATED/CROSSED
+        self.fast_order = config.get('fast_order', False)  # 是否使用预编码模板的快速下单路径
+
+        # 交易规则缓存: symbol -> {'stepSize': Decimal, 'tickSize': Decimal}，按小时刷新
+        self._symbol_filters: Dict[str, Dict[str, Decimal]] = {}
+        self._symbol_filters_expire: float = 0.0
+
+        # 客户端订单ID: 以毫秒时间为起点单调递增，重启后也不会与之前的ID重复
+        self._oid_counter = itertools.count(time_ns() // 1_000_000)
+        # 最近提交的订单: clientOrderId -> symbol，用于失败重试时查询而不是重复下单
+        self._submitted_orders: OrderedDict[str, str] = OrderedDict()
+
+    def sync_clock(self):
+        """测量本地与服务器的时差，之后签名请求直接使用本地时钟加时差"""
+        try:
+            local_ms = time_ns() // 1_000_000
+            server_ms = self.futures_client.time()['serverTime']
+            # 以请求往返的中点估计本地时间
+            self.futures_client.clock_offset_ms = server_ms - (local_ms + time_ns() // 1_000_000) // 2
+            self._clock_synced_at = monotonic()
+            logger.info(f"Clock offset to server: {self.futures_client.clock_offset_ms}ms")
+        except Exception as e:
+            logger.error(f"Failed to sync server time: {e}")
+
+    def _timestamp_ms(self) -> int:
+        """按服务器时间校正后的毫秒时间戳"""
+        return time_ns() // 1_000_000 + self.futures_client.clock_offset_ms
+
+    @staticmethod
+    def _mount_connection_pool(session: requests.Session, pool_size: int):
+        """
+        为 REST 会话挂载长连接池
+
+        保留 binance-connector 会话上已有的请求头（API KEY 等），只替换 https 适配器；
+        urllib3 默认已开启 TCP_NODELAY
+
+        Args:
+            session: binance-connector 的 requests 会话
+            pool_size: 连接池大小
+        """
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=0)
+        )
+        session.mount('https://', adapter)
 
     def init_websocket(self, message_handler=None):
         """
@@ -82,11 +255,53 @@ class ClientBinance(ClientInterface):
             self.ws_client = UMFuturesWebsocketClient(
                 on_message=self._default_message_handler
             )
+        self._closed = False
+        self._start_keepalive()
 
-    @staticmethod
-    def _default_message_handler(self, _, message):
-        """默认WebSocket消息处理"""
-        logger.debug(f"Received message: {message}")
+    def _start_keepalive(self):
+        """在当前事件循环上启动 listenKey 续期任务，没有运行中的事件循环时跳过"""
+        if self._keepalive_task and not self._keepalive_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.debug("No running event loop, listen key keepalive task not started")
+            return
+        self._keepalive_task = loop.create_task(self._keepalive_loop())
+
+    async def _keepalive_loop(self):
+        """定时续期 listenKey（有效期60分钟，每25分钟续期一次），并按小时校准服务器时差"""
+        while not self._closed:
+            await asyncio.sleep(LISTEN_KEY_KEEPALIVE_INTERVAL)
+            await asyncio.to_thread(self.keep_alive_listen_key)
+            # 顺带按小时重新校准时差
+            if monotonic() - self._clock_synced_at >= CLOCK_SYNC_INTERVAL:
+                await asyncio.to_thread(self.sync_clock)
+
+    def _default_message_handler(self, ws_client, message):
+        """
+        默认WebSocket消息处理：网络线程只把消息放入环形缓冲区，由消费方通过 drain 批量取出
+
+        Args:
+            ws_client: WebSocket客户端（binance-connector 回调的第一个参数）
+            message: 原始消息
+        """
+        self._rx_buf.append(message)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("ws msg len=%d", len(message))
+
+    def drain(self, max_items: int = 256) -> List[Any]:
+        """
+        从环形缓冲区批量取出WebSocket消息
+
+        Args:
+            max_items: 最多取出的消息数
+
+        Returns:
+            List: 按接收顺序排列的原始消息
+        """
+        buf = self._rx_buf
+        return [buf.popleft() for _ in range(min(max_items, len(buf)))]
 
     def subscribe_kline(self, symbol: str, interval: str, callback=None):
         """
@@ -104,6 +319,80 @@ class ClientBinance(ClientInterface):
             interval=interval
         )
 
+    def subscribe_klines(self, pairs: List[Tuple[str, str]], callback=None):
+        """
+        批量订阅K线数据，所有数据流合并为一个 SUBSCRIBE 帧发送
+
+        Args:
+            pairs: (交易对, 时间间隔) 列表
+            callback: 回调函数
+        """
+        if not pairs:
+            return
+        if not self.ws_client:
+            self.init_websocket(callback)
+        streams = [f"{symbol.lower()}@kline_{interval}" for symbol, interval in pairs]
+        if hasattr(self.ws_client, 'subscribe'):
+            self.ws_client.subscribe(stream=streams, id=next(self._ws_id))
+            return
+        # 旧版客户端不支持多数据流订阅，逐个订阅
+        for symbol, interval in pairs:
+            self.ws_client.KLine(symbol=symbol, interval=interval)
+
+    async def start_stream(self, streams: List[str], max_queue: int = 1024) -> asyncio.Queue:
+        """
+        基于 websockets 建立组合行情流连接，消息由单个读取协程放入有界队列
+
+        在事件循环启动前调用 uvloop.install() 可进一步提升吞吐
+
+        Args:
+            streams: 数据流名称列表，如 ["btcusdt@kline_1m"]
+            max_queue: 队列容量，队列满时丢弃最旧的消息
+
+        Returns:
+            asyncio.Queue: 原始消息队列
+        """
+        base_url = WS_STREAM_URL_TESTNET if self.testnet else WS_STREAM_URL
+        url = f"{base_url}/stream?streams={'/'.join(streams)}"
+        # 行情消息很小，关闭 permessage-deflate 压缩以节省CPU
+        self._ws = await websockets.connect(url, max_queue=max_queue, compression=None, open_timeout=5)
+        self._in_q = asyncio.Queue(maxsize=max_queue)
+        self._reader_task = asyncio.create_task(self._reader(self._ws, self._in_q))
+        self._closed = False
+        self._start_keepalive()
+        return self._in_q
+
+    @staticmethod
+    async def _reader(ws, queue: asyncio.Queue):
+        """持续读取 WebSocket 消息并放入队列"""
+        try:
+            async for message in ws:
+                if queue.full():
+                    # 消费跟不上时丢弃最旧的行情，保证队列中是最新数据
+                    queue.get_nowait()
+                queue.put_nowait(message)
+        except Exception as e:
+            logger.error(f"WebSocket stream reader stopped: {e}")
+
+    async def next_message(self) -> Dict:
+        """
+        从行情队列取出一条消息并解码
+
+        Returns:
+            Dict: 解码后的消息
+        """
+        return orjson.loads(await self._in_q.get())
+
+    async def aclose_stream(self):
+        """关闭异步行情流"""
+        if self._reader_task:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if self._ws:
+            await self._ws.close()
+            self._ws = None
+
+    @_safe(str)
     def get_listen_key(self) -> str:
         """
         获取WebSocket listenKey
@@ -111,13 +400,9 @@ class ClientBinance(ClientInterface):
         Returns:
             str: listenKey
         """
-        try:
-            response = self.futures_client.new_listen_key()
-            self.listen_key = response['listenKey']
-            return self.listen_key
-        except Exception as e:
-            logger.error(f"Failed to get listen key: {e}")
-            return ""
+        response = self.futures_client.new_listen_key()
+        self.listen_key = response['listenKey']
+        return self.listen_key
 
     def keep_alive_listen_key(self):
         """延长listenKey有效期"""
@@ -130,6 +415,7 @@ class ClientBinance(ClientInterface):
             except Exception as e:
                 logger.error(f"Failed to renew listen key: {e}")
 
+    @_safe()
     def set_leverage(self, symbol: str, leverage: int):
         """
         设置杠杆倍数
@@ -138,15 +424,13 @@ class ClientBinance(ClientInterface):
             symbol: 交易对
             leverage: 杠杆倍数
         """
-        try:
-            self.futures_client.change_leverage(
-                symbol=symbol,
-                leverage=leverage
-            )
-            logger.info(f"Set leverage to {leverage}x for {symbol}")
-        except Exception as e:
-            logger.error(f"Failed to set leverage: {e}")
+        self.futures_client.change_leverage(
+            symbol=symbol,
+            leverage=leverage
+        )
+        logger.info(f"Set leverage to {leverage}x for {symbol}")
 
+    @_safe()
     def set_margin_type(self, symbol: str, margin_type: str):
         """
         设置保证金类型
@@ -155,15 +439,13 @@ class ClientBinance(ClientInterface):
             symbol: 交易对
             margin_type: 保证金类型 (ISOLATED/CROSSED)
         """
-        try:
-            self.futures_client.change_margin_type(
-                symbol=symbol,
-                marginType=margin_type
-            )
-            logger.info(f"Set margin type to {margin_type} for {symbol}")
-        except Exception as e:
-            logger.error(f"Failed to set margin type: {e}")
+        self.futures_client.change_margin_type(
+            symbol=symbol,
+            marginType=margin_type
+        )
+        logger.info(f"Set margin type to {margin_type} for {symbol}")
 
+    @_safe(list)
     def get_position_risk(self, symbol: Optional[str] = None) -> List[Dict]:
         """
         获取持仓风险
@@ -174,12 +456,9 @@ class ClientBinance(ClientInterface):
         Returns:
             List[Dict]: 持仓风险信息
         """
-        try:
-            return self.futures_client.get_position_risk(symbol=symbol)
-        except Exception as e:
-            logger.error(f"Failed to get position risk: {e}")
-            return []
+        return self.futures_client.get_position_risk(symbol=symbol)
 
+    @_safe(dict)
     def get_account_info(self) -> Dict:
         """
         获取账户信息
@@ -187,12 +466,9 @@ class ClientBinance(ClientInterface):
         Returns:
             Dict: 账户信息
         """
-        try:
-            return self.futures_client.account()
-        except Exception as e:
-            logger.error(f"Failed to get account info: {e}")
-            return {}
+        return self.futures_client.account()
 
+    @_safe(list)
     def get_balance(self) -> List[Dict]:
         """
         获取账户余额
@@ -200,12 +476,115 @@ class ClientBinance(ClientInterface):
         Returns:
             List[Dict]: 余额信息
         """
-        try:
-            return self.futures_client.balance()
-        except Exception as e:
-            logger.error(f"Failed to get balance: {e}")
-            return []
+        return self.futures_client.balance()
+
+    def _next_client_order_id(self, symbol: str) -> str:
+        """
+        生成单调递增的客户端订单ID（远小于币安36字符上限），并记录到最近订单缓存
+
+        Args:
+            symbol: 交易对
+
+        Returns:
+            str: 客户端订单ID
+        """
+        client_order_id = f"c{next(self._oid_counter):x}"
+        self._submitted_orders[client_order_id] = symbol
+        # 新订单会改变订单查询结果，清除订单相关的空结果缓存
+        if self._neg_cache:
+            self._neg_cache = {k: t for k, t in self._neg_cache.items() if k[0] == 'funding_rate'}
+        if len(self._submitted_orders) > SUBMITTED_ORDER_CACHE_SIZE:
+            self._submitted_orders.popitem(last=False)
+        return client_order_id
+
+    @_safe(dict)
+    def get_order_by_client_id(self, client_order_id: str) -> Dict:
+        """
+        按客户端订单ID查询最近提交的订单
+
+        下单请求超时等瞬时错误时，可用此方法确认订单是否已被接受，避免重复下单
+
+        Args:
+            client_order_id: 客户端订单ID
+
+        Returns:
+            Dict: 订单信息，不在最近订单缓存中或查询失败时返回空字典
+        """
+        symbol = self._submitted_orders.get(client_order_id)
+        if symbol is None:
+            return {}
+        return self.futures_client.query_order(
+            symbol=symbol,
+            origClientOrderId=client_order_id
+        )
+
+    def _get_symbol_filters(self, symbol: str) -> Optional[Dict[str, Decimal]]:
+        """
+        获取交易对的数量步长和价格精度，交易规则在本地缓存一小时
+
+        Args:
+            symbol: 交易对
+
+        Returns:
+            Optional[Dict]: stepSize/tickSize，获取失败时返回None
+        """
+        now = monotonic()
+        if now >= self._symbol_filters_expire:
+            try:
+                info = self.futures_client.exchange_info()
+            except Exception as e:
+                logger.error(f"Failed to get exchange info: {e}")
+                return self._symbol_filters.get(symbol)
+            filters: Dict[str, Dict[str, Decimal]] = {}
+            for item in info.get('symbols', []):
+                entry = {}
+                for f in item.get('filters', []):
+                    if f['filterType'] == 'LOT_SIZE':
+                        entry['stepSize'] = Decimal(f['stepSize'])
+                    elif f['filterType'] == 'PRICE_FILTER':
+                        entry['tickSize'] = Decimal(f['tickSize'])
+                filters[item['symbol']] = entry
+            self._symbol_filters = filters
+            self._symbol_filters_expire = now + EXCHANGE_INFO_TTL
+        return self._symbol_filters.get(symbol)
+
+    def _quantize(self, symbol: str, quantity: float, price: Optional[float] = None):
+        """
+        按交易规则向下取整数量和价格，避免因精度错误白白浪费一次请求
 
+        Args:
+            symbol: 交易对
+            quantity: 数量
+            price: 价格
+
+        Returns:
+            Tuple[float, Optional[float]]: 取整后的数量和价格
+        """
+        filters = self._get_symbol_filters(symbol)
+        if not filters:
+            return quantity, price
+        step = filters.get('stepSize')
+        if step:
+            quantity = float((Decimal(str(quantity)) / step).to_integral_value(rounding=ROUND_DOWN) * step)
+        tick = filters.get('tickSize')
+        if tick and price is not None:
+            price = float((Decimal(str(price)) / tick).to_integral_value(rounding=ROUND_DOWN) * tick)
+        return quantity, price
+
+    @staticmethod
+    def _format_decimal(value: float) -> str:
+        """
+        把数量/价格格式化为定点小数字符串，避免 str(float) 产生交易所拒绝的科学计数法（如 1e-05）
+
+        Args:
+            value: 数量或价格
+
+        Returns:
+            str: 定点小数字符串
+        """
+        return format(Decimal(str(value)), 'f')
+
+    @_safe(dict)
     def place_market_order(
             self,
             symbol: str,
@@ -225,18 +604,18 @@ class ClientBinance(ClientInterface):
         Returns:
             Dict: 订单信息
         """
-        try:
-            return self.futures_client.new_order(
-                symbol=symbol,
-                side=side,
-                type=ORDER_TYPE_MARKET,
-                quantity=quantity,
-                reduceOnly=reduce_only
-            )
-        except Exception as e:
-            logger.error(f"Failed to place market order: {e}")
-            return {}
+        if self.fast_order:
+            return self._fast_place_order(symbol, side, ORDER_TYPE_MARKET, quantity, reduce_only=reduce_only)
+        params = self._build_order_params(
+            symbol=symbol,
+            side=side,
+            order_type=ORDER_TYPE_MARKET,
+            quantity=quantity,
+            reduce_only=reduce_only
+        )
+        return self.futures_client.new_order(**params)
 
+    @_safe(dict)
     def place_limit_order(
             self,
             symbol: str,
@@ -260,20 +639,179 @@ class ClientBinance(ClientInterface):
         Returns:
             Dict: 订单信息
         """
-        try:
-            return self.futures_client.new_order(
-                symbol=symbol,
-                side=side,
-                type=ORDER_TYPE_LIMIT,
-                timeInForce=time_in_force,
-                quantity=quantity,
-                price=price,
-                reduceOnly=reduce_only
-            )
-        except Exception as e:
-            logger.error(f"Failed to place limit order: {e}")
+        params = self._build_order_params(
+            symbol=symbol,
+            side=side,
+            order_type=ORDER_TYPE_LIMIT,
+            quantity=quantity,
+            price=price,
+            time_in_force=time_in_force,
+            reduce_only=reduce_only
+        )
+        return self.futures_client.new_order(**params)
+
+    def _build_order_params(
+            self,
+            symbol: str,
+            side: str,
+            order_type: str,
+            quantity: float,
+            price: Optional[float] = None,
+            time_in_force: Optional[str] = None,
+            reduce_only: bool = False
+    ) -> Dict[str, Any]:
+        """
+        构造并校验下单参数，单笔下单与批量下单共用
+
+        Args:
+            symbol: 交易对
+            side: 方向 (BUY/SELL)
+            order_type: 订单类型 (MARKET/LIMIT)
+            quantity: 数量
+            price: 价格（限价单必填）
+            time_in_force: 有效期（限价单默认GTC）
+            reduce_only: 是否只减仓
+
+        Returns:
+            Dict: new_order 参数
+        """
+        if side not in (SIDE_BUY, SIDE_SELL):
+            raise ValueError(f"Invalid order side: {side}")
+        quantity, price = self._quantize(symbol, quantity, price)
+        if quantity <= 0:
+            raise ValueError(f"Invalid order quantity: {quantity}")
+
+        params = {
+            'symbol': symbol,
+            'side': side,
+            'type': order_type,
+            'quantity': quantity,
+            'reduceOnly': reduce_only,
+            'newClientOrderId': self._next_client_order_id(symbol)
+        }
+        if order_type == ORDER_TYPE_LIMIT:
+            if price is None or price <= 0:
+                raise ValueError(f"Invalid limit order price: {price}")
+            params['price'] = price
+            params['timeInForce'] = time_in_force or TIME_IN_FORCE_GTC
+        return params
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _order_template(symbol: str, side: str, order_type: str, reduce_only: bool) -> str:
+        """
+        生成下单请求中固定不变的参数部分，按交易对/方向/类型缓存
+
+        Args:
+            symbol: 交易对
+            side: 方向 (BUY/SELL)
+            order_type: 订单类型
+            reduce_only: 是否只减仓
+
+        Returns:
+            str: 已编码的查询字符串前缀
+        """
+        return f"symbol={symbol}&side={side}&type={order_type}&reduceOnly={str(reduce_only).lower()}&"
+
+    def _fast_place_order(
+            self,
+            symbol: str,
+            side: str,
+            order_type: str,
+            quantity: float,
+            price: Optional[float] = None,
+            reduce_only: bool = False
+    ) -> Dict:
+        """
+        快速下单路径：参数经 _build_order_params 校验与取整后，用预编码的模板拼接请求体并直接签名发送，
+        跳过 urlencode
+
+        Args:
+            symbol: 交易对
+            side: 方向 (BUY/SELL)
+            order_type: 订单类型 (MARKET/LIMIT)
+            quantity: 数量
+            price: 价格（限价单必填）
+            reduce_only: 是否只减仓
+
+        Returns:
+            Dict: 订单信息
+        """
+        # 与普通下单路径相同的方向/数量/价格校验
+        params = self._build_order_params(
+            symbol=symbol,
+            side=side,
+            order_type=order_type,
+            quantity=quantity,
+            price=price,
+            reduce_only=reduce_only
+        )
+        body = (
+            f"{self._order_template(symbol, side, order_type, reduce_only)}"
+            f"quantity={self._format_decimal(params['quantity'])}"
+        )
+        if order_type == ORDER_TYPE_LIMIT:
+            body += f"&price={self._format_decimal(params['price'])}&timeInForce={params['timeInForce']}"
+        body += f"&newClientOrderId={params['newClientOrderId']}&timestamp={self._timestamp_ms()}"
+        signature = self.futures_client._get_sign(body)
+        response = self.futures_client.session.post(
+            f"{self.futures_client.base_url}/fapi/v1/order",
+            data=f"{body}&signature={signature}",
+            headers={'Content-Type': 'application/x-www-form-urlencoded'}
+        )
+        if response.status_code != 200:
+            logger.error(f"Failed to place order: {response.status_code} {response.text}")
             return {}
+        return orjson.loads(response.content)
 
+    def place_batch_orders(self, orders: List[Dict[str, Any]]) -> List[Dict]:
+        """
+        批量下单，每个请求最多5笔订单（/fapi/v1/batchOrders）
+
+        Args:
+            orders: 订单列表，每项与 new_order 参数一致
+                (symbol/side/type/quantity/price/timeInForce/reduceOnly)
+
+        Returns:
+            List[Dict]: 与输入顺序一致的下单结果，失败的订单为交易所错误信息或空字典
+        """
+        results: List[Dict] = [{} for _ in orders]
+        batch: List[Dict[str, Any]] = []
+        indexes: List[int] = []
+        for i, order in enumerate(orders):
+            try:
+                params = self._build_order_params(
+                    symbol=order['symbol'],
+                    side=order['side'],
+                    order_type=order['type'],
+                    quantity=order['quantity'],
+                    price=order.get('price'),
+                    time_in_force=order.get('timeInForce'),
+                    reduce_only=order.get('reduceOnly', False)
+                )
+            except Exception as e:
+                logger.error(f"Invalid batch order {i}: {e}")
+                continue
+            # 批量接口要求参数为字符串，数量和价格按定点小数格式化
+            params['reduceOnly'] = 'true' if params['reduceOnly'] else 'false'
+            params['quantity'] = self._format_decimal(params['quantity'])
+            if 'price' in params:
+                params['price'] = self._format_decimal(params['price'])
+            batch.append({k: str(v) for k, v in params.items()})
+            indexes.append(i)
+
+        for start in range(0, len(batch), BATCH_ORDER_LIMIT):
+            chunk = batch[start:start + BATCH_ORDER_LIMIT]
+            try:
+                statuses = self.futures_client.new_batch_order(batchOrders=orjson.dumps(chunk).decode())
+            except Exception as e:
+                logger.error(f"Failed to place batch orders: {e}")
+                continue
+            for i, status in zip(indexes[start:start + BATCH_ORDER_LIMIT], statuses):
+                results[i] = status
+        return results
+
+    @_safe(dict)
     def cancel_order(self, symbol: str, order_id: int) -> Dict:
         """
         取消订单
@@ -285,18 +823,42 @@ class ClientBinance(ClientInterface):
         Returns:
             Dict: 取消结果
         """
-        try:
-            return self.futures_client.cancel_order(
-                symbol=symbol,
-                orderId=order_id
-            )
-        except Exception as e:
-            logger.error(f"Failed to cancel order: {e}")
-            return {}
+        return self.futures_client.cancel_order(
+            symbol=symbol,
+            orderId=order_id
+        )
+
+    def cancel_orders_batch(self, symbol: str, order_ids: List[int]) -> List[Dict]:
+        """
+        批量取消订单，每个请求最多10笔订单（DELETE /fapi/v1/batchOrders）
+
+        Args:
+            symbol: 交易对
+            order_ids: 订单ID列表
+
+        Returns:
+            List[Dict]: 与输入顺序一致的取消结果，请求失败的订单为空字典
+        """
+        results: List[Dict] = []
+        for start in range(0, len(order_ids), BATCH_CANCEL_LIMIT):
+            chunk = list(order_ids[start:start + BATCH_CANCEL_LIMIT])
+            try:
+                results.extend(self.futures_client.cancel_batch_order(
+                    symbol=symbol,
+                    orderIdList=chunk,
+                    origClientOrderIdList=[]
+                ))
+            except Exception as e:
+                logger.error(f"Failed to cancel batch orders: {e}")
+                results.extend({} for _ in chunk)
+        return results
 
+    @_safe(list)
     def cancel_all_orders(self, symbol: str) -> List[Dict]:
         """
         取消所有订单
+
+        只取消部分订单时，使用 cancel_orders_batch 代替逐个调用 cancel_order
         
         Args:
             symbol: 交易对
@@ -304,14 +866,34 @@ class ClientBinance(ClientInterface):
         Returns:
             List[Dict]: 取消结果
         """
-        try:
-            return self.futures_client.cancel_open_orders(
-                symbol=symbol
-            )
-        except Exception as e:
-            logger.error(f"Failed to cancel all orders: {e}")
-            return []
+        return self.futures_client.cancel_open_orders(
+            symbol=symbol
+        )
 
+    def _is_negative_cached(self, key: Tuple) -> bool:
+        """查询条件是否在短时间内返回过空结果"""
+        return monotonic() - self._neg_cache.get(key, 0.0) < NEGATIVE_CACHE_TTL
+
+    def _remember_empty(self, key: Tuple, result: List[Dict]) -> List[Dict]:
+        """
+        记录空结果，并定期清理过期的记录
+
+        Args:
+            key: 查询条件
+            result: 查询结果
+
+        Returns:
+            List[Dict]: 原样返回查询结果
+        """
+        now = monotonic()
+        if not result:
+            self._neg_cache[key] = now
+        if now - self._neg_cache_swept > NEGATIVE_CACHE_SWEEP:
+            self._neg_cache = {k: t for k, t in self._neg_cache.items() if now - t < NEGATIVE_CACHE_SWEEP}
+            self._neg_cache_swept = now
+        return result
+
+    @_safe(list)
     def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict]:
         """
         获取未完成订单
@@ -322,12 +904,12 @@ class ClientBinance(ClientInterface):
         Returns:
             List[Dict]: 订单列表
         """
-        try:
-            return self.futures_client.get_open_orders(symbol=symbol)
-        except Exception as e:
-            logger.error(f"Failed to get open orders: {e}")
+        key = ('open_orders', symbol)
+        if self._is_negative_cached(key):
             return []
+        return self._remember_empty(key, self.futures_client.get_open_orders(symbol=symbol))
 
+    @_safe(dict)
     def get_order(self, symbol: str, order_id: int) -> Dict:
         """
         获取订单信息
@@ -339,15 +921,12 @@ class ClientBinance(ClientInterface):
         Returns:
             Dict: 订单信息
         """
-        try:
-            return self.futures_client.get_order(
-                symbol=symbol,
-                orderId=order_id
-            )
-        except Exception as e:
-            logger.error(f"Failed to get order: {e}")
-            return {}
+        return self.futures_client.get_order(
+            symbol=symbol,
+            orderId=order_id
+        )
 
+    @_safe(list)
     def get_all_orders(
             self,
             symbol: str,
@@ -367,21 +946,21 @@ class ClientBinance(ClientInterface):
         Returns:
             List[Dict]: 订单列表
         """
-        try:
-            params = {
-                'symbol': symbol,
-                'limit': limit
-            }
-            if start_time:
-                params['startTime'] = start_time
-            if end_time:
-                params['endTime'] = end_time
-
-            return self.futures_client.get_all_orders(**params)
-        except Exception as e:
-            logger.error(f"Failed to get all orders: {e}")
+        params = {
+            'symbol': symbol,
+            'limit': limit
+        }
+        if start_time:
+            params['startTime'] = start_time
+        if end_time:
+            params['endTime'] = end_time
+
+        key = ('all_orders', symbol, limit, start_time, end_time)
+        if self._is_negative_cached(key):
             return []
+        return self._remember_empty(key, self.futures_client.get_all_orders(**params))
 
+    @_safe(list)
     def get_klines(
             self,
             symbol: str,
@@ -403,21 +982,52 @@ class ClientBinance(ClientInterface):
         Returns:
             List[List]: K线数据
         """
-        try:
-            params = {
-                'symbol': symbol,
-                'interval': interval,
-                'limit': limit
-            }
-            if start_time:
-                params['startTime'] = start_time
-            if end_time:
-                params['endTime'] = end_time
-
-            return self.futures_client.klines(**params)
-        except Exception as e:
-            logger.error(f"Failed to get klines: {e}")
-            return []
+        params = {
+            'symbol': symbol,
+            'interval': interval,
+            'limit': limit
+        }
+        if start_time:
+            params['startTime'] = start_time
+        if end_time:
+            params['endTime'] = end_time
+
+        return self.futures_client.klines(**params)
+
+    def get_klines_df(
+            self,
+            symbol: str,
+            interval: str,
+            limit: int = 500,
+            start_time: Optional[int] = None,
+            end_time: Optional[int] = None
+    ) -> "pd.DataFrame":
+        """
+        获取K线数据并一次性转换为列式 DataFrame
+
+        Args:
+            symbol: 交易对
+            interval: 时间间隔
+            limit: 返回数量限制
+            start_time: 开始时间
+            end_time: 结束时间
+
+        Returns:
+            pd.DataFrame: K线数据，列顺序见 KLINE_COLUMNS
+        """
+        # 按需导入，避免只下单的进程加载 numpy/pandas
+        import numpy as np
+        import pandas as pd
+
+        raw = self.get_klines(symbol, interval, limit, start_time, end_time)
+        if not raw:
+            return pd.DataFrame(columns=list(self.KLINE_COLUMNS))
+        arr = np.asarray(raw, dtype=object)
+        # 按列整体转换类型，避免逐个元素 float()
+        return pd.DataFrame({
+            name: arr[:, i].astype(dtype)
+            for i, (name, dtype) in enumerate(self.KLINE_COLUMNS.items())
+        })
 
     def get_mark_price(self, symbol: Optional[str] = None) -> Dict:
         """
@@ -435,6 +1045,7 @@ class ClientBinance(ClientInterface):
             logger.error(f"Failed to get mark price: {e}")
             return {} if symbol else []
 
+    @_safe(list)
     def get_funding_rate(
             self,
             symbol: str,
@@ -454,27 +1065,71 @@ class ClientBinance(ClientInterface):
         Returns:
             List[Dict]: 资金费率数据
         """
-        try:
-            params = {
-                'symbol': symbol,
-                'limit': limit
-            }
-            if start_time:
-                params['startTime'] = start_time
-            if end_time:
-                params['endTime'] = end_time
-
-            return self.futures_client.funding_rate(**params)
-        except Exception as e:
-            logger.error(f"Failed to get funding rate: {e}")
+        params = {
+            'symbol': symbol,
+            'limit': limit
+        }
+        if start_time:
+            params['startTime'] = start_time
+        if end_time:
+            params['endTime'] = end_time
+
+        key = ('funding_rate', symbol, limit, start_time, end_time)
+        if self._is_negative_cached(key):
             return []
+        return self._remember_empty(key, self.futures_client.funding_rate(**params))
+
+    async def aget_position_risk(self, symbol: Optional[str] = None) -> List[Dict]:
+        """异步获取持仓风险，参数同 get_position_risk"""
+        return await asyncio.to_thread(self.get_position_risk, symbol)
+
+    async def aget_account_info(self) -> Dict:
+        """异步获取账户信息，参数同 get_account_info"""
+        return await asyncio.to_thread(self.get_account_info)
+
+    async def aget_balance(self) -> List[Dict]:
+        """异步获取账户余额，参数同 get_balance"""
+        return await asyncio.to_thread(self.get_balance)
+
+    async def aget_open_orders(self, symbol: Optional[str] = None) -> List[Dict]:
+        """异步获取未完成订单，参数同 get_open_orders"""
+        return await asyncio.to_thread(self.get_open_orders, symbol)
+
+    async def aget_mark_price(self, symbol: Optional[str] = None) -> Dict:
+        """异步获取标记价格，参数同 get_mark_price"""
+        return await asyncio.to_thread(self.get_mark_price, symbol)
+
+    async def aget_funding_rate(self, symbol: str, limit: int = 100) -> List[Dict]:
+        """异步获取资金费率历史，参数同 get_funding_rate"""
+        return await asyncio.to_thread(self.get_funding_rate, symbol, limit)
+
+    async def snapshot(self) -> Dict[str, Any]:
+        """
+        并发获取账户信息、余额和持仓风险，耗时为最慢请求而非三者之和
+
+        用法: snapshot = asyncio.run(client.snapshot())
+
+        Returns:
+            Dict: 包含 account/balance/positions 的账户快照
+        """
+        account, balance, positions = await asyncio.gather(
+            self.aget_account_info(),
+            self.aget_balance(),
+            self.aget_position_risk()
+        )
+        return {'account': account, 'balance': balance, 'positions': positions}
 
     def close_websocket(self):
         """关闭WebSocket连接"""
+        self._closed = True
+        if self._keepalive_task:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
         if self.ws_client:
             self.ws_client.stop()
             self.ws_client = None
 
+    @_safe(float, BinanceAPIException)
     def get_symbol_price(self, symbol: str) -> float:
         """
         获取交易对当前价格
@@ -485,13 +1140,10 @@ class ClientBinance(ClientInterface):
         Returns:
             float: 当前价格
         """
-        try:
-            ticker = self.spot_client.get_symbol_ticker(symbol=symbol)
-            return float(ticker['price'])
-        except BinanceAPIException as e:
-            logger.error(f"Failed to get price: {e}")
-            return 0.0
+        ticker = self.spot_client.get_symbol_ticker(symbol=symbol)
+        return float(ticker['price'])
 
+    @_safe(list, BinanceAPIException)
     def get_klines_spot(
             self,
             symbol: str,
@@ -509,17 +1161,14 @@ class ClientBinance(ClientInterface):
         Returns:
             list: K线数据列表
         """
-        try:
-            klines = self.spot_client.get_klines(
-                symbol=symbol,
-                interval=interval,
-                limit=limit
-            )
-            return klines
-        except BinanceAPIException as e:
-            logger.error(f"Failed to get klines: {e}")
-            return []
+        klines = self.spot_client.get_klines(
+            symbol=symbol,
+            interval=interval,
+            limit=limit
+        )
+        return klines
 
+    @_safe(dict, BinanceAPIException)
     def place_order(
             self,
             symbol: str,
@@ -541,22 +1190,21 @@ class ClientBinance(ClientInterface):
         Returns:
             dict: 订单信息
         """
-        try:
-            params = {
-                'symbol': symbol,
-                'side': side,
-                'type': type,
-                'quantity': quantity
-            }
-
-            if price is not None:
-                params['price'] = price
-
-            return self.futures_client.create_order(**params)
-        except BinanceAPIException as e:
-            logger.error(f"Failed to place order: {e}")
-            return {}
+        quantity, price = self._quantize(symbol, quantity, price)
+        params = {
+            'symbol': symbol,
+            'side': side,
+            'type': type,
+            'quantity': quantity,
+            'newClientOrderId': self._next_client_order_id(symbol)
+        }
+
+        if price is not None:
+            params['price'] = price
 
+        return self.futures_client.create_order(**params)
+
+    @_safe(dict, BinanceAPIException)
     def cancel_order_spot(self, symbol: str, order_id: str) -> dict:
         """
         取消订单
@@ -568,15 +1216,12 @@ class ClientBinance(ClientInterface):
         Returns:
             dict: 取消结果
         """
-        try:
-            return self.client.cancel_order(
-                symbol=symbol,
-                orderId=order_id
-            )
-        except BinanceAPIException as e:
-            logger.error(f"Failed to cancel order: {e}")
-            return {}
+        return self.client.cancel_order(
+            symbol=symbol,
+            orderId=order_id
+        )
 
+    @_safe(list, BinanceAPIException)
     def get_open_orders_spot(self, symbol: str = None) -> list:
         """
         获取未完成订单
@@ -587,12 +1232,9 @@ class ClientBinance(ClientInterface):
         Returns:
             list: 订单列表
         """
-        try:
-            return self.spot_client.get_open_orders(symbol=symbol)
-        except BinanceAPIException as e:
-            logger.error(f"Failed to get open orders: {e}")
-            return []
+        return self.spot_client.get_open_orders(symbol=symbol)
 
+    @_safe(dict, BinanceAPIException)
     def get_order_status(self, symbol: str, order_id: str) -> dict:
         """
         获取订单状态
@@ -604,15 +1246,12 @@ class ClientBinance(ClientInterface):
         Returns:
             dict: 订单信息
         """
-        try:
-            return self.spot_client.get_order(
-                symbol=symbol,
-                orderId=order_id
-            )
-        except BinanceAPIException as e:
-            logger.error(f"Failed to get order status: {e}")
-            return {}
+        return self.spot_client.get_order(
+            symbol=symbol,
+            orderId=order_id
+        )
 
+    @_safe(dict, BinanceAPIException)
     def get_account(self) -> dict:
         """
         获取账户信息
@@ -620,8 +1259,4 @@ class ClientBinance(ClientInterface):
         Returns:
             dict: 账户信息
         """
-        try:
-            return self.spot_client.get_account()
-        except BinanceAPIException as e:
-            logger.error(f"Failed to get account info: {e}")
-            return {}
+        return self.spot_client.get_account()
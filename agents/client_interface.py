@@ -11,7 +11,7 @@
 """
 from typing import Optional, Dict, List, Any
 from abc import ABC, abstractmethod
-from binance.enums import (
+from const.const import (
     ORDER_TYPE_MARKET,
     ORDER_TYPE_LIMIT,
     TIME_IN_FORCE_GTC,
@@ -21,7 +21,14 @@ from binance.enums import (
 
 
 class ClientInterface(ABC):
-    """币安客户端"""
+    """
+    币安客户端
+
+    交易相关方法为抽象方法，实现类缺少时实例化即报错；
+    WebSocket、现货等可选功能提供空实现，模拟盘等实现类无需重复声明
+    """
+
+    __slots__ = ('_config',)
 
     def __init__(self, config: Dict[str, any] = None):
         """
@@ -33,7 +40,6 @@ class ClientInterface(ABC):
         # 基础配置
         self._config = config
 
-    @abstractmethod
     def init_websocket(self, message_handler=None):
         """
         初始化WebSocket连接
@@ -43,7 +49,6 @@ class ClientInterface(ABC):
         """
         pass
 
-    @abstractmethod
     def subscribe_kline(self, symbol: str, interval: str, callback=None):
         """
         订阅K线数据
@@ -55,7 +60,6 @@ class ClientInterface(ABC):
         """
         pass
 
-    @abstractmethod
     def get_listen_key(self) -> str:
         """
         获取WebSocket listenKey
@@ -65,7 +69,6 @@ class ClientInterface(ABC):
         """
         pass
 
-    @abstractmethod
     def keep_alive_listen_key(self):
         """延长listenKey有效期"""
         pass
@@ -187,7 +190,6 @@ class ClientInterface(ABC):
         """
         pass
 
-    @abstractmethod
     def cancel_all_orders(self, symbol: str) -> List[Dict]:
         """
         取消所有订单
@@ -249,7 +251,6 @@ class ClientInterface(ABC):
         """
         pass
 
-    @abstractmethod
     def get_klines(
             self,
             symbol: str,
@@ -273,7 +274,6 @@ class ClientInterface(ABC):
         """
         pass
 
-    @abstractmethod
     def get_mark_price(self, symbol: Optional[str] = None) -> Dict:
         """
         获取标记价格
@@ -286,7 +286,6 @@ class ClientInterface(ABC):
         """
         pass
 
-    @abstractmethod
     def get_funding_rate(
             self,
             symbol: str,
@@ -308,12 +307,10 @@ class ClientInterface(ABC):
         """
         pass
 
-    @abstractmethod
     def close_websocket(self):
         """关闭WebSocket连接"""
         pass
 
-    @abstractmethod
     def get_symbol_price(self, symbol: str) -> float:
         """
         获取交易对当前价格
@@ -326,7 +323,6 @@ class ClientInterface(ABC):
         """
         pass
 
-    @abstractmethod
     def get_klines_spot(
             self,
             symbol: str,
@@ -346,7 +342,6 @@ class ClientInterface(ABC):
         """
         pass
 
-    @abstractmethod
     def place_order(
             self,
             symbol: str,
@@ -370,7 +365,6 @@ class ClientInterface(ABC):
         """
         pass
 
-    @abstractmethod
     def cancel_order_spot(self, symbol: str, order_id: str) -> dict:
         """
         取消订单
@@ -384,7 +378,6 @@ class ClientInterface(ABC):
         """
         pass
 
-    @abstractmethod
     def get_open_orders_spot(self, symbol: str = None) -> list:
         """
         获取未完成订单
@@ -397,7 +390,6 @@ class ClientInterface(ABC):
         """
         pass
 
-    @abstractmethod
     def get_order_status(self, symbol: str, order_id: str) -> dict:
         """
         获取订单状态
@@ -411,7 +403,6 @@ class ClientInterface(ABC):
         """
         pass
 
-    @abstractmethod
     def get_account(self) -> dict:
         """
         获取账户信息
@@ -10,19 +10,18 @@
 - 交易记录
 """
 
-import json
-import uuid
 from datetime import datetime
-from typing import Optional, Dict, List, Any
-from decimal import Decimal
+from collections import deque
+from typing import Optional, Dict, List, Any, Deque
 
-import pandas as pd
 import numpy as np
 
+from agents._fastmath import apply_fills
 from agents.client_interface import ClientInterface
 from utils.logger import Logger
-from const.const import Fee, USDT
-from binance.enums import (
+from const.const import (
+    Fee,
+    USDT,
     ORDER_TYPE_MARKET,
     ORDER_TYPE_LIMIT,
     TIME_IN_FORCE_GTC,
@@ -32,9 +31,25 @@ from binance.enums import (
 
 logger = Logger.get_logger()
 
+# 限价单列式存储中的编码
+_SIDE_BUY = 0
+_SIDE_SELL = 1
+
 class ClientSimulation(ClientInterface):
     """币安模拟客户端"""
 
+    __slots__ = (
+        'api_key', 'api_secret', 'testnet', 'window_size',
+        'default_leverage', 'default_margin_type', 'leverage', 'margin_type',
+        '_liq_long_factor', '_liq_short_factor',
+        'balance', 'positions', 'orders', 'trades', 'market_prices', 'klines_data',
+        '_current_time_ms', '_max_history', '_orders_by_id', '_orders_by_symbol', '_open_orders_by_symbol',
+        '_next_order_id', '_next_trade_id',
+        '_mkt_version', '_pnl_cache_version', '_pnl_total_cache',
+        '_sym_row', '_row_symbol', '_pos_size', '_pos_entry', '_pos_mark',
+        '_order_price', '_order_side', '_order_symbol_id', '_order_count', '_order_dicts', '_order_row', '_order_free',
+    )
+
     def __init__(self,config: Dict[str, any] = None):
         """
         初始化模拟客户端
@@ -55,25 +70,71 @@ class ClientSimulation(ClientInterface):
         # 交易配置
         self.default_leverage = config['leverage']  # 默认杠杆
         self.default_margin_type = config['margin_type']  # 默认保证金类型 ISOLATED/CROSSED
+        self.leverage = self.default_leverage  # 当前杠杆
+        self.margin_type = self.default_margin_type  # 当前保证金类型
+        self._liq_long_factor: float = 0.0  # 多仓清算价格系数
+        self._liq_short_factor: float = 0.0  # 空仓清算价格系数
+        self._recompute_liq_factors()
         
         # 账户状态
         self.balance = config['initial_balance']
         self.positions = {}  # 当前持仓
-        self.orders = []     # 订单历史
-        self.trades = []     # 交易历史
+        # 订单/成交历史只保留最近 max_order_history 条，长时间回测内存有界
+        self._max_history: int = config.get('max_order_history', 1_000_000)
+        self.orders: Deque[Dict] = deque()  # 订单历史
+        self.trades: Deque[Dict] = deque(maxlen=self._max_history)  # 交易历史
+        self._orders_by_id: Dict[str, Dict] = {}  # 订单ID -> 订单
+        self._orders_by_symbol: Dict[str, Deque[Dict]] = {}  # 交易对 -> 订单列表
+        self._open_orders_by_symbol: Dict[str, Dict[str, Dict]] = {}  # 交易对 -> 未完成订单（按下单顺序）
+        self._next_order_id: int = 1  # 订单ID计数器
+        self._next_trade_id: int = 1  # 成交ID计数器
         
         # 市场数据
         self.market_prices = {}  # 当前市场价格
         self.klines_data = {}    # K线数据缓存
+        self._current_time_ms: int = int(datetime.now().timestamp() * 1000)  # 当前行情时间（毫秒）
+
+        # 行情/持仓版本号，未实现盈亏按版本缓存
+        self._mkt_version: int = 0
+        self._pnl_cache_version: int = -1
+        self._pnl_total_cache: float = 0.0
+
+        # 交易对 -> 行号，供列式数组索引
+        self._sym_row: Dict[str, int] = {}
+        self._row_symbol: List[str] = []  # 行号 -> 交易对
+
+        # 持仓列式存储，按交易对行号索引；总盈亏和保证金直接向量化求和
+        self._pos_size = np.zeros(16, dtype=np.float64)  # 持仓数量
+        self._pos_entry = np.zeros(16, dtype=np.float64)  # 入场价格
+        self._pos_mark = np.zeros(16, dtype=np.float64)  # 标记价格
+
+        # 未完成限价单列式存储（SoA），成交检查时一次向量化扫描；
+        # 订单结束后行号回收复用，容量不足时翻倍
+        capacity = 1024
+        self._order_price = np.empty(capacity, dtype=np.float64)
+        self._order_side = np.empty(capacity, dtype=np.int8)
+        self._order_symbol_id = np.empty(capacity, dtype=np.int64)
+        self._order_count = 0
+        self._order_dicts: List[Optional[Dict]] = []  # 行号 -> 订单
+        self._order_row: Dict[str, int] = {}  # 订单ID -> 行号
+        self._order_free: List[int] = []  # 可复用的行号
         
         logger.info(f"模拟客户端初始化完成，初始余额: {self.balance} USDT")
         
     def set_leverage(self, symbol: str, leverage: int):
         """设置杠杆倍数"""
         self.leverage = leverage
+        self._recompute_liq_factors()
         logger.info(f"设置 {symbol} 杠杆倍数为 {leverage}x")
         return {'leverage': leverage}
         
+    def _recompute_liq_factors(self):
+        """杠杆变化时预计算清算价格系数（简化公式，维持保证金率 0.4%）"""
+        maintenance_margin_rate = 0.004  # 维持保证金率
+        inv_leverage = 1 / self.leverage
+        self._liq_long_factor = 1 - inv_leverage + maintenance_margin_rate
+        self._liq_short_factor = 1 + inv_leverage - maintenance_margin_rate
+
     def set_margin_type(self, symbol: str, margin_type: str):
         """设置保证金类型"""
         self.margin_type = margin_type
@@ -97,56 +158,6 @@ class ClientSimulation(ClientInterface):
                 })
         return positions
 
-    def keep_alive_listen_key(self):
-        pass
-
-    def get_listen_key(self) -> str:
-        pass
-
-    def subscribe_kline(self, symbol: str, interval: str, callback=None):
-        pass
-
-    def init_websocket(self, message_handler=None):
-        pass
-
-    def get_klines(self, symbol: str, interval: str, limit: int = 500, start_time: Optional[int] = None,
-                   end_time: Optional[int] = None) -> List[List]:
-        pass
-
-    def get_mark_price(self, symbol: Optional[str] = None) -> Dict:
-        pass
-
-    def get_funding_rate(self, symbol: str, limit: int = 100, start_time: Optional[int] = None,
-                         end_time: Optional[int] = None) -> List[Dict]:
-        pass
-
-    def close_websocket(self):
-        pass
-
-    def get_symbol_price(self, symbol: str) -> float:
-        pass
-
-    def get_klines_spot(self, symbol: str, interval: str, limit: int = 100) -> list:
-        pass
-
-    def place_order(self, symbol: str, side: str, type2: str, quantity: float, price: float = None) -> dict:
-        pass
-
-    def cancel_order_spot(self, symbol: str, order_id: str) -> dict:
-        pass
-
-    def get_open_orders_spot(self, symbol: str = None) -> list:
-        pass
-
-    def get_order_status(self, symbol: str, order_id: str) -> dict:
-        pass
-
-    def get_account(self) -> dict:
-        pass
-
-    def cancel_all_orders(self, symbol: str) -> List[Dict]:
-        pass
-        
     def get_account_info(self) -> Dict:
         """获取账户信息"""
         return {
@@ -181,7 +192,7 @@ class ClientSimulation(ClientInterface):
             return {}
             
         # 生成订单ID
-        order_id = str(uuid.uuid4())
+        order_id = self._new_order_id()
         
         # 创建订单记录
         order = {
@@ -193,17 +204,17 @@ class ClientSimulation(ClientInterface):
             'price': price,
             'reduceOnly': reduce_only,
             'status': 'FILLED',
-            'time': int(datetime.now().timestamp() * 1000)
+            'time': self._current_time_ms
         }
         
         # 更新持仓
         self._update_position(symbol, side, quantity, price)
         
         # 记录订单和交易
-        self.orders.append(order)
+        self._register_order(order)
         self.trades.append({
             'symbol': symbol,
-            'id': str(uuid.uuid4()),
+            'id': self._new_trade_id(),
             'orderId': order_id,
             'side': side,
             'price': price,
@@ -225,7 +236,7 @@ class ClientSimulation(ClientInterface):
     ) -> Dict:
         """下限价单"""
         # 生成订单ID
-        order_id = str(uuid.uuid4())
+        order_id = self._new_order_id()
         
         # 创建订单记录
         order = {
@@ -238,36 +249,105 @@ class ClientSimulation(ClientInterface):
             'timeInForce': time_in_force,
             'reduceOnly': reduce_only,
             'status': 'NEW',
-            'time': int(datetime.now().timestamp() * 1000)
+            'time': self._current_time_ms
         }
         
         # 记录订单
-        self.orders.append(order)
+        self._register_order(order)
+        self._append_limit_order(order)
         
         return order
+
+    def _register_order(self, order: Dict):
+        """记录订单并维护索引"""
+        order_id = order['orderId']
+        symbol = order['symbol']
+        if len(self.orders) >= self._max_history:
+            # 淘汰最旧的订单；仍未完成的订单保留在未完成索引中，可继续成交/撤销
+            oldest = self.orders.popleft()
+            self._orders_by_id.pop(oldest['orderId'], None)
+            self._orders_by_symbol[oldest['symbol']].popleft()
+        self.orders.append(order)
+        self._orders_by_id[order_id] = order
+        self._orders_by_symbol.setdefault(symbol, deque()).append(order)
+        if order['status'] == 'NEW':
+            self._open_orders_by_symbol.setdefault(symbol, {})[order_id] = order
+
+    def _new_order_id(self) -> str:
+        """生成订单ID（本次运行内递增唯一），以字符串保存，查找时只需转换一次入参"""
+        n = self._next_order_id
+        self._next_order_id = n + 1
+        return str(n)
+
+    def _new_trade_id(self) -> int:
+        """生成成交ID（本次运行内递增唯一）"""
+        n = self._next_trade_id
+        self._next_trade_id = n + 1
+        return n
+
+    def _symbol_row(self, symbol: str) -> int:
+        """获取交易对的行号，不存在则分配"""
+        row = self._sym_row.get(symbol)
+        if row is None:
+            row = len(self._sym_row)
+            self._sym_row[symbol] = row
+            self._row_symbol.append(symbol)
+            if row == len(self._pos_size):
+                pad = np.zeros(row, dtype=np.float64)
+                self._pos_size = np.concatenate((self._pos_size, pad))
+                self._pos_entry = np.concatenate((self._pos_entry, pad))
+                self._pos_mark = np.concatenate((self._pos_mark, pad))
+        return row
+
+    def _append_limit_order(self, order: Dict):
+        """将限价单追加到列式存储"""
+        if self._order_free:
+            row = self._order_free.pop()
+            self._order_dicts[row] = order
+        else:
+            row = self._order_count
+            if row == len(self._order_price):
+                capacity = row * 2
+                self._order_price = np.resize(self._order_price, capacity)
+                self._order_side = np.resize(self._order_side, capacity)
+                self._order_symbol_id = np.resize(self._order_symbol_id, capacity)
+            self._order_dicts.append(order)
+            self._order_count = row + 1
+        self._order_price[row] = order['price']
+        self._order_side[row] = _SIDE_BUY if order['side'] == SIDE_BUY else _SIDE_SELL
+        self._order_symbol_id[row] = self._symbol_row(order['symbol'])
+        self._order_row[order['orderId']] = row
+
+    def _set_order_status(self, order: Dict, status: str):
+        """更新订单状态，非 NEW 状态移出未完成订单索引并回收列式存储行"""
+        order['status'] = status
+        if status != 'NEW':
+            self._open_orders_by_symbol.get(order['symbol'], {}).pop(order['orderId'], None)
+            row = self._order_row.pop(order['orderId'], None)
+            if row is not None:
+                self._order_dicts[row] = None
+                self._order_free.append(row)
         
     def cancel_order(self, symbol: str, order_id: int) -> Dict:
         """取消订单"""
-        for order in self.orders:
-            if str(order['orderId']) == str(order_id) and order['symbol'] == symbol:
-                if order['status'] == 'NEW':
-                    order['status'] = 'CANCELED'
-                    return order
-        return {}
+        order = self._open_orders_by_symbol.get(symbol, {}).get(str(order_id))
+        if order is None:
+            return {}
+        self._set_order_status(order, 'CANCELED')
+        return order
         
     def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict]:
         """获取未完成订单"""
-        return [
-            order for order in self.orders
-            if (symbol is None or order['symbol'] == symbol) and order['status'] == 'NEW'
-        ]
+        if symbol is not None:
+            return list(self._open_orders_by_symbol.get(symbol, {}).values())
+        return [order for orders in self._open_orders_by_symbol.values() for order in orders.values()]
         
     def get_order(self, symbol: str, order_id: int) -> Dict:
         """获取订单信息"""
-        for order in self.orders:
-            if str(order['orderId']) == str(order_id) and order['symbol'] == symbol:
-                return order
-        return {}
+        order = self._orders_by_id.get(str(order_id))
+        if order is None or order['symbol'] != symbol:
+            return {}
+        return order
         
     def get_all_orders(
         self,
@@ -277,7 +357,7 @@ class ClientSimulation(ClientInterface):
         end_time: Optional[int] = None
     ) -> List[Dict]:
         """获取所有订单"""
-        orders = [order for order in self.orders if order['symbol'] == symbol]
+        orders = list(self._orders_by_symbol.get(symbol, ()))
         
         if start_time:
             orders = [order for order in orders if order['time'] >= start_time]
@@ -286,45 +366,95 @@ class ClientSimulation(ClientInterface):
             
         return orders[-limit:]
         
-    def update_market_price(self, symbol: str, price: float):
-        """更新市场价格"""
+    def update_market_price(self, symbol: str, price: float, time_ms: Optional[int] = None):
+        """
+        更新市场价格
+
+        Args:
+            symbol: 交易对
+            price: 最新价格
+            time_ms: 行情时间（毫秒），回测时传入K线时间，缺省取当前时间
+        """
+        self._current_time_ms = time_ms or int(datetime.now().timestamp() * 1000)
         self.market_prices[symbol] = price
+        self._mkt_version += 1
+        row = self._sym_row.get(symbol)
+        if row is not None:
+            self._pos_mark[row] = price
         
         # 检查限价单是否可以成交
         self._check_limit_orders(symbol, price)
         
     def _check_limit_orders(self, symbol: str, price: float):
         """检查限价单是否可以成交"""
-        for order in self.orders:
-            if (order['symbol'] == symbol and 
-                order['status'] == 'NEW' and 
-                order['type'] == ORDER_TYPE_LIMIT):
-                
-                if (order['side'] == SIDE_BUY and price <= order['price']) or \
-                   (order['side'] == SIDE_SELL and price >= order['price']):
-                    # 限价单成交
-                    order['status'] = 'FILLED'
-                    self._update_position(
-                        symbol,
-                        order['side'],
-                        order['quantity'],
-                        order['price']
-                    )
-                    
-                    # 记录成交
-                    self.trades.append({
-                        'symbol': symbol,
-                        'id': str(uuid.uuid4()),
-                        'orderId': order['orderId'],
-                        'side': order['side'],
-                        'price': order['price'],
-                        'quantity': order['quantity'],
-                        'commission': self._calculate_commission(
-                            order['price'] * order['quantity']
-                        ),
-                        'time': int(datetime.now().timestamp() * 1000)
-                    })
+        open_orders = self._open_orders_by_symbol.get(symbol)
+        if not open_orders:
+            return
+
+        # 只取该交易对的未完成订单，一次向量化扫描找出所有触发的限价单
+        rows = np.fromiter((self._order_row[oid] for oid in open_orders), dtype=np.intp, count=len(open_orders))
+        order_price = self._order_price[rows]
+        order_side = self._order_side[rows]
+        hit = ((order_side == _SIDE_BUY) & (price <= order_price)) | \
+              ((order_side == _SIDE_SELL) & (price >= order_price))
+        for i in rows[hit]:
+            self._fill_limit_order(self._order_dicts[i])
+
+    def update_market_prices(self, symbol_ids: np.ndarray, prices: np.ndarray, time_ms: Optional[int] = None):
+        """
+        批量更新多个交易对的市场价格，所有交易对的限价单只做一次向量化成交检查
+
+        Args:
+            symbol_ids: 交易对行号数组（由 symbol_id 获取）
+            prices: 与 symbol_ids 对齐的最新价格数组
+            time_ms: 行情时间（毫秒），缺省取当前时间
+        """
+        symbol_ids = np.asarray(symbol_ids, dtype=np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+        self._current_time_ms = time_ms or int(datetime.now().timestamp() * 1000)
+        for row, price in zip(symbol_ids.tolist(), prices.tolist()):
+            self.market_prices[self._row_symbol[row]] = price
+        self._mkt_version += 1
+        self._pos_mark[symbol_ids] = prices
+
+        if not self._order_row:
+            return
+        # 所有未完成限价单按所属交易对取本次价格，未更新的交易对为 NaN，比较结果恒为 False
+        tick = np.full(len(self._row_symbol), np.nan)
+        tick[symbol_ids] = prices
+        rows = np.fromiter(self._order_row.values(), dtype=np.intp, count=len(self._order_row))
+        price = tick[self._order_symbol_id[rows]]
+        order_price = self._order_price[rows]
+        order_side = self._order_side[rows]
+        hit = ((order_side == _SIDE_BUY) & (price <= order_price)) | \
+              ((order_side == _SIDE_SELL) & (price >= order_price))
+        for i in rows[hit]:
+            self._fill_limit_order(self._order_dicts[i])
+
+    def _fill_limit_order(self, order: Dict):
+        """限价单成交：更新状态、持仓并记录成交"""
+        self._set_order_status(order, 'FILLED')
+        self._update_position(
+            order['symbol'],
+            order['side'],
+            order['quantity'],
+            order['price']
+        )
         
+        # 记录成交
+        self.trades.append({
+            'symbol': order['symbol'],
+            'id': self._new_trade_id(),
+            'orderId': order['orderId'],
+            'side': order['side'],
+            'price': order['price'],
+            'quantity': order['quantity'],
+            'commission': self._calculate_commission(
+                order['price'] * order['quantity']
+            ),
+            'time': self._current_time_ms
+        })
+
     def _update_position(self, symbol: str, side: str, quantity: float, price: float):
         """更新持仓信息"""
         if symbol not in self.positions:
@@ -353,6 +483,14 @@ class ClientSimulation(ClientInterface):
             )
             
         position['size'] = new_size
+
+        self._mkt_version += 1
+
+        # 同步列式存储，未有行情时标记价格取入场价格
+        row = self._symbol_row(symbol)
+        self._pos_size[row] = new_size
+        self._pos_entry[row] = position['entry_price']
+        self._pos_mark[row] = self.market_prices.get(symbol, position['entry_price'])
         
         # 更新余额（扣除手续费）
         commission = self._calculate_commission(price * quantity)
@@ -360,44 +498,73 @@ class ClientSimulation(ClientInterface):
         
         logger.info(f"更新持仓 {symbol}: 数量={new_size}, 入场价格={position['entry_price']:.2f}")
         
+    def symbol_id(self, symbol: str) -> int:
+        """获取交易对行号，供 apply_fills 批量接口使用"""
+        return self._symbol_row(symbol)
+
+    def apply_fills(self, symbol_ids: np.ndarray, sides: np.ndarray, quantities: np.ndarray, prices: np.ndarray):
+        """
+        批量应用成交（回放预先生成的成交序列），结果与逐笔调用 _update_position 一致
+
+        Args:
+            symbol_ids: 交易对行号数组（由 symbol_id 获取）
+            sides: 成交方向数组，1为买，-1为卖
+            quantities: 成交数量数组
+            prices: 成交价格数组
+        """
+        symbol_ids = np.ascontiguousarray(symbol_ids, dtype=np.int64)
+        if symbol_ids.size == 0:
+            return
+        self.balance = apply_fills(
+            self._pos_size, self._pos_entry, float(self.balance), symbol_ids,
+            np.ascontiguousarray(sides, dtype=np.int8),
+            np.ascontiguousarray(quantities, dtype=np.float64),
+            np.ascontiguousarray(prices, dtype=np.float64),
+            Fee.Taker)
+        self._mkt_version += 1
+
+        # 同步持仓字典和标记价格
+        touched = set(np.unique(symbol_ids).tolist())
+        for symbol, row in self._sym_row.items():
+            if row in touched:
+                entry = float(self._pos_entry[row])
+                self.positions[symbol] = {'size': float(self._pos_size[row]), 'entry_price': entry}
+                self._pos_mark[row] = self.market_prices.get(symbol, entry)
+        logger.info(f"批量应用成交 {symbol_ids.size} 笔，余额={self.balance:.2f}")
+
     def _calculate_commission(self, order_value: float) -> float:
         """计算手续费"""
         return order_value * Fee.Taker
         
     def _calculate_unrealized_pnl(self, symbol: str) -> float:
         """计算未实现盈亏"""
-        position = self.positions.get(symbol)
-        if not position or position['size'] == 0:
-            return 0
-            
-        current_price = self.market_prices.get(symbol, position['entry_price'])
-        pnl = (current_price - position['entry_price']) * position['size']
-        return pnl
+        row = self._sym_row.get(symbol)
+        if row is None:
+            return 0.0
+        return float((self._pos_mark[row] - self._pos_entry[row]) * self._pos_size[row])
+
+    def _refresh_pnl_cache(self):
+        """行情或持仓变化后重算总盈亏"""
+        self._pnl_total_cache = float(((self._pos_mark - self._pos_entry) * self._pos_size).sum())
+        self._pnl_cache_version = self._mkt_version
         
     def _calculate_total_unrealized_pnl(self) -> float:
         """计算总未实现盈亏"""
-        return sum(self._calculate_unrealized_pnl(symbol) for symbol in self.positions)
+        if self._pnl_cache_version != self._mkt_version:
+            self._refresh_pnl_cache()
+        return self._pnl_total_cache
         
     def _calculate_available_balance(self) -> float:
         """计算可用余额"""
-        used_margin = sum(
-            abs(pos['size'] * self.market_prices.get(sym, pos['entry_price'])) / self.leverage
-            for sym, pos in self.positions.items()
-        )
+        used_margin = float(np.abs(self._pos_size * self._pos_mark).sum()) / self.leverage
         return self.balance - used_margin
         
     def _calculate_liquidation_price(self, symbol: str) -> float:
         """计算清算价格"""
-        position = self.positions.get(symbol)
-        if not position or position['size'] == 0:
-            return 0
-            
-        # 简化的清算价格计算
-        maintenance_margin_rate = 0.004  # 维持保证金率
-        entry_price = position['entry_price']
-        size = position['size']
-        
-        if size > 0:
-            return entry_price * (1 - 1/self.leverage + maintenance_margin_rate)
-        else:
-            return entry_price * (1 + 1/self.leverage - maintenance_margin_rate)
\ No newline at end of file
+        row = self._sym_row.get(symbol)
+        if row is None:
+            return 0.0
+        size = self._pos_size[row]
+        if size == 0:
+            return 0.0
+        return float(self._pos_entry[row] * (self._liq_long_factor if size > 0 else self._liq_short_factor))
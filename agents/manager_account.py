@@ -9,6 +9,8 @@
 """
 
 from typing import Dict, Optional
+
+import numpy as np
 from binance.exceptions import BinanceAPIException
 
 from agents.client_interface import ClientInterface
@@ -75,28 +77,25 @@ class ManagerAccount:
         Returns:
             float: 总资产价值
         """
-        total = 0.0
-        
         try:
             # 获取所有交易对的最新价格
             prices = {
                 symbol['symbol']: float(symbol['price'])
                 for symbol in self.client.get_all_tickers()
             }
-            
-            # 计算每个资产的价值
-            for asset, balance in self.balances.items():
-                if asset == quote_asset:
-                    # 计价资产直接加总
-                    total += balance['free'] + balance['locked']
-                else:
-                    # 其他资产需要转换为计价资产
-                    symbol = f"{asset}{quote_asset}"
-                    if symbol in prices:
-                        asset_value = (balance['free'] + balance['locked']) * prices[symbol]
-                        total += asset_value
-                        
-            return total
+            if not self.balances:
+                return 0.0
+
+            # 资产数量与对应价格对齐成数组，一次点积得到总价值
+            # 计价资产价格为1，无交易对的资产价格为0
+            n = len(self.balances)
+            totals = np.fromiter(
+                (b['free'] + b['locked'] for b in self.balances.values()), dtype=np.float64, count=n)
+            price_arr = np.fromiter(
+                (1.0 if asset == quote_asset else prices.get(asset + quote_asset, 0.0)
+                 for asset in self.balances),
+                dtype=np.float64, count=n)
+            return float(totals @ price_arr)
             
         except BinanceAPIException as e:
             logger.error(f"Failed to calculate total balance: {e}")
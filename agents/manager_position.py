@@ -1,8 +1,26 @@
-from const.const import Fee
+from numba import float64, int64
+from numba.experimental import jitclass
 
+from agents._fastmath import position_close, position_commission, position_open, position_update
+from const.const import Fee
 
+# 吃单手续费率，模块常量在编译时内联
+_FEE_TAKER: float = Fee.Taker
+
+
+@jitclass([
+    ('side', int64),
+    ('size', float64),
+    ('entry_price', float64),
+    ('unrealized_pnl', float64),
+    ('holding_time', int64),
+    ('idle_time', int64),
+    ('capital', float64),
+    ('max_profit', float64),
+    ('max_loss', float64),
+])
 class ManagerPosition:
-    """持仓信息"""
+    """持仓信息（Numba jitclass，环境步进时直接调用编译后的方法）"""
 
     def __init__(self,
                  side: int = 0,
@@ -30,7 +48,7 @@ class ManagerPosition:
         self.unrealized_pnl: float = unrealized_pnl  # 未实现盈亏
         self.holding_time: int = holding_time  # 持仓时间
         self.idle_time: int = 0  # 空仓时间
-        self.capital: float = 0  # 成本
+        self.capital: float = 0.0  # 成本
         self.max_profit: float = max_profit  # 最大浮盈
         self.max_loss: float = max_loss  # 最大浮亏
 
@@ -42,7 +60,7 @@ class ManagerPosition:
         self.unrealized_pnl: float = 0.0
         self.holding_time: int = 0
         self.idle_time: int = 0
-        self.capital: float = 0
+        self.capital: float = 0.0
         self.max_profit: float = 0.0
         self.max_loss: float = 0.0
 
@@ -53,53 +71,24 @@ class ManagerPosition:
         Args:
             current_price: 当前价格
         """
+        (self.size, self.entry_price, self.unrealized_pnl, self.holding_time,
+         self.idle_time, self.max_profit, self.max_loss) = position_update(
+            self.side, self.size, self.entry_price, current_price,
+            self.holding_time, self.idle_time, self.max_profit, self.max_loss)
         if self.side == 0:
-            self.size = 0.0
-            self.entry_price = 0.0
-            self.unrealized_pnl = 0.0
-            self.capital = 0
-            self.holding_time = 0
-            self.idle_time += 1
-            return
-
-        self.idle_time = 0
-        if self.side == 1:  # 多头
-            self.unrealized_pnl = (current_price - self.entry_price) * self.size
-        else:  # 空头
-            self.unrealized_pnl = (self.entry_price - current_price) * self.size
-
-        # 更新持仓时间
-        self.holding_time += 1
-
-        # 更新最大浮盈和浮亏
-        if self.unrealized_pnl > self.max_profit:
-            self.max_profit = self.unrealized_pnl
-        elif self.unrealized_pnl < self.max_loss:
-            self.max_loss = self.unrealized_pnl
+            self.capital = 0.0
 
     def open(self, current_price: float, position_size: float, balance: float, side: int) -> (bool, float):
         """开多 side = 1 / 开空 side =-1 """
-        if position_size <= 0.0000000001:
-            return False, balance
-            # raise RuntimeError(f"Error in current_price:{current_price} position_size:{position_size} balance:{balance} side:{side}")
-        # 计算开仓金额
-        amount = position_size * current_price
-
-        # 计算手续费
-        commission = Fee.commission(amount)
-
-        # 检查余额
-        if balance < commission + amount:
+        ok, balance, capital = position_open(current_price, position_size, balance, _FEE_TAKER)
+        if not ok:
             return False, balance
 
-        # 更新账户余额
-        balance = balance - commission - amount
-
         # 更新持仓信息
         self.side = side
         self.size = position_size
         self.entry_price = current_price
-        self.capital = amount+commission
+        self.capital = capital
         self.unrealized_pnl = 0.0
         self.holding_time = 1
         self.idle_time = 0
@@ -110,30 +99,15 @@ class ManagerPosition:
 
     def close(self, current_price: float, balance: float) -> (float, float):
         """平仓"""
-        # 计算平仓金额
-        amount = self.size * current_price
-
-        # 计算平仓盈亏
-        if self.side == 1:  # 多仓
-            realized_pnl = (current_price - self.entry_price) * self.size
-        else:  # 空仓
-            realized_pnl = (self.entry_price - current_price) * self.size
-
-        # 计算手续费
-        commission = Fee.commission(amount)
-
-        # 更新账户余额
-        balance = balance + amount - commission
-        if balance < 0:
-            balance = 0
-            realized_pnl = -balance
+        realized_pnl, balance = position_close(
+            self.side, self.size, self.entry_price, current_price, balance, _FEE_TAKER)
 
         # 更新持仓信息
         self.side = 0
-        self.size = 0
-        self.entry_price = 0
-        self.unrealized_pnl = 0
-        self.capital = 0
+        self.size = 0.0
+        self.entry_price = 0.0
+        self.unrealized_pnl = 0.0
+        self.capital = 0.0
         self.holding_time = 0
         self.idle_time = 1
 
@@ -144,7 +118,4 @@ class ManagerPosition:
 
     # 计算手续费
     def commission(self, current_price: float):
-        if self.side == 0 or self.size == 0:
-            return 0
-        amount = self.size * current_price  # 计算平仓金额
-        return Fee.commission(amount)
+        return position_commission(self.side, self.size, current_price, _FEE_TAKER)
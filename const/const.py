@@ -1,6 +1,6 @@
 # 常量
 import decimal
-from enum import Enum
+from enum import Enum, IntEnum
 
 # 常量
 KLine: str = "kline"
@@ -26,6 +26,13 @@ PositionMarginMin: float = 10
 # 开仓最大保证金
 PositionMarginMax: float = 10000
 
+# 订单常量（与 binance.enums 取值一致，模拟盘无需导入 binance 包）
+ORDER_TYPE_MARKET: str = "MARKET"  # 市价单
+ORDER_TYPE_LIMIT: str = "LIMIT"  # 限价单
+TIME_IN_FORCE_GTC: str = "GTC"  # 成交为止
+SIDE_BUY: str = "BUY"  # 买
+SIDE_SELL: str = "SELL"  # 卖
+
 USDT: str = "USDT"  # USDT
 BTC: str = "BTC"  # BTC
 ETH: str = "ETH"  # ETH
@@ -42,18 +49,18 @@ class Symbols(Enum):
         return self in [Symbols.ETHUSDT, Symbols.BTCUSDT]
 
 
-class Trend(Enum):
+class Trend(IntEnum):
     """趋势"""
-    Up: int = 1  # 上涨
-    Down: int = 2  # 下跌
-    Sideways: int = 0  # 横盘
+    Up = 1  # 上涨
+    Down = 2  # 下跌
+    Sideways = 0  # 横盘
 
 
-class Position(Enum):
+class Position(IntEnum):
     """ 持仓状态 """
-    Empty: int = 0  # 无
-    Long: int = 1  # 看多 持仓(全仓)
-    Short: int = 2  # 看空 持仓(全仓)
+    Empty = 0  # 无
+    Long = 1  # 看多 持仓(全仓)
+    Short = 2  # 看空 持仓(全仓)
 
 
 # 持仓方向 Str
@@ -64,11 +71,11 @@ class PositionStr(Enum):
     LONG: str = "LONG"  # 多
 
 
-class Execution(Enum):
+class Execution(IntEnum):
     """ 执行策略动作 """
-    Immediate: int = 0  # 立即执行
-    Wait: int = 1  # 等待
-    Batch: int = 2  # 分批执行
+    Immediate = 0  # 立即执行
+    Wait = 1  # 等待
+    Batch = 2  # 分批执行
 
 
 class Fee:
@@ -90,12 +97,12 @@ class Fee:
 
 
 # 买卖方向 Int
-class Action(Enum):
+class Action(IntEnum):
     """Actions Enum"""
 
-    Stop: int = 0  # 停
-    Buy: int = 1  # 买
-    Sell: int = 2  # 卖
+    Stop = 0  # 停
+    Buy = 1  # 买
+    Sell = 2  # 卖
 
 
 class ActionStr(Enum):
@@ -107,12 +114,23 @@ class ActionStr(Enum):
     none: str = "none"  # 无
 
 
+# 最终交易动作编码
+class ActionCode(IntEnum):
+    """最终交易动作"""
+    UNKNOWN = 0  # 未知
+    BUY = 1  # 买入
+    SELL = 2  # 卖出
+    CLOSE = 3  # 空仓
+    HOLD = 4  # 观望
+    WAIT = 5  # 等待
+
+
 # 买卖方向 Int
-class ActionAI(Enum):
+class ActionAI(IntEnum):
     """Actions Enum"""
     # 0-持有，1-买多，2-做空, 3-持多平仓 4-持空平仓
-    AI_HOLD: int = 0
-    AI_OPEN_LONG: int = 1
-    AI_OPEN_SHORT: int = 2
-    AI_CLOSE_LONG: int = 3
-    AI_CLOSE_SHORT: int = 4
+    AI_HOLD = 0
+    AI_OPEN_LONG = 1
+    AI_OPEN_SHORT = 2
+    AI_CLOSE_LONG = 3
+    AI_CLOSE_SHORT = 4
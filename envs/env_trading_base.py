@@ -74,11 +74,18 @@ class EnvTradingBase(gym.Env):
         self.min_balance: float = 0  # 最小资金
         self.max_drawdown: float = 0  # 最大回撤
 
+        # 观察缓存：同一步内重复获取观察时直接复用
+        self._obs_cache_step: int = -1
+        self._obs_cache: tuple = ()
+
+        # 环境内的随机数生成器，子类需要随机数时统一使用 self.rng
+        self.rng: np.random.Generator = np.random.default_rng()
+
     def reset(self, seed=None, options=None):
         """重置环境"""
-        # 重置随机数种子
+        # 重置随机数种子（每个环境独立的随机数生成器，不修改全局状态）
         if seed is not None:
-            np.random.seed(seed)
+            self.rng = np.random.default_rng(seed)
 
         # 重置状态
         self.current_step = self.min_start_pos  # 重置当前步数
@@ -95,7 +102,8 @@ class EnvTradingBase(gym.Env):
         self.max_drawdown = 0.0  # 最大回撤
 
         # 获取初始观察
-        observation, info = self._observation()
+        self._obs_cache_step = -1
+        observation, info = self._cached_observation()
         return observation, info
 
     def step(self, action: int) -> Tuple[dict[str, np.ndarray], float, bool, bool, dict]:
@@ -122,6 +130,21 @@ class EnvTradingBase(gym.Env):
         ok, self.balance = self.position.open(current_price, position_size, self.balance, side)
         return ok
 
+    def _cached_observation(self) -> tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        """按当前步数缓存的观察，同一步内只计算一次"""
+        if self._obs_cache_step != self.current_step:
+            observation, info = self._observation()
+            # 特征窗口来自共享的缓冲区，缓存前复制一份；
+            # 每步都是新数组，VecEnv 保存的 terminal_observation 不会被 reset 覆盖
+            observation = {k: np.array(v) for k, v in observation.items()}
+            self._obs_cache = (observation, info)
+            self._obs_cache_step = self.current_step
+        return self._obs_cache
+
+    def _get_observation(self) -> Dict[str, np.ndarray]:
+        """获取当前观察"""
+        return self._cached_observation()[0]
+
     def _observation(self, *args) -> tuple[Dict[str, np.ndarray],Dict[str, np.ndarray]]:
         """获取当前观察"""
         pass
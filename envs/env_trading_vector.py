@@ -2,12 +2,13 @@
 基于向量存储的交易环境
 """
 
+import time
+import uuid as uuid_lib
 import numpy as np
-import uuid
-from datetime import datetime
-from typing import Dict, Any, Tuple, Optional
+from typing import Dict, Any, Tuple, Optional, List
 
 from envs.env_trading_base import EnvTradingBase
+from feature.feature import COLUMNS
 from feature.vector_store import VectorStore
 from utils.logger import Logger
 
@@ -29,6 +30,31 @@ class EnvTradingVector(EnvTradingBase):
         
         # 初始化向量存储
         self.vector_store = VectorStore(config)
+
+        # 决策ID = 环境ID-运行标识-计数器，运行标识只生成一次，保证持久化存储中ID不重复
+        self._run_id: str = uuid_lib.uuid4().hex[:8]
+        self._step_counter: int = 0
+        # 重置次数，连续重置（中间没有步进）时初始状态ID仍然唯一
+        self._reset_counter: int = 0
+
+        # 状态向量缓冲区: [1m窗口, 15m窗口, 持仓状态]
+        self._window_len: int = self.window_size * len(COLUMNS)
+        self._state_buf: np.ndarray = np.empty(2 * self._window_len + 7, dtype=np.float32)
+
+        # 交易决策批量写入缓冲
+        self._flush_steps: int = config.get('vector_flush_steps', 256)
+        self._decision_ids: List[str] = []
+        # 缓冲区直接保存存储类型的向量
+        self._decision_vectors: np.ndarray = np.empty(
+            (self._flush_steps, self._state_buf.shape[0]), dtype=self.vector_store.vector_dtype)
+        self._decision_metadatas: List[Dict[str, Any]] = []
+
+        # 相似决策查询按步数间隔进行，状态变化不大时复用上次结果
+        self._query_steps: int = config.get('vector_query_steps', 16)
+        self._query_similarity: float = config.get('vector_query_similarity', 0.99)
+        self._query_count: int = 0
+        self._last_query_vector: Optional[np.ndarray] = None
+        self._last_similar: Optional[Dict[str, Any]] = None
         logger.info("向量存储交易环境初始化完成")
     
     def _get_state_vector(self) -> np.ndarray:
@@ -36,21 +62,73 @@ class EnvTradingVector(EnvTradingBase):
         获取当前状态的向量表示
         
         Returns:
-            状态向量
+            状态向量（复用内部缓冲区，下一步会被覆盖）
         """
         # 获取当前观察
         obs = self._get_observation()
         
-        # 将观察转换为向量
+        # 将观察依次写入预分配的缓冲区
         # 这里简化处理，实际应用中可能需要更复杂的向量化方法
-        state_vector = np.concatenate([
-            obs['1m'].flatten(),
-            obs['15m'].flatten(),
-            obs['state'].flatten()
-        ])
+        n = self._window_len
+        buf = self._state_buf
+        np.copyto(buf[:n], obs['1m'].ravel())
+        np.copyto(buf[n:2 * n], obs['15m'].ravel())
+        np.copyto(buf[2 * n:], obs['state'].ravel())
         
-        return state_vector
+        return buf
     
+    def _flush_decisions(self) -> None:
+        """将缓冲的交易决策批量写入向量存储"""
+        if not self._decision_ids:
+            return
+        # 同一批次共用写入时的时间戳（毫秒）
+        timestamp = int(time.time() * 1000)
+        for metadata in self._decision_metadatas:
+            metadata["timestamp"] = timestamp
+        self.vector_store.record_trade_decisions(
+            decision_ids=self._decision_ids,
+            state_vectors=self._decision_vectors[:len(self._decision_ids)],
+            metadatas=self._decision_metadatas
+        )
+        self._decision_ids = []
+        self._decision_metadatas = []
+
+    def _query_similar(self, state_vector: np.ndarray) -> Optional[Dict[str, Any]]:
+        """
+        查询相似的历史决策，每 vector_query_steps 步查询一次，
+        与上次查询状态足够相似时直接复用上次结果
+
+        Args:
+            state_vector: 状态向量
+
+        Returns:
+            相似决策列表
+        """
+        self._query_count += 1
+        if self._last_similar is not None:
+            if self._query_count < self._query_steps:
+                return self._last_similar
+            last = self._last_query_vector
+            norm = np.linalg.norm(state_vector) * np.linalg.norm(last)
+            if norm > 0 and np.dot(state_vector, last) / norm > self._query_similarity:
+                self._query_count = 0
+                return self._last_similar
+
+        self._flush_decisions()
+        self._last_similar = self.vector_store.query_similar_decisions(
+            state_vector=state_vector,
+            n_results=3
+        )
+        self._last_query_vector = state_vector.copy()
+        self._query_count = 0
+        return self._last_similar
+
+    def close(self):
+        """关闭环境，写入剩余的交易决策"""
+        self._flush_decisions()
+        self.vector_store.close()
+        super().close()
+
     def step(self, action: int) -> Tuple[Dict[str, np.ndarray], float, bool, bool, Dict[str, Any]]:
         """
         执行一步交易
@@ -67,27 +145,24 @@ class EnvTradingVector(EnvTradingBase):
         # 执行基础环境的step
         obs, reward, done, truncated, info = super().step(action)
         
-        # 记录交易决策
-        decision_id = f"{self.uuid}_{self.current_step}_{uuid.uuid4().hex[:8]}"
-        self.vector_store.record_trade_decision(
-            decision_id=decision_id,
-            state_vector=state_vector,
-            action=action,
-            reward=reward,
-            metadata={
-                "timestamp": datetime.now().isoformat(),
-                "price": self._current_price(),
-                "position": self.position.side,
-                "balance": self.balance,
-                "step": self.current_step
-            }
-        )
-        
+        # 记录交易决策（先缓冲，攒够一批再写入）
+        self._step_counter += 1
+        decision_id = f"{self.uuid}-{self._run_id}-{self._step_counter}"
+        self.vector_store.encode(state_vector, out=self._decision_vectors[len(self._decision_ids)])
+        self._decision_ids.append(decision_id)
+        self._decision_metadatas.append({
+            "price": self._current_price(),
+            "position": self.position.side,
+            "balance": self.balance,
+            "step": self.current_step,
+            "action": action,
+            "reward": reward,
+        })
+        if len(self._decision_ids) >= self._flush_steps:
+            self._flush_decisions()
+
         # 查询相似的历史决策
-        similar_decisions = self.vector_store.query_similar_decisions(
-            state_vector=state_vector,
-            n_results=3
-        )
+        similar_decisions = self._query_similar(state_vector)
         
         # 将相似决策信息添加到info中
         if similar_decisions and len(similar_decisions['ids']) > 0:
@@ -108,17 +183,23 @@ class EnvTradingVector(EnvTradingBase):
         Returns:
             初始观察, 信息
         """
+        self._flush_decisions()
+        self._last_query_vector = None
+        self._last_similar = None
+        self._query_count = 0
+
         obs, info = super().reset(seed)
         
         # 获取初始状态向量并存储
         state_vector = self._get_state_vector()
-        state_id = f"{self.uuid}_init_{uuid.uuid4().hex[:8]}"
+        self._reset_counter += 1
+        state_id = f"{self.uuid}-{self._run_id}-init-{self._reset_counter}"
         
         self.vector_store.add_market_state(
             state_id=state_id,
             state_vector=state_vector,
             metadata={
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": int(time.time() * 1000),
                 "step": self.current_step,
                 "is_initial": True
             }
@@ -12,6 +12,10 @@ class Exp_Basic(object):
     def _build_model(self):
         raise NotImplementedError
 
+    def reset(self):
+        """重新构建模型（重新初始化权重），用于多次重复实验时复用同一个实验对象"""
+        self.model = self._build_model().to(self.device)
+
     def _acquire_device(self):
         if self.args.use_gpu:
             os.environ["CUDA_VISIBLE_DEVICES"] = str(
@@ -0,0 +1,276 @@
+"""
+增量技术指标模块
+
+未收盘的15m K线只需要计算最后一行的指标：递推类指标（EMA/MACD/RSI）使用上一根K线的状态，
+滚动窗口类指标（MA/BOLL/KDJ/CCI/MFI/量比）只使用最近不超过60根K线，避免每步对整个窗口重跑TA-Lib。
+计算口径与 Feature.add_indicators（TA-Lib 默认参数）一致。
+"""
+
+import numpy as np
+from numba import njit
+
+# 增量计算需要的历史K线数量（最大指标窗口 ma60）
+PARTIAL_HISTORY: int = 60
+
+# RSI 周期，状态数组按 [平均涨幅, 平均跌幅] * 周期 排列
+RSI_PERIODS = (6, 12, 24)
+
+# 特征行的列顺序（与 feature.COLUMNS 同名，调用方按列名映射）
+ROW_COLUMNS = (
+    'open', 'high', 'low', 'close',
+    'volume', 'quote_volume', 'taker_buy_volume', 'taker_buy_quote_volume',
+    'ma5', 'ma10', 'ma20', 'ma60',
+    'ema12', 'ema26',
+    'macd', 'macd_signal', 'macd_hist',
+    'rsi6', 'rsi12', 'rsi24',
+    'cci20', 'cci50',
+    'mfi',
+    'vr',
+    'boll_upper', 'boll_middle', 'boll_lower',
+    'k', 'd', 'j',
+)
+
+
+@njit(cache=True)
+def wilder_averages(close: np.ndarray, period: int):
+    """
+    计算 Wilder 平滑的平均涨幅/跌幅（与 TA-Lib RSI 的内部状态一致）
+
+    Args:
+        close: 收盘价序列
+        period: RSI 周期
+
+    Returns:
+        (平均涨幅, 平均跌幅)，前 period 个位置为 NaN
+    """
+    n = close.shape[0]
+    avg_gain = np.full(n, np.nan)
+    avg_loss = np.full(n, np.nan)
+    if n <= period:
+        return avg_gain, avg_loss
+    gain = 0.0
+    loss = 0.0
+    for i in range(1, period + 1):
+        d = close[i] - close[i - 1]
+        if d > 0:
+            gain += d
+        else:
+            loss -= d
+    gain /= period
+    loss /= period
+    avg_gain[period] = gain
+    avg_loss[period] = loss
+    for i in range(period + 1, n):
+        d = close[i] - close[i - 1]
+        gain = (gain * (period - 1) + (d if d > 0 else 0.0)) / period
+        loss = (loss * (period - 1) + (-d if d < 0 else 0.0)) / period
+        avg_gain[i] = gain
+        avg_loss[i] = loss
+    return avg_gain, avg_loss
+
+
+def rsi_state(close: np.ndarray) -> np.ndarray:
+    """
+    计算每根K线收盘后的 RSI 递推状态
+
+    Args:
+        close: 收盘价序列
+
+    Returns:
+        形状 (N, 2 * len(RSI_PERIODS)) 的状态数组
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    columns = []
+    for period in RSI_PERIODS:
+        columns.extend(wilder_averages(close, period))
+    return np.column_stack(columns)
+
+
+# ROW_COLUMNS 中各列的位置
+_OPEN, _HIGH, _LOW, _CLOSE, _VOLUME = 0, 1, 2, 3, 4
+_MA = (8, 9, 10, 11)
+_EMA12, _EMA26 = 12, 13
+_MACD, _MACD_SIGNAL, _MACD_HIST = 14, 15, 16
+_RSI = (17, 18, 19)
+_CCI20, _CCI50 = 20, 21
+_MFI = 22
+_VR = 23
+_BOLL_UPPER, _BOLL_MIDDLE, _BOLL_LOWER = 24, 25, 26
+_K, _D, _J = 27, 28, 29
+
+
+@njit(cache=True)
+def _window_mean(x, end, n):
+    """x[end-n:end] 的均值"""
+    total = 0.0
+    for i in range(end - n, end):
+        total += x[i]
+    return total / n
+
+
+@njit(cache=True)
+def _cci(tp, end, n):
+    """以 end-1 为最后一根的 CCI"""
+    sma = _window_mean(tp, end, n)
+    md = 0.0
+    for i in range(end - n, end):
+        md += abs(tp[i] - sma)
+    md /= n
+    return (tp[end - 1] - sma) / (0.015 * md) if md > 0 else 0.0
+
+
+@njit(cache=True, fastmath=True)
+def partial_bar_row(hist: np.ndarray, state: np.ndarray, bar: np.ndarray) -> np.ndarray:
+    """
+    计算未收盘K线的特征行
+
+    Args:
+        hist: 之前 PARTIAL_HISTORY 根已收盘K线的特征，列顺序同 ROW_COLUMNS
+        state: 上一根K线收盘后的 RSI 状态
+        bar: 合成K线 [open, high, low, close, volume, quote_volume, taker_buy_volume, taker_buy_quote_volume]
+
+    Returns:
+        与 ROW_COLUMNS 对齐的特征行（float32）
+    """
+    m = hist.shape[0]
+    n_all = m + 1
+    row = np.empty(hist.shape[1], dtype=np.float32)
+    for i in range(8):
+        row[i] = bar[i]
+
+    # 历史K线与合成K线拼成 float64 序列
+    close = np.empty(n_all)
+    high = np.empty(n_all)
+    low = np.empty(n_all)
+    vol = np.empty(n_all)
+    for i in range(m):
+        close[i] = hist[i, _CLOSE]
+        high[i] = hist[i, _HIGH]
+        low[i] = hist[i, _LOW]
+        vol[i] = hist[i, _VOLUME]
+    c = float(bar[_CLOSE])
+    v = float(bar[_VOLUME])
+    close[m] = c
+    high[m] = bar[_HIGH]
+    low[m] = bar[_LOW]
+    vol[m] = v
+
+    # 简单移动平均
+    periods = (5, 10, 20, 60)
+    for k in range(4):
+        row[_MA[k]] = _window_mean(close, n_all, periods[k])
+
+    # 指数移动平均与 MACD
+    ema12 = c * (2 / 13) + hist[m - 1, _EMA12] * (11 / 13)
+    ema26 = c * (2 / 27) + hist[m - 1, _EMA26] * (25 / 27)
+    macd = ema12 - ema26
+    signal = macd * (2 / 10) + hist[m - 1, _MACD_SIGNAL] * (8 / 10)
+    row[_EMA12] = ema12
+    row[_EMA26] = ema26
+    row[_MACD] = macd
+    row[_MACD_SIGNAL] = signal
+    row[_MACD_HIST] = macd - signal
+
+    # RSI（Wilder 递推）
+    d = c - close[m - 1]
+    up = d if d > 0 else 0.0
+    down = -d if d < 0 else 0.0
+    for k in range(3):
+        n = RSI_PERIODS[k]
+        gain = (state[2 * k] * (n - 1) + up) / n
+        loss = (state[2 * k + 1] * (n - 1) + down) / n
+        row[_RSI[k]] = 100 * gain / (gain + loss) if gain + loss > 0 else 0.0
+
+    # 布林带（20，2倍总体标准差）
+    middle = _window_mean(close, n_all, 20)
+    var = 0.0
+    for i in range(n_all - 20, n_all):
+        var += (close[i] - middle) ** 2
+    std = np.sqrt(var / 20)
+    row[_BOLL_UPPER] = middle + 2 * std
+    row[_BOLL_MIDDLE] = middle
+    row[_BOLL_LOWER] = middle - 2 * std
+
+    # KDJ：STOCH(14, 3, 3)，需要最近3根的 fastk
+    slow_k = 0.0
+    for k in range(3):
+        end = n_all - 2 + k
+        hh = high[end - 14]
+        ll = low[end - 14]
+        for i in range(end - 13, end):
+            hh = max(hh, high[i])
+            ll = min(ll, low[i])
+        slow_k += (close[end - 1] - ll) / (hh - ll) * 100 if hh > ll else 0.0
+    slow_k /= 3
+    slow_d = (hist[m - 1, _K] + hist[m - 2, _K] + slow_k) / 3
+    row[_K] = slow_k
+    row[_D] = slow_d
+    row[_J] = 3 * slow_k - 2 * slow_d
+
+    # 量比（5根平均）
+    row[_VR] = v / _window_mean(vol, n_all, 5)
+
+    # CCI
+    tp = (high + low + close) / 3
+    row[_CCI20] = _cci(tp, n_all, 20)
+    row[_CCI50] = _cci(tp, n_all, 50)
+
+    # MFI（14）
+    pos = 0.0
+    neg = 0.0
+    for i in range(n_all - 14, n_all):
+        flow = tp[i] * vol[i]
+        if tp[i] > tp[i - 1]:
+            pos += flow
+        elif tp[i] < tp[i - 1]:
+            neg += flow
+    row[_MFI] = 100 * pos / (pos + neg) if pos + neg > 0 else 0.0
+    return row
+
+
+@njit(cache=True, fastmath=True)
+def normalize_window(f: np.ndarray, out: np.ndarray, idx_price: np.ndarray,
+                     idx_0_1: np.ndarray, idx_neg_1_1: np.ndarray) -> np.ndarray:
+    """
+    窗口内最小-最大归一化（口径见 Feature.calc_normalize）
+
+    Args:
+        f: 特征窗口
+        out: 输出缓冲区，可与 f 相同
+        idx_price: 价格类列号，共用一组最小/最大值缩放到 0~1
+        idx_0_1: 逐列缩放到 0~1 的列号
+        idx_neg_1_1: 逐列缩放到 -1~1 的列号
+
+    Returns:
+        out
+    """
+    rows = f.shape[0]
+    lo = np.inf
+    hi = -np.inf
+    for j in idx_price:
+        for i in range(rows):
+            x = f[i, j]
+            lo = min(lo, x)
+            hi = max(hi, x)
+    scale = 1.0 / (hi - lo if hi > lo else 1.0)
+    for j in idx_price:
+        for i in range(rows):
+            out[i, j] = (f[i, j] - lo) * scale
+
+    for group in range(2):
+        idx = idx_0_1 if group == 0 else idx_neg_1_1
+        for j in idx:
+            lo = np.inf
+            hi = -np.inf
+            for i in range(rows):
+                x = f[i, j]
+                lo = min(lo, x)
+                hi = max(hi, x)
+            scale = 1.0 / (hi - lo if hi > lo else 1.0)
+            if group == 0:
+                for i in range(rows):
+                    out[i, j] = (f[i, j] - lo) * scale
+            else:
+                for i in range(rows):
+                    out[i, j] = (f[i, j] - lo) * scale * 2.0 - 1.0
+    return out
@@ -1,10 +1,13 @@
+from multiprocessing import shared_memory
+from numpy.lib.stride_tricks import sliding_window_view
+
+import numpy as np
 import pandas as pd
 import talib as ta
-from sklearn.preprocessing import MinMaxScaler
 
-from utils import singleton
+from feature._indicators import PARTIAL_HISTORY, ROW_COLUMNS, normalize_window, partial_bar_row, rsi_state
 
-from typing import Dict
+from typing import Any, Dict, List, Optional, Tuple
 
 # 指标列
 COLUMNS = [
@@ -39,6 +42,35 @@ COLUMNS = [
     'k', 'd', 'j',  # 随机指标（%K 14日，%D 3日）
 ]
 
+# 归一化分组：价格类共用一组最小/最大值 0~1；成交量类逐列 0~1；指标类逐列 -1~1
+COLUMNS_PRICE = ['open', 'high', 'low', 'close',
+                 'ma5', 'ma10', 'ma20', 'ma60',
+                 'ema12', 'ema26', ]
+COLUMNS_0_1 = ['volume',
+               'quote_volume', 'taker_buy_volume', 'taker_buy_quote_volume', ]
+COLUMNS_NEG_1_1 = [
+    'boll_upper', 'boll_middle', 'boll_lower',
+    'rsi6', 'rsi12', 'rsi24',  # 相对强弱指数
+    'macd', 'macd_signal', 'macd_hist',  # MACD（默认12,26,9）
+    'cci20', 'cci50',  # 商品通道指数
+    'mfi',  # 资金流量指标（14日）
+    'vr',  # 量比（5日平均）
+    'k', 'd', 'j',  # 随机指标（%K 14日，%D 3日）
+]
+IDX_PRICE = np.array([COLUMNS.index(c) for c in COLUMNS_PRICE])
+IDX_0_1 = np.array([COLUMNS.index(c) for c in COLUMNS_0_1])
+IDX_NEG_1_1 = np.array([COLUMNS.index(c) for c in COLUMNS_NEG_1_1])
+
+# 增量指标特征行 -> COLUMNS 列号
+IDX_ROW = np.array([COLUMNS.index(c) for c in ROW_COLUMNS])
+
+# 1m原始K线列，用于合成未收盘的15m K线
+BAR_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'count',
+               'quote_volume', 'taker_buy_volume', 'taker_buy_quote_volume']
+
+# 合成K线时需要求和的成交量类列（顺序同合成K线）
+VOLUME_COLUMNS = ['volume', 'quote_volume', 'taker_buy_volume', 'taker_buy_quote_volume']
+
 # 内存-特征缓存类型
 CacheTypeMemory: str = "memory"
 
@@ -49,7 +81,6 @@ CacheTypeFile: str = "file"
 CacheTypeSqlite: str = "sqlite"
 
 
-@singleton
 class Feature:
     def __init__(self, config: Dict[str, any] = None):
         """
@@ -60,6 +91,25 @@ class Feature:
         self.months: int = config['months']  # 读取最近多少月份 数据
         self.df_1m: pd.DataFrame = pd.DataFrame()
         self.df_15m: pd.DataFrame = pd.DataFrame()
+        # 列式特征数组（行主序 float32），按步切片即为零拷贝视图
+        self.features_1m: np.ndarray = np.empty((0, len(COLUMNS)), dtype=np.float32)
+        self.features_15m: np.ndarray = np.empty((0, len(COLUMNS)), dtype=np.float32)
+        self.bars_1m: Dict[str, np.ndarray] = {}  # 1m原始K线列 BAR_COLUMNS
+        self.close_1m: np.ndarray = np.empty(0, dtype=np.float64)  # 1m收盘价（float64，用于成交计算）
+        # 1m成交量类列的前缀和，形状 (N+1, len(VOLUME_COLUMNS))，区间求和只需一次减法
+        self.volume_cum_1m: np.ndarray = np.zeros((1, len(VOLUME_COLUMNS)), dtype=np.float64)
+        self.rsi_state_15m: np.ndarray = np.empty((0, 6), dtype=np.float64)  # 15m RSI 递推状态
+        # 归一化输出缓冲区，按 (周期, 窗口大小) 复用，避免每步分配
+        self._scratch: Dict[Tuple[str, int], np.ndarray] = {}
+        # 滑动窗口视图，按 (周期, 窗口大小) 缓存: (特征数组, 视图)
+        self._windows: Dict[Tuple[str, int], Tuple[np.ndarray, np.ndarray]] = {}
+        # 归一化范围: window 按窗口内最小最大值缩放 / global 按训练数据统一缩放（加载时计算一次）
+        self.normalize_scope: str = config.get('normalize_scope', 'window')
+        # global 归一化的拟合截止时间，只用此前的K线计算缩放参数，避免引入未来的价格区间
+        self.normalize_fit_end: Optional[str] = config.get('normalize_fit_end')
+        # 全量归一化参数，形状 (2, len(COLUMNS))：第0行为缩放系数，第1行为偏移，out = x * a + b
+        self.norm_1m: np.ndarray = np.zeros((2, len(COLUMNS)), dtype=np.float32)
+        self.norm_15m: np.ndarray = np.zeros((2, len(COLUMNS)), dtype=np.float32)
         # 最大技术指标窗口
         self.indicator_window_max: int = config['indicator_window_max']  # 指标窗口最大值
         self.cache_dir: str = config['cache_dir']  # 缓存目录
@@ -78,22 +128,60 @@ class Feature:
         # 添加技术指标
         self.df_1m = self.add_indicators(self.df_1m)
         self.df_15m = self.add_indicators(self.df_15m)
+        self.materialize()
         return
 
+    def materialize(self):
+        """ 将K线与指标数据转为列式 NumPy 数组，供每步切片使用 """
+        self.features_1m = self.df_1m[COLUMNS].to_numpy(dtype=np.float32, copy=True)
+        self.features_15m = self.df_15m[COLUMNS].to_numpy(dtype=np.float32, copy=True)
+        self.bars_1m = {c: self.df_1m[c].to_numpy(dtype=np.float32, copy=True) for c in BAR_COLUMNS}
+        self.close_1m = self.df_1m['close'].to_numpy(dtype=np.float64, copy=True)
+        volumes = self.df_1m[VOLUME_COLUMNS].to_numpy(dtype=np.float64)
+        self.volume_cum_1m = np.zeros((len(volumes) + 1, len(VOLUME_COLUMNS)), dtype=np.float64)
+        np.cumsum(volumes, axis=0, out=self.volume_cum_1m[1:])
+        self.rsi_state_15m = rsi_state(self.df_15m['close'].to_numpy(dtype=np.float64))
+        # 指标预热期之后的数据不允许有 NaN，加载时检查一次，之后每步不再检查
+        _check_nan('1m', self.features_1m, self.window_start)
+        _check_nan('15m', self.features_15m, self.window_start)
+        if self.normalize_scope == 'global':
+            self.norm_1m = _global_norm(self.features_1m[:self._fit_rows(self.df_1m)])
+            self.norm_15m = _global_norm(self.features_15m[:self._fit_rows(self.df_15m)])
+
+    def _fit_rows(self, df: pd.DataFrame) -> int:
+        """
+        global 归一化使用的K线数量（开盘时间早于 normalize_fit_end 的K线）
+
+        Args:
+            df: K线数据，按开盘时间升序
+
+        Returns:
+            拟合归一化参数使用的行数
+        """
+        if not self.normalize_fit_end:
+            raise ValueError("normalize_scope 为 global 时需要配置 normalize_fit_end（训练数据截止时间）")
+        return int(df['open_time'].searchsorted(pd.Timestamp(self.normalize_fit_end)))
+
     def len(self):
         """ 获取数据长度 """
         return len(self.df_1m)
 
     def current_price(self, current_step: int) -> float:
         """ 获取当前价格 """
-        return self.df_1m['close'].iloc[current_step]
+        return self.close_1m[current_step]
 
     def max_indicator_window(self):
         """ 获取最大技术指标窗口 """
         return self.window_start
 
-    def observation(self, current_step: int, window_size: int) -> Dict[str, pd.DataFrame]:
-        """ 获取当前状态 """
+    def observation(self, current_step: int, window_size: int) -> Dict[str, np.ndarray]:
+        """
+        获取当前状态
+
+        Returns:
+            1m/15m 归一化特征窗口的副本；同一进程内的多个环境共享 Feature，
+            calc_feature* 的缓冲区会被下一次调用覆盖，这里返回新数组
+        """
         # 计算起始和结束索引
         start_idx, end_idx = current_step - window_size, current_step
 
@@ -129,46 +217,65 @@ class Feature:
         f_15m = self.calc_feature_15m(start_idx=start_idx_15m, current_step=end_idx_15m, step_1m=current_step)
 
         # 返回数据
-        return {'1m': f_1m, '15m': f_15m}
+        return {'1m': f_1m.copy(), '15m': f_15m.copy()}
+
+    def _scratch_buffer(self, timeframe: str, window_size: int) -> np.ndarray:
+        """ 获取归一化输出缓冲区 """
+        key = (timeframe, window_size)
+        buf = self._scratch.get(key)
+        if buf is None:
+            buf = np.empty((window_size, len(COLUMNS)), dtype=np.float32)
+            self._scratch[key] = buf
+        return buf
+
+    def _window_view(self, timeframe: str, window_size: int) -> np.ndarray:
+        """
+        获取特征的滑动窗口视图，view[i] 即 features[i:i + window_size]（零拷贝）
 
-    def calc_feature(self, start_idx, current_step: int) -> pd.DataFrame:
+        Args:
+            timeframe: 周期 1m/15m
+            window_size: 窗口大小
+
+        Returns:
+            形状 (N - window_size + 1, window_size, len(COLUMNS)) 的只读视图
+        """
+        features = self.features_1m if timeframe == '1m' else self.features_15m
+        key = (timeframe, window_size)
+        cached = self._windows.get(key)
+        # 特征数组被替换（重新加载或挂载共享内存）后重建视图
+        if cached is None or cached[0] is not features:
+            view = sliding_window_view(features, (window_size, features.shape[1]))[:, 0]
+            cached = (features, view)
+            self._windows[key] = cached
+        return cached[1]
+
+    def calc_feature(self, start_idx, current_step: int) -> np.ndarray:
         """
         获取当前状态
 
         Returns:
-            当前状态的字典，包含1m和15m的特征和指标数据，以及持仓状态
+            归一化后的1m特征窗口，写入复用的缓冲区，下次调用时会被覆盖
         """
         try:
             # 获取当前时间窗口的数据
             # 'open', 'high', 'low', 'close',
             # 'volume', 'quote_volume', 'taker_buy_volume', 'taker_buy_quote_volume',
-            df = self.df_1m
-            df_window: pd.DataFrame = df.iloc[start_idx:current_step]
-            df_f: pd.DataFrame = df_window[COLUMNS]
-            # df_i: pd.DataFrame = df_window[INDICATOR_COLUMNS]
-
-            # print(f"Data shapes - df: {df.shape}, df_window: {df_window.shape}, df_f: {df_f.shape} ")
-
-            # 检查是否有NaN值
-            if df_f.isna().any().any():
-                raise ValueError(
-                    f"NaN values detected in features or indicators 1m start_idx:{start_idx} current_step:{current_step}")
-
             # 归一化
-            df_f = self.calc_normalize(df_f)
-            return df_f
+            window_size = current_step - start_idx
+            f = self._window_view('1m', window_size)[start_idx]
+            return self._normalize(f, self._scratch_buffer('1m', window_size), self.norm_1m)
         except Exception as e:
             print(f"Error getting observation: {str(e)}")
             print(f"Start index: {start_idx}, Current step: {current_step}")
             print(f"Window size: {current_step - start_idx}")
             raise
 
-    def calc_feature_15m(self, start_idx, current_step, step_1m: int) -> pd.DataFrame:
+    def calc_feature_15m(self, start_idx, current_step, step_1m: int) -> np.ndarray:
         """
         获取当前状态
 
         Returns:
-            当前状态的字典，包含1m和15m的特征和指标数据，以及持仓状态
+            归一化后的15m特征窗口，写入复用的缓冲区，下次调用时会被覆盖
         """
         try:
             # 获取当前时间窗口的数据
@@ -176,172 +283,317 @@ class Feature:
             # 'volume', 'quote_volume', 'taker_buy_volume', 'taker_buy_quote_volume',
             # print(f"start_idx: {start_idx}, current_step: {current_step}, step_1m: {step_1m}")
             rem = step_1m % 15
-            df = self.df_15m
-            df_window: pd.DataFrame = df.iloc[start_idx:current_step]
-            if rem > 0:
-                df_window_1m = self.df_1m.iloc[step_1m - rem:step_1m]
-                df_window2 = df_window.copy()
-
-                open_value = df_window_1m.iloc[0]['open']
-                high_value = df_window_1m.loc[df_window_1m['high'].idxmax()]['high']
-                low_value = df_window_1m.loc[df_window_1m['low'].idxmin()]['low']
-                close_value = df_window_1m.iloc[-1]['close']
-                count = df_window_1m['count'].sum()
-                volume_sum = df_window_1m['volume'].sum()
-                quote_volume_sum = df_window_1m['quote_volume'].sum()
-                taker_buy_volume_sum = df_window_1m['taker_buy_volume'].sum()
-                taker_buy_quote_volume_sum = df_window_1m['taker_buy_quote_volume'].sum()
-                summary_row = {
-                    'open': open_value,
-                    'high': high_value,
-                    'low': low_value,
-                    'close': close_value,
-                    'volume': volume_sum / rem * 15,
-                    'count': count / rem * 15,
-                    'quote_volume': quote_volume_sum / rem * 15,
-                    'taker_buy_volume': taker_buy_volume_sum / rem * 15,
-                    'taker_buy_quote_volume': taker_buy_quote_volume_sum / rem * 15
-                }
-                # 将字典转化为 DataFrame
-                summary_df = pd.DataFrame([summary_row])
-                df_window2 = pd.concat([df_window2, summary_df], ignore_index=True)
-                df_window2 = self.add_indicators(df_window2)
-                df_window0 = pd.concat([df_window[1:], df_window2[-1:]], ignore_index=True)
-                df_f: pd.DataFrame = df_window0[COLUMNS]
-                # df_i: pd.DataFrame = df_window0[INDICATOR_COLUMNS]
-                # print(f"Data shapes - df: {df.shape}, df_window: {df_window.shape}, df_f: {df_f.shape}")
-                # 检查是否有NaN值
-                if df_f.isna().any().any():
-                    raise ValueError(
-                        f"NaN values detected in features or indicators 15m start_idx:{start_idx} current_step:{current_step}")
-                # 归一化
-                df_f = self.calc_normalize(df_f)
-                return df_f
-            else:
-                df_f: pd.DataFrame = df_window[COLUMNS]
-                # df_i: pd.DataFrame = df_window[INDICATOR_COLUMNS]
-                # print(
-                #     f"Data shapes - df: {df.shape}, df_window: {df_window.shape}, df_f: {df_f.shape}")
-                # 检查是否有NaN值
-                if df_f.isna().any().any():
-                    raise ValueError(
-                        f"NaN values detected in features or indicators start_idx:{start_idx} current_step:{current_step}")
+            if rem == 0:
+                # 15m K线刚好收盘，直接取已收盘K线，跳过合成逻辑
                 # 归一化
-                df_f = self.calc_normalize(df_f)
-                return df_f
+                window_size = current_step - start_idx
+                f = self._window_view('15m', window_size)[start_idx]
+                return self._normalize(f, self._scratch_buffer('15m', window_size), self.norm_15m)
+
+            # 用本根15m内已走完的1m K线合成未收盘K线，成交量类按比例放大到15分钟
+            bars = self.bars_1m
+            s, e = step_1m - rem, step_1m
+            bar = np.empty(8, dtype=np.float32)
+            bar[0] = bars['open'][s]
+            bar[1] = bars['high'][s:e].max()
+            bar[2] = bars['low'][s:e].min()
+            bar[3] = bars['close'][e - 1]
+            # 成交量类由前缀和相减得到区间和
+            bar[4:] = (self.volume_cum_1m[e] - self.volume_cum_1m[s]) * (15 / rem)
+
+            # 只增量计算最后一行指标，其余行直接取已收盘K线
+            hist = self.features_15m[current_step - PARTIAL_HISTORY:current_step][:, IDX_ROW]
+            row = partial_bar_row(hist, self.rsi_state_15m[current_step - 1], bar)
+            f = self._scratch_buffer('15m', current_step - start_idx)
+            f[:-1] = self.features_15m[start_idx + 1:current_step]
+            f[-1, IDX_ROW] = row
+            # 归一化
+            return self._normalize(f, f, self.norm_15m)
         except Exception as e:
             print(f"Error getting observation: {str(e)}")
             print(f"Start index: {start_idx}, Current step: {current_step}")
             print(f"Window size: {current_step - start_idx}")
             raise
 
+    def _normalize(self, f: np.ndarray, out: np.ndarray, params: np.ndarray) -> np.ndarray:
+        """
+        按 normalize_scope 归一化特征窗口
+
+        Args:
+            f: 特征窗口
+            out: 输出缓冲区，可与 f 相同
+            params: 对应周期的全量归一化参数
+
+        Returns:
+            out
+        """
+        if self.normalize_scope == 'window':
+            return self.calc_normalize(f, out=out)
+        np.multiply(f, params[0], out=out)
+        np.add(out, params[1], out=out)
+        return out
+
     @staticmethod
-    def calc_normalize(f: pd.DataFrame) -> pd.DataFrame:
-        # 假设 df 是你的 DataFrame
-        f0 = f.copy()
-        columns_price = ['open', 'high', 'low', 'close',
-                         'ma5', 'ma10', 'ma20', 'ma60',
-                         'ema12', 'ema26', ]
-        scaler_price = MinMaxScaler(feature_range=(0, 1))
-        data = f0[columns_price].values.flatten().reshape(-1, 1)
-        normalized_data = scaler_price.fit_transform(data)
-        f0[columns_price] = normalized_data.reshape(f0[columns_price].shape)
-
-        f1 = f0.copy()
-        columns_0_1 = ['volume',
-                       'quote_volume', 'taker_buy_volume', 'taker_buy_quote_volume', ]
-        scaler_0_1 = MinMaxScaler(feature_range=(0, 1))
-        f1[columns_0_1] = scaler_0_1.fit_transform(f1[columns_0_1])
-
-        f2 = f1.copy()
-        columns_neg_1_1 = [
-            'boll_upper', 'boll_middle', 'boll_lower',
-            # 动量指标
-            'rsi6', 'rsi12', 'rsi24',  # 相对强弱指数（14日）
-            'macd', 'macd_signal', 'macd_hist',  # MACD（默认12,26,9）
-            # 'roc',  # 变动率（10日）
-            # 'cmo',  # 钱德动量摆动指标（14日）
-            'cci20', 'cci50',  # 商品通道指数（20日）
-            'mfi',  # 资金流量指标（14日）
-            # 'willr',  # 威廉指标（14日）
-
-            # 波动率指标
-            # 'natr',  # 归一化平均真实范围（14日）
-
-            # 成交量指标
-            # 'obv',  # 能量潮
-            # 'ad',  # 累积/分配线
-            # 'adosc',  # 震荡指标（3,10日）
-            'vr',  # 量比（5日平均）
-
-            # 趋势强度指标
-            # 'adx',  # 平均趋向指标（14日）
-            # 'dx',  # 动向指标（14日）
-            # 'dmi_plus',  # DMI+
-            # 'dmi_minus',  # DMI-
-
-            # 阳光指标
-            # 'aroon_down', 'aroon_up',
-
-            # 市场情绪指标
-            'k', 'd', 'j',  # 随机指标（%K 14日，%D 3日）
-        ]
-        scaler_neg_1_1 = MinMaxScaler(feature_range=(-1, 1))
-        f2[columns_neg_1_1] = scaler_neg_1_1.fit_transform(f[columns_neg_1_1])
-        return f2
+    def calc_normalize(f: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        窗口内最小-最大归一化
+
+        Args:
+            f: 特征窗口，形状 (window_size, len(COLUMNS))，列顺序同 COLUMNS
+            out: 输出缓冲区，可与 f 相同（原地归一化），缺省新建 float32 数组
+
+        Returns:
+            归一化后的特征
+        """
+        if out is None:
+            out = np.empty(f.shape, dtype=np.float32)
+        # 价格类列共用一组最小/最大值缩放到 0~1；成交量类逐列 0~1；指标类逐列 -1~1
+        return normalize_window(f, out, IDX_PRICE, IDX_0_1, IDX_NEG_1_1)
 
     def add_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """添加技术指标"""
-        # 复制数据以避免警告
-        df = df.copy()
+        # 价格数据（TA-Lib 需要连续的 float64 数组，这里只转换一次）
+        close = np.ascontiguousarray(df['close'].to_numpy(), dtype=np.float64)
+        high = np.ascontiguousarray(df['high'].to_numpy(), dtype=np.float64)
+        low = np.ascontiguousarray(df['low'].to_numpy(), dtype=np.float64)
+        volume = np.ascontiguousarray(df['volume'].to_numpy(), dtype=np.float64)
 
-        # 价格数据
-        close = df['close'].values
-        high = df['high'].values
-        low = df['low'].values
-        volume = df['volume'].values
+        # 指标先收集到字典，最后一次性拼接，避免逐列插入 DataFrame
+        ind: Dict[str, np.ndarray] = {}
 
         # 1. 简单移动平均线
-        df['ma5'] = ta.SMA(close, timeperiod=5)
-        df['ma10'] = ta.SMA(close, timeperiod=10)
-        df['ma20'] = ta.SMA(close, timeperiod=20)
-        df['ma60'] = ta.SMA(close, timeperiod=60)
+        ind['ma5'] = ta.SMA(close, timeperiod=5)
+        ind['ma10'] = ta.SMA(close, timeperiod=10)
+        ind['ma20'] = ta.SMA(close, timeperiod=20)
+        ind['ma60'] = ta.SMA(close, timeperiod=60)
 
         # 2. 指数移动平均线
-        df['ema12'] = ta.EMA(close, timeperiod=12)
-        df['ema26'] = ta.EMA(close, timeperiod=26)
+        ind['ema12'] = ta.EMA(close, timeperiod=12)
+        ind['ema26'] = ta.EMA(close, timeperiod=26)
 
         # 3. MACD
-        macd, signal, hist = ta.MACD(close, fastperiod=12, slowperiod=26, signalperiod=9)
-        df['macd'] = macd
-        df['macd_signal'] = signal
-        df['macd_hist'] = hist
+        ind['macd'], ind['macd_signal'], ind['macd_hist'] = ta.MACD(close, fastperiod=12, slowperiod=26,
+                                                                    signalperiod=9)
 
         # 4. RSI
-        df['rsi6'] = ta.RSI(close, timeperiod=6)
-        df['rsi12'] = ta.RSI(close, timeperiod=12)
-        df['rsi24'] = ta.RSI(close, timeperiod=24)
+        ind['rsi6'] = ta.RSI(close, timeperiod=6)
+        ind['rsi12'] = ta.RSI(close, timeperiod=12)
+        ind['rsi24'] = ta.RSI(close, timeperiod=24)
 
         # 5. 布林带
-        upper, middle, lower = ta.BBANDS(close, timeperiod=20)
-        df['boll_upper'] = upper
-        df['boll_middle'] = middle
-        df['boll_lower'] = lower
+        ind['boll_upper'], ind['boll_middle'], ind['boll_lower'] = ta.BBANDS(close, timeperiod=20)
 
         # 6. KDJ
-        df['k'], df['d'] = ta.STOCH(high, low, close, fastk_period=14, slowk_period=3, slowd_period=3)
-        df['j'] = 3 * df['k'] - 2 * df['d']
+        ind['k'], ind['d'] = ta.STOCH(high, low, close, fastk_period=14, slowk_period=3, slowd_period=3)
+        ind['j'] = 3 * ind['k'] - 2 * ind['d']
 
         # 7. Volume Ratio - 量比（5日均量）
-        df['vr'] = df['volume'] / df['volume'].rolling(window=5).mean()
+        vol_ma5 = np.full_like(volume, np.nan)
+        if len(volume) >= 5:
+            vol_ma5[4:] = np.lib.stride_tricks.sliding_window_view(volume, 5).mean(axis=1)
+        ind['vr'] = volume / vol_ma5
 
         # 9. CCI - 顺势指标
-        df['cci20'] = ta.CCI(high, low, close, timeperiod=20)
-        df['cci50'] = ta.CCI(high, low, close, timeperiod=50)
+        ind['cci20'] = ta.CCI(high, low, close, timeperiod=20)
+        ind['cci50'] = ta.CCI(high, low, close, timeperiod=50)
 
         # 10. MFI - 资金流量指标
-        df['mfi'] = ta.MFI(high, low, close, volume, timeperiod=14)
+        ind['mfi'] = ta.MFI(high, low, close, volume, timeperiod=14)
 
         # 最大技术指标窗口
         self.window_start = 60
-        return df
+        df = df.drop(columns=list(ind), errors='ignore')
+        return pd.concat([df, pd.DataFrame(ind, index=df.index)], axis=1)
+
+def _global_norm(features: np.ndarray) -> np.ndarray:
+    """
+    按全量数据计算归一化参数，分组口径同 Feature.calc_normalize
+
+    Args:
+        features: 全量特征，列顺序同 COLUMNS
+
+    Returns:
+        形状 (2, len(COLUMNS)) 的参数：缩放系数、偏移
+    """
+    params = np.zeros((2, features.shape[1]), dtype=np.float32)
+    if len(features) == 0:
+        return params
+    lo = np.nanmin(features, axis=0).astype(np.float64)
+    hi = np.nanmax(features, axis=0).astype(np.float64)
+    # 价格类列共用一组最小/最大值
+    lo[IDX_PRICE] = lo[IDX_PRICE].min()
+    hi[IDX_PRICE] = hi[IDX_PRICE].max()
+    span = np.where(hi > lo, hi - lo, 1.0)
+    scale = 1.0 / span
+    bias = -lo * scale
+    # 指标类缩放到 -1~1
+    scale[IDX_NEG_1_1] *= 2.0
+    bias[IDX_NEG_1_1] = bias[IDX_NEG_1_1] * 2.0 - 1.0
+    params[0] = scale
+    params[1] = bias
+    return params
+
+
+def _check_nan(timeframe: str, features: np.ndarray, start: int) -> None:
+    """
+    检查指标预热期之后的特征是否含 NaN
+
+    Args:
+        timeframe: 周期，用于错误信息
+        features: 全量特征
+        start: 指标预热期长度
+    """
+    rows = np.flatnonzero(np.isnan(features[start:]).any(axis=1))
+    if len(rows) > 0:
+        raise ValueError(
+            f"NaN values detected in features or indicators {timeframe} rows:{(rows[:10] + start).tolist()}")
+
+
+# 当前进程已创建的特征: (交易对, 月份数) -> Feature
+_features: Dict[Tuple[str, int], Feature] = {}
+
+
+def get_feature(config: Dict[str, Any]) -> Feature:
+    """
+    获取特征对象，同一进程内相同交易对与月份数只创建一次
+
+    Args:
+        config: 配置，需包含 symbol 与 months
+
+    Returns:
+        特征对象
+    """
+    key = (config['symbol'], config['months'])
+    feature = _features.get(key)
+    if feature is None:
+        feature = Feature(config)
+        _features[key] = feature
+    return feature
+
+
+# 当前进程已挂载的共享特征: 共享内存名 -> Feature
+_attached_features: Dict[str, Any] = {}
+
+
+def _share_frame(df: pd.DataFrame) -> Tuple[Dict[str, Any], shared_memory.SharedMemory]:
+    """将DataFrame的数值列放入共享内存，返回描述信息和共享内存块"""
+    numeric = df.select_dtypes(include="number")
+    values = numeric.to_numpy(dtype=np.float64)
+    shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    np.ndarray(values.shape, dtype=np.float64, buffer=shm.buf)[:] = values
+    meta = {
+        "name": shm.name,
+        "shape": values.shape,
+        "columns": list(numeric.columns),
+        "index": df.index,
+        # 非数值列数据量小，随句柄一起序列化
+        "others": df.drop(columns=numeric.columns),
+    }
+    return meta, shm
+
+
+def _attach_frame(meta: Dict[str, Any]) -> Tuple[pd.DataFrame, shared_memory.SharedMemory]:
+    """根据描述信息重建DataFrame，数值列为共享内存上的只读视图"""
+    shm = shared_memory.SharedMemory(name=meta["name"])
+    values = np.ndarray(meta["shape"], dtype=np.float64, buffer=shm.buf)
+    values.flags.writeable = False
+    df = pd.DataFrame(values, index=meta["index"], columns=meta["columns"], copy=False)
+    for column in meta["others"].columns:
+        df[column] = meta["others"][column]
+    return df, shm
+
+
+def _share_array(arr: np.ndarray) -> Tuple[Dict[str, Any], shared_memory.SharedMemory]:
+    """将数组放入共享内存，返回描述信息和共享内存块"""
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[:] = arr
+    return {"name": shm.name, "shape": arr.shape, "dtype": arr.dtype.str}, shm
+
+
+def _attach_array(meta: Dict[str, Any]) -> Tuple[np.ndarray, shared_memory.SharedMemory]:
+    """根据描述信息挂载共享内存上的只读数组"""
+    shm = shared_memory.SharedMemory(name=meta["name"])
+    arr = np.ndarray(meta["shape"], dtype=np.dtype(meta["dtype"]), buffer=shm.buf)
+    arr.flags.writeable = False
+    return arr, shm
+
+
+def share_feature(feature: Feature) -> Tuple[Dict[str, Any], List[shared_memory.SharedMemory]]:
+    """
+    将特征数据放入共享内存，供向量化环境的子进程零拷贝挂载
+
+    Args:
+        feature: 已加载数据的特征对象
+
+    Returns:
+        可序列化的特征句柄，以及需要由调用方持有并最终 unlink 的共享内存块
+    """
+    meta_1m, shm_1m = _share_frame(feature.df_1m)
+    meta_15m, shm_15m = _share_frame(feature.df_15m)
+    blocks = [shm_1m, shm_15m]
+    arrays = {
+        "features_1m": feature.features_1m,
+        "features_15m": feature.features_15m,
+        "close_1m": feature.close_1m,
+        "volume_cum_1m": feature.volume_cum_1m,
+        "rsi_state_15m": feature.rsi_state_15m,
+        "norm_1m": feature.norm_1m,
+        "norm_15m": feature.norm_15m,
+        **{f"bar_{c}": v for c, v in feature.bars_1m.items()},
+    }
+    array_metas = {}
+    for name, arr in arrays.items():
+        array_metas[name], shm = _share_array(arr)
+        blocks.append(shm)
+    handle = {
+        "config": {
+            "symbol": feature.symbol,
+            "months": feature.months,
+            "indicator_window_max": feature.indicator_window_max,
+            "cache_dir": feature.cache_dir,
+            "cache_type": feature.cache_type,
+            "normalize_scope": feature.normalize_scope,
+            "normalize_fit_end": feature.normalize_fit_end,
+        },
+        "window_start": getattr(feature, "window_start", 60),
+        "1m": meta_1m,
+        "15m": meta_15m,
+        "arrays": array_metas,
+    }
+    return handle, blocks
+
+
+def attach_feature(handle: Dict[str, Any]) -> Feature:
+    """
+    在当前进程中挂载共享特征，同一进程内只挂载一次
+
+    Args:
+        handle: share_feature 返回的特征句柄
+
+    Returns:
+        特征对象，K线数据为共享内存上的只读视图
+    """
+    key = handle["1m"]["name"]
+    feature = _attached_features.get(key)
+    if feature is None:
+        feature = Feature(handle["config"])
+        feature.df_1m, shm_1m = _attach_frame(handle["1m"])
+        feature.df_15m, shm_15m = _attach_frame(handle["15m"])
+        feature.window_start = handle["window_start"]
+        blocks = [shm_1m, shm_15m]
+        arrays = {}
+        for name, meta in handle["arrays"].items():
+            arrays[name], shm = _attach_array(meta)
+            blocks.append(shm)
+        feature.features_1m = arrays.pop("features_1m")
+        feature.features_15m = arrays.pop("features_15m")
+        feature.close_1m = arrays.pop("close_1m")
+        feature.volume_cum_1m = arrays.pop("volume_cum_1m")
+        feature.rsi_state_15m = arrays.pop("rsi_state_15m")
+        feature.norm_1m = arrays.pop("norm_1m")
+        feature.norm_15m = arrays.pop("norm_15m")
+        feature.bars_1m = {name[len("bar_"):]: arr for name, arr in arrays.items()}
+        # 持有共享内存引用，保证视图在进程生命周期内有效
+        feature._shared_blocks = blocks
+        _attached_features[key] = feature
+    return feature
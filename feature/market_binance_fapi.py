@@ -1,4 +1,9 @@
+import time
+from typing import Dict, Tuple
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from utils.logger import Logger
 
@@ -6,6 +11,42 @@ logger = Logger.get_logger()
 
 # -------------------------------- API 请求相关 --------------------------------
 
+# 复用连接的会话，避免每次请求重新建立 TCP/TLS 连接
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16,
+                                       max_retries=Retry(total=3, backoff_factor=0.3)))
+
+# 请求超时（秒）
+_TIMEOUT = 2
+
+# 资金费率结算周期（秒）
+_FUNDING_INTERVAL = 8 * 3600
+
+# 资金费率缓存: 交易对 -> (结算周期序号, 资金费率)，进入新周期时覆盖旧值
+_rate_cache: Dict[str, Tuple[int, float]] = {}
+
+
+def _fetch_funding_rate(symbol: str) -> float:
+    """
+    请求并计算资金费率，失败时抛出异常
+
+    Args:
+        symbol: 交易对名称
+
+    Returns:
+        float: 资金费率
+    """
+    # 获取溢价指数
+    url = f'https://fapi.binance.com/fapi/v1/premiumIndex?symbol={symbol}'
+    response = _SESSION.get(url, timeout=_TIMEOUT)
+    data = response.json()
+    premium_index = float(data['lastFundingRate'])
+
+    # 计算资金费率
+    base_rate = 0.0001  # 基础利率为0.01%
+    return premium_index + max(min(base_rate - premium_index, 0.0005), -0.0005)
+
+
 def funding_rate(symbol: str) -> float:
     """
     获取合约资金费率
@@ -17,16 +58,13 @@ def funding_rate(symbol: str) -> float:
         float: 资金费率
     """
     try:
-        # 获取溢价指数
-        url = f'https://fapi.binance.com/fapi/v1/premiumIndex?symbol={symbol}'
-        response = requests.get(url)
-        data = response.json()
-        premium_index = float(data['lastFundingRate'])
-
-        # 计算资金费率
-        base_rate = 0.0001  # 基础利率为0.01%
-        rate = premium_index + max(min(base_rate - premium_index, 0.0005), -0.0005)
-
+        # 资金费率每个结算周期只更新一次，同一周期内直接返回缓存
+        bucket = int(time.time() // _FUNDING_INTERVAL)
+        cached = _rate_cache.get(symbol)
+        if cached is not None and cached[0] == bucket:
+            return cached[1]
+        rate = _fetch_funding_rate(symbol)
+        _rate_cache[symbol] = (bucket, rate)
         return rate
 
     except Exception as e:
@@ -1,18 +1,36 @@
 import glob
+import io
 import requests
 import os
+import time
 
 import pandas as pd
-from typing import Any, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, Optional, Tuple
 from datetime import datetime, timedelta
-from dateutil.relativedelta import relativedelta
 
 from utils.logger import Logger
 from .market_data import MarketData
 
 logger = Logger.get_logger()
 
+# 倒序读取文件尾部时每次读取的字节数
+TAIL_BLOCK_SIZE: int = 64 * 1024
 
+# 下载分块大小与文件写缓冲大小
+DOWNLOAD_CHUNK_SIZE: int = 1 << 20
+
+# 下载进度输出的最小间隔（秒）
+PROGRESS_INTERVAL: float = 0.25
+
+# 币安K线CSV中浮点列的类型，显式指定以跳过类型推断；
+# 整数列（open_time/close_time/count/ignore）交给推断，含空值时退化为 float64，后续 ffill 补齐
+CSV_DTYPES: Dict[str, str] = {
+    'open': 'float64', 'high': 'float64', 'low': 'float64', 'close': 'float64',
+    'volume': 'float64', 'quote_volume': 'float64',
+    'taker_buy_volume': 'float64', 'taker_buy_quote_volume': 'float64',
+}
 
 
 class MarketDataCSV(MarketData):
@@ -20,6 +38,10 @@ class MarketDataCSV(MarketData):
         super().__init__(base_dir=config['data_dir'])
         # 币安数据前
         self.data_binance_url = "https://data.binance.vision/data/spot/monthly/klines"
+        # 并发下载线程数，与连接池大小一致
+        self.download_workers: int = config.get('download_workers', 8)
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=16))
 
 
     def down_klines(self, symbol:str, fred:str, months:int = 12)->int:
@@ -35,79 +57,124 @@ class MarketDataCSV(MarketData):
 
         """
         rs = 0
-        end_date_month = datetime.now()
-        start_date = end_date_month - relativedelta(months=months)
-        current_date = start_date
-        while current_date < end_date_month:
-            year = current_date.year
-            month = current_date.strftime("%m")
-            url = f"{self.data_binance_url}/{symbol}/{fred}/{symbol}-{fred}-{year}-{month}.zip"
+        tasks = []
+        # 下载地址与本地文件名模板，只构造一次
+        url_tmpl = f"{self.data_binance_url}/{symbol}/{fred}/{symbol}-{fred}-{{year}}-{{month}}.zip"
+        file_dir = f"{self.base_dir}/{symbol}-{fred}/"
+        name_tmpl = f"{symbol}-{fred}-{{year}}-{{month}}"
+        os.makedirs(file_dir, exist_ok=True)
+        # 一次列出目录中已有的文件，循环内只做集合查找
+        existing = set(os.listdir(file_dir))
+        # 从 months 个月前到上个月，按月序号直接计算年月
+        now = datetime.now()
+        current = now.year * 12 + now.month - 1
+        months_list = [(i // 12, f"{i % 12 + 1:02d}") for i in range(current - months, current)]
+        # 先收集需要下载的月份，已存在的文件跳过
+        for year, month in months_list:
             try:
-                # 下载url
-                file_dir = f"{self.base_dir}/{symbol}-{fred}/"
-                # 目录是否存在
-                if not os.path.exists(file_dir):
-                    os.makedirs(file_dir,  exist_ok=True)
-                file_csv = f"{self.base_dir}/{symbol}-{fred}/{symbol}-{fred}-{year}-{month}.csv"
+                file_name = name_tmpl.format(year=year, month=month)
                 # 文件是否存在
-                if os.path.exists(file_csv):
-                    print(f"文件已存在:{file_csv}")
-                    rs += 1
-                    current_date += relativedelta(months=1)
-                    continue
-                file_zip = f"{self.base_dir}/{symbol}-{fred}/{symbol}-{fred}-{year}-{month}.zip"
-                if os.path.exists(file_zip):
-                    print(f"文件已存在:{file_zip}")
-                    rs += 1
-                    current_date += relativedelta(months=1)
-                    continue
-                rs += 1
-                print("下载:", url)
-                self.save_file(url, f"{self.base_dir}/{symbol}-{fred}/{symbol}-{fred}-{year}-{month}.zip")
+                for ext in ('.csv', '.zip'):
+                    if file_name + ext in existing:
+                        print(f"文件已存在:{file_dir}{file_name}{ext}")
+                        rs += 1
+                        break
+                else:
+                    tasks.append((url_tmpl.format(year=year, month=month), f"{file_dir}{file_name}.zip"))
             except Exception as e:
                 logger.error(f"下载 {year}-{month} 数据失败: {str(e)}")
-            current_date += relativedelta(months=1)
+
+        # 并发下载，共用连接池；只统计下载成功的月份
+        if tasks:
+            with ThreadPoolExecutor(max_workers=self.download_workers) as executor:
+                rs += sum(executor.map(self._download_task, tasks))
         return rs
 
+    def _download_task(self, task: Tuple[str, str]) -> bool:
+        """
+        下载单个月份的数据，异常只记录日志，不影响其他月份
+
+        Args:
+            task: (下载地址, 保存路径)
+
+        Returns:
+            是否下载成功
+        """
+        url, save_path = task
+        try:
+            return self.save_file(url, save_path, session=self.session)
+        except Exception as e:
+            logger.error(f"下载 {url} 数据失败: {str(e)}")
+            return False
+
 
     @staticmethod
-    def save_file(url, save_path=None):
+    def save_file(url, save_path=None, session: Optional[requests.Session] = None):
         # 如果没有指定保存路径，默认使用URL中的文件名
         if save_path is None:
             save_path = url.split('/')[-1]
 
         try:
+            print("下载:", url)
             # 发送GET请求
-            response = requests.get(url, stream=True)
+            response = (session or requests).get(url, stream=True)
             # 检查请求是否成功
             response.raise_for_status()
 
             # 获取文件大小（如果有的话）
             total_size = int(response.headers.get('content-length', 0))
 
-            # 以二进制写入模式打开文件
-            with open(save_path, 'wb') as file:
-                # 分块下载
-                chunk_size = 8192  # 每次下载8KB
+            # 以二进制写入模式打开文件，写缓冲与分块大小一致
+            with open(save_path, 'wb', buffering=DOWNLOAD_CHUNK_SIZE) as file:
                 downloaded_size = 0
-
-                for chunk in response.iter_content(chunk_size=chunk_size):
+                next_print = time.monotonic() + PROGRESS_INTERVAL
+                # 分块下载
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
                     if chunk:  # 过滤掉keep-alive新块
                         file.write(chunk)
                         downloaded_size += len(chunk)
-                        # 显示下载进度
-                        if total_size > 0:
-                            progress = (downloaded_size / total_size) * 100
-                            print(f'\r下载进度: {progress:.2f}%', end='')
+                        # 显示下载进度（限频，多个文件并发下载时逐行输出）
+                        if total_size > 0 and time.monotonic() >= next_print:
+                            print(f'下载进度 {save_path}: {downloaded_size / total_size * 100:.2f}%')
+                            next_print = time.monotonic() + PROGRESS_INTERVAL
 
-            print(f'\n文件已下载完成: {save_path}')
+            print(f'文件已下载完成: {save_path}')
             return True
 
         except requests.RequestException as e:
             print(f'下载出错: {e}')
             return False
 
-    def load_csv(self, symbol: str = "BTCUSDT", fred: str = "1m", months: int = 0) -> pd.DataFrame:
+    @staticmethod
+    def read_csv_tail(file: str, rows: int) -> pd.DataFrame:
+        """
+        只读取CSV文件最后若干行，从文件末尾按块倒序读取，不解析前面的内容
+
+        Args:
+            file: 文件路径
+            rows: 读取行数
+
+        Returns:
+            pd.DataFrame: 数据
+        """
+        with open(file, 'rb') as f:
+            header = f.readline()
+            header_end = f.tell()
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            buf = b''
+            # 多读一个换行，保证保留的第一行是完整的
+            while pos > header_end and buf.count(b'\n') <= rows:
+                size = min(TAIL_BLOCK_SIZE, pos - header_end)
+                pos -= size
+                f.seek(pos)
+                buf = f.read(size) + buf
+        lines = buf.rstrip(b'\r\n').split(b'\n')[-rows:] if rows > 0 else []
+        data = header + b'\n'.join(lines) + (b'\n' if lines else b'')
+        return pd.read_csv(io.BytesIO(data), dtype=CSV_DTYPES, engine='c')
+
+    def load_csv(self, symbol: str = "BTCUSDT", fred: str = "1m", months: int = 0,
+                 rows_per_file: Optional[int] = None) -> pd.DataFrame:
         """
         加载指定时间段的数据
 
@@ -115,6 +182,7 @@ class MarketDataCSV(MarketData):
             symbol: 交易对
             fred: k线图时间频率
             months: 月份数
+            rows_per_file: 每个文件只读取最后多少行，缺省读取整个文件
 
         Returns:
             pd.DataFrame: 数据
@@ -146,27 +214,24 @@ class MarketDataCSV(MarketData):
             if months > 0:
                 selected_files = files[-months:]  # 选择最后几个月的数据
 
-            # 加载并合并数据
-            dfs = []
-            for file in selected_files:
-                df = pd.read_csv(file)
-                df['open_time'] = pd.to_datetime(df['open_time'], unit='ms')
-                df['close_time'] = pd.to_datetime(df['close_time'], unit='ms')
-                dfs.append(df)
-
-            # 检查dfs每行每个字段是否为空或为0，如果为空或为0，填充为上一行本字段的值
-            for df in dfs:
-                for col in df.columns:
-                    # 先处理空值
-                    df[col] = df[col].ffill()
-                    # 再处理0值
-                    mask = df[col] == 0
-                    if mask.any():
-                        df.loc[mask, col] = None
-                        df[col] = df[col].ffill()
-
-
-            return pd.concat(dfs, ignore_index=True)
+            # 加载数据（时间列在合并后统一转换）
+            if rows_per_file is None:
+                dfs = [pd.read_csv(file, dtype=CSV_DTYPES, engine='c') for file in selected_files]
+            else:
+                dfs = [self.read_csv_tail(file, rows_per_file) for file in selected_files]
+
+            df = pd.concat(dfs, ignore_index=True, copy=False)
+
+            # 每行每个字段为空或为0时，填充为上一行本字段的值（整表一次处理）
+            numeric = df.select_dtypes('number')
+            zero_cols = numeric.columns[numeric.eq(0).any()]
+            if len(zero_cols) > 0:
+                df[zero_cols] = df[zero_cols].mask(df[zero_cols].eq(0))
+            df = df.ffill()
+
+            df['open_time'] = pd.to_datetime(df['open_time'], unit='ms')
+            df['close_time'] = pd.to_datetime(df['close_time'], unit='ms')
+            return df
         except Exception as e:
             logger.error(f"Failed to load CSV data: {e}")
             return pd.DataFrame()
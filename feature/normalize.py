@@ -1,4 +1,60 @@
 import numpy as np
+from numba import njit, prange
+
+
+@njit(cache=True, parallel=True, fastmath=True)
+def _minmax(features: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """
+    逐列最小-最大归一化，每列先求最小/最大值再缩放，列之间并行
+
+    Args:
+        features: 原始特征，形状 (N, M)
+        out: 输出缓冲区，形状同 features
+
+    Returns:
+        out
+    """
+    rows, cols = features.shape
+    for j in prange(cols):
+        lo = features[0, j]
+        hi = features[0, j]
+        for i in range(1, rows):
+            x = features[i, j]
+            if x < lo:
+                lo = x
+            if x > hi:
+                hi = x
+        # 避免除以0
+        span = hi - lo
+        scale = 1.0 / span if span != 0 else 1.0
+        for i in range(rows):
+            out[i, j] = (features[i, j] - lo) * scale
+    return out
+
+
+@njit('void(f4[:, ::1], f4[:, ::1])', cache=True, parallel=True, fastmath=True)
+def _minmax_f32(src: np.ndarray, dst: np.ndarray) -> None:
+    """
+    float32 C 连续特征的最小-最大归一化，显式签名在导入时即完成编译，避免首次调用的 JIT 延迟
+
+    Args:
+        src: 原始特征，形状 (N, M)，float32 且 C 连续
+        dst: 输出缓冲区，形状同 src，可与 src 相同（原地归一化）
+    """
+    rows, cols = src.shape
+    for j in prange(cols):
+        lo = src[0, j]
+        hi = src[0, j]
+        for i in range(1, rows):
+            x = src[i, j]
+            if x < lo:
+                lo = x
+            if x > hi:
+                hi = x
+        span = hi - lo
+        scale = np.float32(1.0) / span if span != 0 else np.float32(1.0)
+        for i in range(rows):
+            dst[i, j] = (src[i, j] - lo) * scale
 
 
 def normalize_features(is_normalize: bool, features: np.ndarray) -> np.ndarray:
@@ -15,13 +71,14 @@ def normalize_features(is_normalize: bool, features: np.ndarray) -> np.ndarray:
     if not is_normalize:
         return features
 
-    # 使用最小-最大归一化
-    min_vals = np.min(features, axis=0, keepdims=True)
-    max_vals = np.max(features, axis=0, keepdims=True)
-
-    # 避免除以0
-    range_vals = max_vals - min_vals
-    range_vals[range_vals == 0] = 1
-
-    normalized = (features - min_vals) / range_vals
-    return normalized
\ No newline at end of file
+    # 使用最小-最大归一化（按第0维逐列）
+    flat = features.reshape(len(features), -1)
+    if flat.size > 0 and flat.dtype == np.float32 and flat.flags.c_contiguous and flat.flags.writeable:
+        # float32 快速路径：不升精度，直接走预编译内核
+        out = np.empty_like(flat)
+        _minmax_f32(flat, out)
+        return out.reshape(features.shape)
+    out = np.empty(flat.shape, dtype=np.result_type(features.dtype, np.float32))
+    if flat.size > 0:
+        _minmax(flat.astype(out.dtype, copy=False), out)
+    return out.reshape(features.shape)
@@ -1,17 +1,18 @@
 import const.const
-from feature.signal_util import get_higher_highs, get_lower_lows, get_highs, get_lows
+from feature.signal_util import get_higher_highs, get_lower_lows, get_highs, get_lows, local_extrema
 
 
-def determine_trend(close, order=5):
+def determine_trend(close, order=5, extrema=None):
     """
     判断当前趋势状态
     :param close: 收盘价列表
     :param order: 用于计算高点和低点的周期
+    :param extrema: local_extrema(close, order) 的结果，缺省时重新计算
     :return: '上升'/'下跌'/'盘整'
     """
     # 获取最近的高点/低点索引
-    highs = get_highs(close, order)
-    lows = get_lows(close, order)
+    highs = get_highs(close, order, extrema)
+    lows = get_lows(close, order, extrema)
 
     # 计算最近高点/低点的距离
     last_high_dist = len(close) - highs[-1] if len(highs) > 0 else 0
@@ -40,11 +41,12 @@ def determine_trend(close, order=5):
     return '盘整'
 
 
-def trend_strength(close, order=5):
+def trend_strength(close, order=5, extrema=None):
     """
     分析趋势强度特征
     :param close: 收盘价列表
     :param order: 用于计算高点和低点的周期
+    :param extrema: local_extrema(close, order) 的结果，缺省时重新计算
     :return: dict {
         'direction': 方向,
         'strength': 强度(0-100),
@@ -53,17 +55,17 @@ def trend_strength(close, order=5):
     }
     """
     # 获取连续模式
-    hh = get_higher_highs(close, order, K=3)
-    ll = get_lower_lows(close, order, K=3)
+    hh = get_higher_highs(close, order, K=3, extrema=extrema)
+    ll = get_lower_lows(close, order, K=3, extrema=extrema)
 
     # 计算强度指标
-    strength = min(100, (len(hh)*20 + len(ll)*20))  # 每个连续模式贡献20%强度
+    strength = min(100, (hh.shape[0]*20 + ll.shape[0]*20))  # 每个连续模式贡献20%强度
 
     return {
-        'direction': const.const.Trend.上升.value if len(hh) > len(ll) else const.const.Trend.下跌.value,
+        'direction': const.const.Trend.上升.value if hh.shape[0] > ll.shape[0] else const.const.Trend.下跌.value,
         'strength': strength,
-        'highs_count': len(hh),
-        'lows_count': len(ll)
+        'highs_count': hh.shape[0],
+        'lows_count': ll.shape[0]
     }
 
 
@@ -71,11 +73,14 @@ def trend_strength(close, order=5):
 def get_signals_sell_buy(data):
     close = data["close"].values
 
+    # 高点/低点只计算一次，趋势状态与趋势强度共用
+    extrema = local_extrema(close, 5)
+
     # 获取趋势状态
-    trend_status = determine_trend(close)
+    trend_status = determine_trend(close, 5, extrema)
 
     # 获取趋势强度
-    strength_info = trend_strength(close)
+    strength_info = trend_strength(close, 5, extrema)
 
     print(f"当前趋势: {trend_status}")
     print(f"趋势强度: {strength_info}")
@@ -1,16 +1,89 @@
 import numpy as np
-from collections import deque
-from scipy.signal import argrelextrema
+from numba import njit
 
 
-def get_lows(data: np.array, order=5):
+@njit(cache=True)
+def local_extrema(data: np.ndarray, order: int):
+    """
+    一次遍历同时计算局部最低点和最高点（口径同 scipy.signal.argrelextrema，mode='clip'）：
+    严格小于（大于）前后各 order 个点，首尾两个点不算极值点
+
+    Args:
+        data: 价格序列
+        order: 两侧比较的点数
+
+    Returns:
+        (最低点下标, 最高点下标)
+    """
+    n = data.shape[0]
+    lows = np.empty(n, dtype=np.int64)
+    highs = np.empty(n, dtype=np.int64)
+    n_low = 0
+    n_high = 0
+    for i in range(1, n - 1):
+        x = data[i]
+        is_low = True
+        is_high = True
+        lo = max(0, i - order)
+        hi = min(n - 1, i + order)
+        for j in range(lo, hi + 1):
+            if j == i:
+                continue
+            y = data[j]
+            if not x < y:
+                is_low = False
+            if not x > y:
+                is_high = False
+            if not is_low and not is_high:
+                break
+        if is_low:
+            lows[n_low] = i
+            n_low += 1
+        if is_high:
+            highs[n_high] = i
+            n_high += 1
+    return lows[:n_low], highs[:n_high]
+
+
+@njit(cache=True)
+def _streak_scan(idx_arr: np.ndarray, val_arr: np.ndarray, K: int, direction: int) -> np.ndarray:
+    """
+    扫描连续单调的极值点，返回每个满足条件的 K 个连续极值点下标
+
+    Args:
+        idx_arr: 极值点下标
+        val_arr: 极值点的值
+        K: 连续极值点个数
+        direction: 1 连续走高 / -1 连续走低
+
+    Returns:
+        形状 (n, K) 的下标矩阵，每行为一组连续极值点
+    """
+    n = idx_arr.shape[0]
+    out = np.empty((n, K), dtype=np.int64)
+    count = 0
+    streak = 0
+    for i in range(n):
+        # 方向相反时重新计数
+        if i > 0 and (val_arr[i] - val_arr[i - 1]) * direction < 0:
+            streak = 0
+        streak += 1
+        if i > 0 and streak >= K:
+            for k in range(K):
+                out[count, k] = idx_arr[i - K + 1 + k]
+            count += 1
+    return out[:count]
+
+
+def get_lows(data: np.array, order=5, extrema=None):
     """
     计算最低点 Get lows
     :param data:
     :param order:
+    :param extrema: local_extrema(data, order) 的结果，缺省时重新计算
     :return:
     """
-    low_idx = argrelextrema(data, np.less, order=order)[0]
+    low_idx = (extrema or local_extrema(data, order))[0]
     # 最后段
     last_idx = low_idx[-1]
     # last_val = data[last_idx]
@@ -20,21 +93,11 @@ def get_lows(data: np.array, order=5):
     # print("max_idx :", max_idx)
     # print("last idx/val:", last_idx, last_val)
 
-    last_idx2 = None
-    last_val2 = None
-    for idx, val in enumerate(np.nditer(data2)):
-        idx2 = idx + last_idx + 1
-        if last_val2 is None:
-            last_idx2 = idx2
-            last_val2 = val
-            # print(" init: idx2", idx2, " value", value)
-        if val < last_val2:
-            last_idx2 = idx2
-            last_val2 = val
-            # print(idx2, val)
-
-    # print(" last: idx2", last_idx2, " val2", last_val2, " idx:", last_idx, " val", last_val)
-    # print("last_idx2 - last_idx", last_idx2 - last_idx)
+    # 最后一个极值点之后的最低点（相同值取第一个）
+    if data2.size == 0:
+        return low_idx
+    last_idx2 = last_idx + 1 + int(np.argmin(data2))
+
     if last_idx2 - last_idx >= 3:
         low_idx = np.append(low_idx, last_idx2)
         # print(" last: idx2", last_idx2, " val2", last_val2)
@@ -42,14 +105,15 @@ def get_lows(data: np.array, order=5):
     return low_idx
 
 
-def get_highs(data: np.array, order=5):
+def get_highs(data: np.array, order=5, extrema=None):
     """
     计算个股高点 Get highs
     :param data:
     :param order:
+    :param extrema: local_extrema(data, order) 的结果，缺省时重新计算
     :return:
     """
-    high_idx = argrelextrema(data, np.greater, order=order)[0]
+    high_idx = (extrema or local_extrema(data, order))[1]
     # 最后段
     last_idx = high_idx[-1]
     # last_val = data[last_idx]
@@ -59,149 +123,100 @@ def get_highs(data: np.array, order=5):
     # print("max_idx :", max_idx)
     # print("last idx/val:", last_idx, last_val)
 
-    last_idx2 = None
-    last_val2 = None
-    for idx, val in enumerate(np.nditer(data2)):
-        idx2 = idx + last_idx + 1
-        if last_val2 is None:
-            last_idx2 = idx2
-            last_val2 = val
-            # print(" init: idx2", idx2, " value", value)
-        if val > last_val2:
-            last_idx2 = idx2
-            last_val2 = val
-        # print(idx2, val)
-    # print(" last: idx2", last_idx2, " val2", last_val2, " idx:", last_idx, " val", last_val)
-    # print("last_idx2 - last_idx", last_idx2 - last_idx)
+    # 最后一个极值点之后的最高点（相同值取第一个）
+    if data2.size == 0:
+        return high_idx
+    last_idx2 = last_idx + 1 + int(np.argmax(data2))
+
     if last_idx2 - last_idx >= 3:
         high_idx = np.append(high_idx, last_idx2)
         # print(" last: idx2", last_idx2, " val2", last_val2)
     return high_idx
 
 
-def get_higher_lows(data: np.array, order=5, K=2):
+def get_higher_lows(data: np.array, order=5, K=2, extrema=None):
     """
     发现价格模式中连续较高的低点。
      不得超过要确认的值的宽度参数指示的周期数。
       K 决定需要有多少个连续低点更高。
+     extrema 为 local_extrema(data, order) 的结果，缺省时重新计算。
     """
     # Get lows
-    low_idx = argrelextrema(data, np.less, order=order)[0]
+    low_idx = (extrema or local_extrema(data, order))[0]
     lows = data[low_idx]
     # Ensure consecutive lows are higher than previous lows
-    extrema = []
-    ex_deque = deque(maxlen=K)
-    for i, idx in enumerate(low_idx):
-        if i == 0:
-            ex_deque.append(idx)
-            continue
-        if lows[i] < lows[i - 1]:
-            ex_deque.clear()
+    return _streak_scan(low_idx, lows, K, 1)
 
-        ex_deque.append(idx)
-        if len(ex_deque) == K:
-            extrema.append(ex_deque.copy())
 
-    return extrema
-
-
-def get_lower_highs(data: np.array, order=5, K=2):
+def get_lower_highs(data: np.array, order=5, K=2, extrema=None):
     """
     发现价格模式中连续较低的高点。
      不得超过要确认的值的宽度参数指示的周期数。
      K 决定需要降低多少个连续高点。
+     extrema 为 local_extrema(data, order) 的结果，缺省时重新计算。
     """
     # Get highs
-    high_idx = argrelextrema(data, np.greater, order=order)[0]
+    high_idx = (extrema or local_extrema(data, order))[1]
     highs = data[high_idx]
     # Ensure consecutive highs are lower than previous highs
-    extrema = []
-    ex_deque = deque(maxlen=K)
-    for i, idx in enumerate(high_idx):
-        if i == 0:
-            ex_deque.append(idx)
-            continue
-        if highs[i] > highs[i - 1]:
-            ex_deque.clear()
-
-        ex_deque.append(idx)
-        if len(ex_deque) == K:
-            extrema.append(ex_deque.copy())
+    return _streak_scan(high_idx, highs, K, -1)
 
-    return extrema
 
-
-def get_higher_highs(data: np.array, order=5, K=2):
+def get_higher_highs(data: np.array, order=5, K=2, extrema=None):
     """
     在价格模式中发现连续的高点。
       不得超过宽度所指示的周期数待确认值的参数。
       K决定了有多少个连续的高点需要更高。
+      extrema 为 local_extrema(data, order) 的结果，缺省时重新计算。
     """
     # Get highs
-    high_idx = argrelextrema(data, np.greater, order=order)[0]
+    high_idx = (extrema or local_extrema(data, order))[1]
     highs = data[high_idx]
     # Ensure consecutive highs are higher than previous highs
-    extrema = []
-    ex_deque = deque(maxlen=K)
-    for i, idx in enumerate(high_idx):
-        if i == 0:
-            ex_deque.append(idx)
-            continue
-        if highs[i] < highs[i - 1]:
-            ex_deque.clear()
-
-        ex_deque.append(idx)
-        if len(ex_deque) == K:
-            extrema.append(ex_deque.copy())
+    return _streak_scan(high_idx, highs, K, 1)
 
-    return extrema
 
-
-def get_lower_lows(data: np.array, order=5, K=2):
+def get_lower_lows(data: np.array, order=5, K=2, extrema=None):
     """
     发现价格模式中连续较低的低点。
      不得超过要确认的值的宽度参数指示的周期数。
      K 决定需要降低多少个连续低点。
+     extrema 为 local_extrema(data, order) 的结果，缺省时重新计算。
     """
     # Get lows
-    low_idx = argrelextrema(data, np.less, order=order)[0]
+    low_idx = (extrema or local_extrema(data, order))[0]
     lows = data[low_idx]
     # Ensure consecutive lows are lower than previous lows
-    extrema = []
-    ex_deque = deque(maxlen=K)
-    for i, idx in enumerate(low_idx):
-        if i == 0:
-            ex_deque.append(idx)
-            continue
-        if lows[i] > lows[i - 1]:
-            ex_deque.clear()
+    return _streak_scan(low_idx, lows, K, -1)
+
 
-        ex_deque.append(idx)
-        if len(ex_deque) == K:
-            extrema.append(ex_deque.copy())
+def _tail_index(extrema: np.ndarray, order: int, n: int) -> np.ndarray:
+    """
+    取每组连续极值点最后一个点确认后的下标（最后一点 + order），超出数据长度的丢弃
 
-    return extrema
+    Args:
+        extrema: 形状 (m, K) 的连续极值点下标矩阵
+        order: 极值点确认周期
+        n: 数据长度
+
+    Returns:
+        下标数组
+    """
+    idx = extrema[:, -1] + order
+    return idx[idx < n]
 
 
 def get_hh_index(data: np.array, order=5, K=2):
-    extrema = get_higher_highs(data, order, K)
-    idx = np.array([i[-1] + order for i in extrema])
-    return idx[np.where(idx < len(data))]
+    return _tail_index(get_higher_highs(data, order, K), order, len(data))
 
 
 def get_lh_index(data: np.array, order=5, K=2):
-    extrema = get_lower_highs(data, order, K)
-    idx = np.array([i[-1] + order for i in extrema])
-    return idx[np.where(idx < len(data))]
+    return _tail_index(get_lower_highs(data, order, K), order, len(data))
 
 
 def get_ll_index(data: np.array, order=5, K=2):
-    extrema = get_lower_lows(data, order, K)
-    idx = np.array([i[-1] + order for i in extrema])
-    return idx[np.where(idx < len(data))]
+    return _tail_index(get_lower_lows(data, order, K), order, len(data))
 
 
 def get_hl_index(data: np.array, order=5, K=2):
-    extrema = get_higher_lows(data, order, K)
-    idx = np.array([i[-1] + order for i in extrema])
-    return idx[np.where(idx < len(data))]
+    return _tail_index(get_higher_lows(data, order, K), order, len(data))
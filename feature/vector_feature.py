@@ -2,9 +2,12 @@
 向量特征提取模块
 """
 
+from collections import OrderedDict
+
 import numpy as np
 import pandas as pd
-from typing import Dict, Any, List, Optional
+import torch
+from typing import Dict, Any, List, Optional, Tuple
 from sentence_transformers import SentenceTransformer
 from torch import Tensor
 
@@ -14,6 +17,13 @@ logger = Logger.get_logger()
 
 class VectorFeature:
     """向量特征提取类"""
+
+    # 从K线最后一行提取的指标列及缺失时的默认值
+    _ROW_COLUMNS = ('close', 'volume', 'rsi', 'macd')
+    _ROW_DEFAULTS = np.array([0, 0, 50, 0], dtype=np.float32)
+
+    # 持仓信息字段
+    _POSITION_KEYS = ('side', 'size', 'entry_price', 'unrealized_pnl', 'holding_time')
     
     def __init__(self, config: Dict[str, Any]):
         """
@@ -26,7 +36,17 @@ class VectorFeature:
         
         # 加载预训练模型用于文本向量化
         # 这里使用sentence-transformers，也可以根据需要使用其他模型
-        self.text_model = SentenceTransformer('all-MiniLM-L6-v2')
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        self.text_model = SentenceTransformer('all-MiniLM-L6-v2', device=device)
+        # 序列长度默认沿用模型的 256: 1m + 15m 市场描述约 190 个字符，
+        # 分词后超过 128 个 token，更短的上限会截掉 15m 的 RSI/MACD 描述
+        if config.get('vector_max_seq_length'):
+            self.text_model.max_seq_length = config['vector_max_seq_length']
+        # 批量编码的批大小
+        self.batch_size: int = config.get('vector_batch_size', 64)
+        # 文本向量 LRU 缓存: 文本 -> float16 向量，文本相同则向量相同，无需失效
+        self._text_cache: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._text_cache_size: int = config.get('vector_text_cache_size', 4096)
         
         logger.info("向量特征提取器初始化完成")
     
@@ -77,27 +97,72 @@ class VectorFeature:
         
         return text
     
-    def vectorize_market_state(self, df_1m: pd.DataFrame, df_15m: pd.DataFrame) -> Tensor:
+    def market_state_text(self, df_1m: pd.DataFrame, df_15m: pd.DataFrame) -> str:
         """
-        将市场状态向量化
+        生成市场状态的文本描述
         
         Args:
             df_1m: 1分钟K线数据
             df_15m: 15分钟K线数据
             
         Returns:
-            市场状态向量
+            文本描述
         """
-        # 生成市场文本描述
         text_1m = self.market_to_text(df_1m, window=20)
         text_15m = self.market_to_text(df_15m, window=10)
+        return f"1分钟K线: {text_1m} 15分钟K线: {text_15m}"
+
+    def encode_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        批量将文本转换为向量
         
-        combined_text = f"1分钟K线: {text_1m} 15分钟K线: {text_15m}"
+        Args:
+            texts: 文本列表
+            
+        Returns:
+            单位长度的向量矩阵，每行对应一条文本
+        """
+        cache = self._text_cache
+        # 只编码缓存中没有的文本（去重）
+        missing = list(dict.fromkeys(text for text in texts if text not in cache))
+        if missing:
+            with torch.inference_mode():
+                vectors = self.text_model.encode(missing, batch_size=self.batch_size, convert_to_numpy=True,
+                                                 normalize_embeddings=True, show_progress_bar=False)
+            for text, vector in zip(missing, vectors):
+                cache[text] = vector.astype(np.float16)
+        out = np.empty((len(texts), cache[texts[0]].shape[0]) if texts else (0, 0), dtype=np.float32)
+        for i, text in enumerate(texts):
+            out[i] = cache[text]
+            cache.move_to_end(text)
+        while len(cache) > self._text_cache_size:
+            cache.popitem(last=False)
+        return out
+
+    def vectorize_market_state(self, df_1m: pd.DataFrame, df_15m: pd.DataFrame) -> Tensor:
+        """
+        将市场状态向量化
         
-        # 使用预训练模型将文本转换为向量
-        vector = self.text_model.encode(combined_text)
+        Args:
+            df_1m: 1分钟K线数据
+            df_15m: 15分钟K线数据
+            
+        Returns:
+            市场状态向量
+        """
+        return self.encode_texts([self.market_state_text(df_1m, df_15m)])[0]
+
+    def vectorize_market_states(self, states: List[Tuple[pd.DataFrame, pd.DataFrame]]) -> np.ndarray:
+        """
+        批量将市场状态向量化
         
-        return vector
+        Args:
+            states: (1分钟K线数据, 15分钟K线数据) 列表
+            
+        Returns:
+            市场状态向量矩阵
+        """
+        return self.encode_texts([self.market_state_text(df_1m, df_15m) for df_1m, df_15m in states])
     
     def vectorize_pattern(self, pattern_name: str, pattern_description: str) -> Tensor:
         """
@@ -110,9 +175,19 @@ class VectorFeature:
         Returns:
             模式向量
         """
-        combined_text = f"{pattern_name}: {pattern_description}"
-        vector = self.text_model.encode(combined_text)
-        return vector
+        return self.encode_texts([f"{pattern_name}: {pattern_description}"])[0]
+
+    def vectorize_patterns(self, patterns: List[Tuple[str, str]]) -> np.ndarray:
+        """
+        批量将交易模式向量化
+        
+        Args:
+            patterns: (模式名称, 模式描述) 列表
+            
+        Returns:
+            模式向量矩阵
+        """
+        return self.encode_texts([f"{name}: {description}" for name, description in patterns])
     
     def vectorize_numerical_features(self, features: np.ndarray) -> np.ndarray:
         """
@@ -158,43 +233,24 @@ class VectorFeature:
         # 提取市场状态向量
         market_vector = self.vectorize_market_state(df_1m, df_15m)
         
-        # 提取数值特征
-        numerical_features = []
-        
-        # 从1分钟数据中提取关键指标
-        if len(df_1m) > 0:
-            last_row = df_1m.iloc[-1]
-            numerical_features.extend([
-                last_row.get('close', 0),
-                last_row.get('volume', 0),
-                last_row.get('rsi', 50) if 'rsi' in last_row else 50,
-                last_row.get('macd', 0) if 'macd' in last_row else 0
-            ])
-        
-        # 从15分钟数据中提取关键指标
-        if len(df_15m) > 0:
-            last_row = df_15m.iloc[-1]
-            numerical_features.extend([
-                last_row.get('close', 0),
-                last_row.get('volume', 0),
-                last_row.get('rsi', 50) if 'rsi' in last_row else 50,
-                last_row.get('macd', 0) if 'macd' in last_row else 0
-            ])
-        
+        # 输出向量 = [市场状态向量, 两个周期最后一行的关键指标, 持仓信息]，一次分配后按段填充
+        m = market_vector.shape[0]
+        combined_vector = np.empty(m + 2 * len(self._ROW_COLUMNS) + len(self._POSITION_KEYS), dtype=np.float32)
+        np.copyto(combined_vector[:m], market_vector)
+        n = m
+
+        # 从1分钟、15分钟数据中提取关键指标
+        for df in (df_1m, df_15m):
+            if len(df) > 0:
+                row = combined_vector[n:n + len(self._ROW_COLUMNS)]
+                row[:] = df.iloc[-1:].reindex(columns=self._ROW_COLUMNS).to_numpy(dtype=np.float32)[0]
+                np.copyto(row, self._ROW_DEFAULTS, where=np.isnan(row))
+                n += len(self._ROW_COLUMNS)
+
         # 添加持仓信息
         if position_info:
-            numerical_features.extend([
-                position_info.get('side', 0),
-                position_info.get('size', 0),
-                position_info.get('entry_price', 0),
-                position_info.get('unrealized_pnl', 0),
-                position_info.get('holding_time', 0)
-            ])
-        
-        # 向量化数值特征
-        numerical_vector = self.vectorize_numerical_features(np.array(numerical_features))
-        
-        # 组合所有向量
-        combined_vector = self.combine_vectors([market_vector, numerical_vector])
-        
-        return combined_vector
\ No newline at end of file
+            for key in self._POSITION_KEYS:
+                combined_vector[n] = position_info.get(key, 0)
+                n += 1
+
+        return combined_vector[:n]
\ No newline at end of file
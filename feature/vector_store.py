@@ -3,14 +3,16 @@
 """
 
 import os
+from collections import deque
 import numpy as np
 import chromadb
 from chromadb.config import Settings
-from typing import Dict, List, Any, Optional, Union
+from typing import Deque, Dict, List, Any, Optional, Tuple, Union
 from utils.logger import Logger
 
 logger = Logger.get_logger()
 
+
 class VectorStore:
     """向量存储类，用于存储和检索市场状态向量"""
     
@@ -22,6 +24,13 @@ class VectorStore:
             config: 配置信息
         """
         self.config = config
+
+        # Chroma 以 float32 存储向量，写入和查询统一使用 float32
+        self.vector_dtype: np.dtype = np.dtype(np.float32)
+
+        # 单条写入的市场状态先缓冲，攒够一批再写入
+        self._batch_size: int = config.get('vector_store_batch_size', 256)
+        self._pending_states: Deque[Tuple[str, np.ndarray, Dict[str, Any]]] = deque()
         
         # 创建向量存储目录
         self.vector_dir = os.path.join(config['root_dir'], 'vector_store')
@@ -53,6 +62,26 @@ class VectorStore:
         
         logger.info(f"向量存储初始化完成: {self.vector_dir}")
     
+    def encode(self, vectors: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        将向量转换为存储类型，已是存储类型时原样返回
+
+        Args:
+            vectors: 状态向量（一维或按行排列的矩阵）
+            out: vector_dtype 类型的输出缓冲区，缺省新建
+
+        Returns:
+            存储类型的向量
+        """
+        if out is None:
+            return vectors.astype(self.vector_dtype, copy=False)
+        out[...] = vectors
+        return out
+
+    def _embed(self, vectors: np.ndarray) -> np.ndarray:
+        """将向量转换为写入/查询用的二维 float32 embedding 矩阵（直接传给 Chroma，不转 list）"""
+        return np.atleast_2d(self.encode(vectors))
+
     def add_market_state(self, state_id: str, state_vector: np.ndarray, 
                          metadata: Optional[Dict[str, Any]] = None) -> None:
         """
@@ -65,12 +94,43 @@ class VectorStore:
         """
         if metadata is None:
             metadata = {}
-            
+
+        self._pending_states.append((state_id, self.encode(state_vector).copy(), metadata))
+        if len(self._pending_states) >= self._batch_size:
+            self.flush()
+
+    def add_market_states_bulk(self, state_ids: List[str], state_vectors: np.ndarray,
+                               metadatas: Optional[List[Dict[str, Any]]] = None) -> None:
+        """
+        批量添加市场状态向量
+
+        Args:
+            state_ids: 状态ID列表
+            state_vectors: 状态向量矩阵，每行一个状态
+            metadatas: 元数据列表
+        """
+        if not state_ids:
+            return
+        if metadatas is None:
+            metadatas = [{} for _ in state_ids]
+
         self.market_states.add(
-            ids=[state_id],
-            embeddings=[state_vector.tolist()],
-            metadatas=[metadata]
+            ids=state_ids,
+            embeddings=self._embed(state_vectors),
+            metadatas=metadatas
         )
+
+    def flush(self) -> None:
+        """写入缓冲中的市场状态"""
+        if not self._pending_states:
+            return
+        ids, vectors, metadatas = zip(*self._pending_states)
+        self._pending_states.clear()
+        self.add_market_states_bulk(list(ids), np.stack(vectors), list(metadatas))
+
+    def close(self) -> None:
+        """关闭向量存储，写入缓冲中的数据"""
+        self.flush()
     
     def query_similar_states(self, query_vector: np.ndarray, n_results: int = 5) -> Dict[str, Any]:
         """
@@ -83,8 +143,27 @@ class VectorStore:
         Returns:
             相似状态列表
         """
+        self.flush()
+        results = self.market_states.query(
+            query_embeddings=self._embed(query_vector),
+            n_results=n_results
+        )
+        return results
+
+    def query_similar_states_bulk(self, query_vectors: np.ndarray, n_results: int = 5) -> Dict[str, Any]:
+        """
+        批量查询相似的市场状态
+
+        Args:
+            query_vectors: 查询向量矩阵，每行一个查询
+            n_results: 每个查询返回结果数量
+
+        Returns:
+            相似状态列表，按查询顺序排列
+        """
+        self.flush()
         results = self.market_states.query(
-            query_embeddings=[query_vector.tolist()],
+            query_embeddings=self._embed(query_vectors),
             n_results=n_results
         )
         return results
@@ -104,7 +183,7 @@ class VectorStore:
             
         self.trade_patterns.add(
             ids=[pattern_id],
-            embeddings=[pattern_vector.tolist()],
+            embeddings=self._embed(pattern_vector),
             metadatas=[metadata]
         )
     
@@ -132,10 +211,29 @@ class VectorStore:
         
         self.trade_decisions.add(
             ids=[decision_id],
-            embeddings=[state_vector.tolist()],
+            embeddings=self._embed(state_vector),
             metadatas=[metadata]
         )
     
+    def record_trade_decisions(self, decision_ids: List[str], state_vectors: np.ndarray,
+                               metadatas: List[Dict[str, Any]]) -> None:
+        """
+        批量记录交易决策
+
+        Args:
+            decision_ids: 决策ID列表
+            state_vectors: 状态向量矩阵，每行一个决策
+            metadatas: 元数据列表，需包含 action 和 reward
+        """
+        if not decision_ids:
+            return
+
+        self.trade_decisions.add(
+            ids=decision_ids,
+            embeddings=self._embed(state_vectors),
+            metadatas=metadatas
+        )
+
     def query_similar_decisions(self, state_vector: np.ndarray, 
                                n_results: int = 5) -> Dict[str, Any]:
         """
@@ -149,7 +247,7 @@ class VectorStore:
             相似决策列表
         """
         results = self.trade_decisions.query(
-            query_embeddings=[state_vector.tolist()],
+            query_embeddings=self._embed(state_vector),
             n_results=n_results
         )
         return results
\ No newline at end of file
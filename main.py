@@ -10,15 +10,19 @@ from typing import Dict
 
 import yaml
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from agents.agent_multi import AgentMulti
+from agents.agent_utils import action_display
+from agents._fastmath import backtest_metrics
 from agents.client_binance import ClientBinance
 from agents.client_interface import ClientInterface
 from agents.client_simulation import ClientSimulation
 from utils import Logger
 from utils.config_yaml import ConfigYaml
-from feature.feature import Feature
+from const.const import ActionCode
+from feature.feature import get_feature
 
 logger = Logger.get_logger()
 
@@ -32,15 +36,19 @@ def main():
                         help='配置文件路径')
     parser.add_argument('--custom', type=str, default='default',
                         help='自定义配置文件名，如custom-default.yaml')
+    parser.add_argument('--num-envs', type=int, default=None,
+                        help='每个智能体的并行环境数量，覆盖配置中的 num_envs')
 
     args = parser.parse_args()
 
     # 加载配置
     logger.info(f"Loading config from path：{args.path} custom: {args.custom} mode: {args.mode}")
     config = ConfigYaml(args.path,args.custom).all()
+    if args.num_envs is not None:
+        config['num_envs'] = args.num_envs
 
     # 加载特征
-    feature = Feature(config=config)
+    feature = get_feature(config=config)
 
     # 创建多智能体管理器
     manager = AgentMulti(config=config, feature= feature)
@@ -83,29 +91,14 @@ def main():
             client.set_leverage(symbol=symbol, leverage=config.get('leverage', 1))
             client.set_margin_type(symbol=symbol, margin_type=config.get('margin_type', 'ISOLATED'))
 
-        # 实时交易循环
+        # 实时交易循环，各交易对的1m/15m K线并发请求（客户端复用同一个长连接池）
+        executor = ThreadPoolExecutor(max_workers=max(1, len(config['symbols']) * 2))
+        # 市场数据结构只建一次，每个周期原地覆盖
+        market_data = {symbol: {'1m': None, '15m': None} for symbol in config['symbols']}
         try:
             while True:
                 # 获取市场数据
-                market_data = {}
-                for symbol in config['symbols']:
-                    # 获取K线数据
-                    klines_1m = client.get_klines(
-                        symbol=symbol,
-                        interval='1m',
-                        limit=config['window_size']
-                    )
-                    klines_15m = client.get_klines(
-                        symbol=symbol,
-                        interval='15m',
-                        limit=config['window_size']
-                    )
-
-                    # 处理数据为模型可接受的格式
-                    market_data[symbol] = {
-                        '1m': process_klines(klines_1m),
-                        '15m': process_klines(klines_15m)
-                    }
+                fetch_market_data(client, executor, market_data, config['window_size'])
 
                 # 预测交易动作
                 predictions = manager.predict(market_data)
@@ -127,12 +120,38 @@ def main():
             logger.info("用户中断，退出交易")
         except Exception as e:
             logger.error(f"交易过程中发生错误: {str(e)}")
+        finally:
+            executor.shutdown(wait=False)
     else:
         # 回测模式
         logger.info("开始回测...")
         backtest_results = run_backtest(manager, config)
         logger.info(f"回测结果: {backtest_results}")
 
+def fetch_market_data(client: ClientInterface, executor: ThreadPoolExecutor, market_data: Dict[str, Dict[str, any]],
+                      window_size: int):
+    """
+    并发获取各交易对的1m和15m K线数据，原地更新 market_data
+
+    Args:
+        client: 交易客户端
+        executor: 请求线程池
+        market_data: {交易对: {'1m': 数据, '15m': 数据}}，循环外预先建好，每次只覆盖数据
+        window_size: K线数量
+
+    Returns:
+        market_data
+    """
+    futures = [
+        (data, interval, executor.submit(client.get_klines, symbol=symbol, interval=interval, limit=window_size))
+        for symbol, data in market_data.items()
+        for interval in data
+    ]
+    # 处理数据为模型可接受的格式
+    for data, interval, future in futures:
+        data[interval] = process_klines(future.result())
+    return market_data
+
 def get_client(config: Dict[str, any]):
     """
     获取 客户端
@@ -153,7 +172,7 @@ def get_client(config: Dict[str, any]):
 def run_backtest(manager, config):
     """运行回测"""
     import pandas as pd
-    from datetime import datetime, timedelta
+    from datetime import timedelta
 
     logger.info("加载回测数据...")
 
@@ -181,25 +200,27 @@ def run_backtest(manager, config):
         data_dir=config['data_dir']
     )
 
-    # 回测循环
-    current_date = datetime.strptime(start_date, '%Y-%m-%d')
-    end_datetime = datetime.strptime(end_date, '%Y-%m-%d')
-
-    while current_date <= end_datetime:
-        # 获取当前日期的市场数据
-        market_data = {}
-        for symbol in config['symbols']:
-            market_data[symbol] = get_market_data_for_date(
-                historical_data[symbol],
-                current_date,
-                config['window_size']
-            )
-
-        # 预测交易动作
-        predictions = manager.predict(market_data)
-
+    # 回测日期（多一天用于取最后一个交易日的次日价格）
+    dates = pd.date_range(start_date, end_date, freq='D')
+    price_dates = dates.append(pd.DatetimeIndex([dates[-1] + timedelta(days=1)])) if len(dates) > 0 else dates
+
+    # 一次性按日期建立各交易对的收盘价数组，缺失日期价格为0
+    closes = {symbol: get_daily_closes(historical_data[symbol], price_dates) for symbol in config['symbols']}
+
+    # 获取每个日期的市场数据，所有日期一次批量预测交易动作
+    market_data_batch = [
+        {
+            symbol: get_market_data_for_date(historical_data[symbol], current_date, config['window_size'])
+            for symbol in config['symbols']
+        }
+        for current_date in dates
+    ]
+    predictions_batch = manager.predict_batch(market_data_batch)
+
+    # 回测循环（余额逐日变化，仓位大小依赖当日余额）
+    for day, (current_date, predictions) in enumerate(zip(dates, predictions_batch)):
         # 模拟交易执行
-        trades, pnl = simulate_trades(predictions, historical_data, current_date, results['balance'])
+        trades, pnl = simulate_trades(predictions, closes, day, current_date, results['balance'])
 
         # 更新结果
         results['balance'] += pnl
@@ -210,30 +231,39 @@ def run_backtest(manager, config):
             'balance': results['balance']
         })
 
-        # 移动到下一个交易日
-        current_date += timedelta(days=1)
-
     # 计算回测指标
     results['metrics'] = calc_backtest_metrics(results)
 
     return results
 
-def simulate_trades(predictions, historical_data, date, balance):
-    """模拟交易执行"""
+def simulate_trades(predictions, closes, day, date, balance):
+    """
+    模拟交易执行
+
+    Args:
+        predictions: 各交易对的预测结果
+        closes: 各交易对按回测日期对齐的收盘价数组（见 get_daily_closes）
+        day: 当前日期在回测日期中的序号
+        date: 当前日期
+        balance: 当前余额
+
+    Returns:
+        (交易列表, 当日盈亏)
+    """
     trades = []
     total_pnl = 0
 
     for symbol, prediction in predictions.items():
-        action = prediction.get('final_action', {}).get('action', '未知')
+        action = prediction.get('final_action', {}).get('action', ActionCode.UNKNOWN)
 
-        if action in ['买入', '卖出']:
+        if action == ActionCode.BUY or action == ActionCode.SELL:
             # 模拟交易执行
-            price = get_price_for_date(historical_data[symbol], date)
+            price = closes[symbol][day]
             size = calc_position_size(balance, price, prediction)
 
             trade = {
                 'symbol': symbol,
-                'action': action,
+                'action': action_display(action),
                 'price': price,
                 'size': size,
                 'date': date.strftime('%Y-%m-%d')
@@ -241,24 +271,40 @@ def simulate_trades(predictions, historical_data, date, balance):
             trades.append(trade)
 
             # 计算盈亏
-            next_day_price = get_price_for_date(historical_data[symbol], date + timedelta(days=1))
+            next_day_price = closes[symbol][day + 1]
             if next_day_price > 0:
-                if action == '买入':
-                    pnl = (next_day_price - price) * size
-                else:
-                    pnl = (price - next_day_price) * size
-                total_pnl += pnl
+                direction = 1 if action == ActionCode.BUY else -1
+                total_pnl += (next_day_price - price) * size * direction
 
     return trades, total_pnl
 
-def get_price_for_date(historical_data, date):
-    """获取指定日期的价格"""
-    # 实现获取指定日期价格的逻辑
-    # 这里简化处理，实际应用中需要根据具体数据格式进行处理
-    data = historical_data[historical_data['date'] == date.strftime('%Y-%m-%d')]
-    if len(data) > 0:
-        return data['close'].values[0]
-    return 0
+def get_daily_closes(historical_data, dates):
+    """
+    按日期对齐收盘价，同一日期有多条记录时取第一条，缺失日期价格为0
+
+    Args:
+        historical_data: 历史数据，包含 date 与 close 列
+        dates: 日期序列
+
+    Returns:
+        与 dates 对齐的收盘价数组
+    """
+    import numpy as np
+    import pandas as pd
+
+    # 日期排序一次（稳定排序，相同日期保持原顺序），再用二分查找定位每个回测日期
+    dates64 = pd.to_datetime(historical_data['date']).to_numpy(dtype='datetime64[ns]')
+    order = np.argsort(dates64, kind='stable')
+    dates64 = dates64[order]
+    closes = historical_data['close'].to_numpy(dtype=np.float64)[order]
+
+    targets = pd.DatetimeIndex(dates).to_numpy(dtype='datetime64[ns]')
+    result = np.zeros(len(targets), dtype=np.float64)
+    idx = np.searchsorted(dates64, targets)
+    hit = np.flatnonzero(idx < len(dates64))
+    hit = hit[dates64[idx[hit]] == targets[hit]]
+    result[hit] = closes[idx[hit]]
+    return result
 
 def calc_position_size(balance, price, prediction):
     """计算仓位大小"""
@@ -282,29 +328,13 @@ def calc_backtest_metrics(results):
     import numpy as np
 
     # 提取数据
-    equity_curve = [item['balance'] for item in results['equity_curve']]
-    pnl = results['pnl']
-
-    # 计算指标
-    total_return = (equity_curve[-1] / equity_curve[0] - 1) * 100 if equity_curve[0] > 0 else 0
-
-    # 计算最大回撤
-    max_drawdown = 0
-    peak = equity_curve[0]
-    for value in equity_curve:
-        if value > peak:
-            peak = value
-        drawdown = (peak - value) / peak * 100 if peak > 0 else 0
-        max_drawdown = max(max_drawdown, drawdown)
-
-    # 计算夏普比率
-    returns = np.diff(equity_curve) / equity_curve[:-1]
-    sharpe_ratio = np.mean(returns) / np.std(returns) * np.sqrt(252) if len(returns) > 0 and np.std(returns) > 0 else 0
-
-    # 计算胜率
-    win_trades = sum(1 for p in pnl if p > 0)
+    curve = results['equity_curve']
+    equity_curve = np.fromiter((item['balance'] for item in curve), dtype=np.float64, count=len(curve))
+    pnl = np.asarray(results['pnl'], dtype=np.float64)
+
+    # 一次遍历计算各项指标（Numba 预编译）
+    total_return, max_drawdown, sharpe_ratio, win_rate = backtest_metrics(equity_curve, pnl)
     total_trades = len(pnl)
-    win_rate = win_trades / total_trades * 100 if total_trades > 0 else 0
 
     return {
         'total_return': total_return,
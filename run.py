@@ -84,6 +84,9 @@ def main():
     parser.add_argument('--loss', type=str, default='mse', help='损失函数类型')
     parser.add_argument('--lradj', type=str, default='type1', help='学习率调整策略')
     parser.add_argument('--use_amp', action='store_true', help='是否使用混合精度训练', default=False)
+    parser.add_argument('--deterministic', action='store_true',
+                        help='是否要求结果可复现，添加此参数时不开启cuDNN自动调优', default=False)
+    parser.add_argument('--tf32', action='store_true', help='是否允许TF32矩阵乘法（Ampere及以上，会改变训练数值）', default=False)
 
     # GPU配置
     parser.add_argument('--use_gpu', type=bool, default=True, help='是否使用GPU')
@@ -101,36 +104,48 @@ def main():
         args.device_ids = [int(id_) for id_ in device_ids]
         args.gpu = args.device_ids[0]
 
+    # 输入形状固定，开启cuDNN自动调优
+    if not args.deterministic:
+        torch.backends.cudnn.benchmark = True
+    # TF32 会改变训练数值，仅在显式指定时开启（Ampere及以上）
+    if args.tf32:
+        torch.set_float32_matmul_precision('high')
+
     print('Args in experiment:')
     print(args)
 
     Exp = Exp_Main
 
     if args.is_training:
+        # setting record of experiments，除重复序号外都不变，只构造一次
+        setting_prefix = '{}_{}_{}_modes{}_{}_ft{}_sl{}_ll{}_pl{}_dm{}_nh{}_el{}_dl{}_df{}_fc{}_eb{}_dt{}_{}'.format(
+            args.task_id,
+            args.model,
+            args.mode_select,
+            args.modes,
+            args.data,
+            args.features,
+            args.seq_len,
+            args.label_len,
+            args.pred_len,
+            args.d_model,
+            args.n_heads,
+            args.e_layers,
+            args.d_layers,
+            args.d_ff,
+            args.factor,
+            args.embed,
+            args.distil,
+            args.des)
+        exp = None
         for ii in range(args.itr):
-            # setting record of experiments
-            setting = '{}_{}_{}_modes{}_{}_ft{}_sl{}_ll{}_pl{}_dm{}_nh{}_el{}_dl{}_df{}_fc{}_eb{}_dt{}_{}_{}'.format(
-                args.task_id,
-                args.model,
-                args.mode_select,
-                args.modes,
-                args.data,
-                args.features,
-                args.seq_len,
-                args.label_len,
-                args.pred_len,
-                args.d_model,
-                args.n_heads,
-                args.e_layers,
-                args.d_layers,
-                args.d_ff,
-                args.factor,
-                args.embed,
-                args.distil,
-                args.des,
-                ii)
-
-            exp = Exp(args)  # set experiments
+            setting = f'{setting_prefix}_{ii}'
+
+            # set experiments，重复实验复用同一个实验对象，只重新初始化模型
+            if exp is None:
+                exp = Exp(args)
+            else:
+                exp.reset()
             print('>>>>>>>start training : {}>>>>>>>>>>>>>>>>>>>>>>>>>>'.format(setting))
             exp.train(setting)
 
@@ -141,7 +156,8 @@ def main():
                 print('>>>>>>>predicting : {}<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<'.format(setting))
                 exp.predict(setting, True)
 
-            torch.cuda.empty_cache()
+        # 缓存分配器在重复实验间复用显存，全部结束后再释放
+        torch.cuda.empty_cache()
     else:
         ii = 0
         setting = '{}_{}_{}_ft{}_sl{}_ll{}_pl{}_dm{}_nh{}_el{}_dl{}_df{}_fc{}_eb{}_dt{}_{}_{}'.format(args.task_id,
@@ -0,0 +1,103 @@
+"""
+多智能体管理器推理测试
+"""
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+gym = pytest.importorskip("gymnasium")
+pytest.importorskip("stable_baselines3")
+agent_multi = pytest.importorskip("agents.agent_multi")
+
+from gymnasium import spaces
+from stable_baselines3 import A2C, PPO, SAC
+
+from const.const import ActionCode
+
+_MARKET = spaces.Box(low=-1.0, high=1.0, shape=(4,), dtype=np.float32)
+
+
+class _DummyEnv(gym.Env):
+    """只提供观察空间和动作空间的环境，用于构造智能体"""
+
+    def __init__(self, observation_space: spaces.Space, action_space: spaces.Space):
+        super().__init__()
+        self.observation_space = observation_space
+        self.action_space = action_space
+
+    def reset(self, seed=None, options=None):
+        super().reset(seed=seed)
+        return self.observation_space.sample(), {}
+
+    def step(self, action):
+        return self.observation_space.sample(), 0.0, True, False, {}
+
+
+def _make_manager() -> "agent_multi.AgentMulti":
+    """构造只包含三个智能体的多智能体管理器，跳过环境与特征的初始化"""
+    torch.manual_seed(0)
+    manager = agent_multi.AgentMulti.__new__(agent_multi.AgentMulti)
+    manager.agent_trend = A2C(
+        "MultiInputPolicy",
+        _DummyEnv(spaces.Dict({"market": _MARKET}), spaces.Discrete(3)),
+    )
+    manager.agent_position = PPO(
+        "MultiInputPolicy",
+        _DummyEnv(spaces.Dict({"market": _MARKET, "trend": spaces.Discrete(3)}), spaces.Discrete(3)),
+        n_steps=8,
+        batch_size=8,
+    )
+    manager.agent_execution = SAC(
+        "MultiInputPolicy",
+        _DummyEnv(
+            spaces.Dict({"market": _MARKET, "trend": spaces.Discrete(3), "position": spaces.Discrete(3)}),
+            spaces.Box(low=0.0, high=3.0, shape=(1,), dtype=np.float32),
+        ),
+        buffer_size=16,
+    )
+    manager._cache_policies()
+    return manager
+
+
+def _market_data() -> dict:
+    return {"market": np.full(4, 0.5, dtype=np.float32)}
+
+
+def test_predict_single_observation():
+    """单条观察推理得到去掉批维的动作，并能解释为有效的交易动作"""
+    manager = _make_manager()
+
+    trend_action = manager._policy_act("trend", _market_data())
+    assert trend_action.shape == ()
+
+    results = manager.predict(_market_data())
+    assert results["trend"] != "未知<震荡>"
+    assert results["position"] != "未知<空仓>"
+    assert results["final_action"]["action"] != ActionCode.UNKNOWN
+
+
+def test_predict_batch_matches_single():
+    """批量推理与逐条推理的结果一致"""
+    manager = _make_manager()
+    batch = [_market_data(), {"market": np.full(4, -0.5, dtype=np.float32)}]
+
+    results = manager.predict_batch(batch)
+    assert len(results) == len(batch)
+    for market_data, result in zip(batch, results):
+        expected = manager.predict(market_data)
+        assert result["trend"] == expected["trend"]
+        assert result["position"] == expected["position"]
+        assert result["final_action"]["action"] == expected["final_action"]["action"]
+
+
+def test_traced_box_actions_match_policy_predict():
+    """追踪推理的 Box 动作经过反缩放，与 SB3 predict 的结果一致"""
+    manager = _make_manager()
+    observation = {**_market_data(), "trend": np.int64(1), "position": np.int64(2)}
+
+    action = manager._policy_act("execution", observation)
+    expected, _ = manager.agent_execution.predict(observation, deterministic=True)
+    assert action.shape == expected.shape == (1,)
+    assert 0.0 <= action[0] <= 3.0
+    np.testing.assert_allclose(action, expected, rtol=1e-5, atol=1e-6)
@@ -0,0 +1,31 @@
+"""
+智能体动作解释测试
+"""
+
+import numpy as np
+import pytest
+
+from agents.agent_utils import final_action, interpret_execution, interpret_trend
+from const.const import ActionCode
+
+
+def test_interpret_accepts_sb3_action_arrays():
+    """0维与单元素数组按动作值解释"""
+    assert interpret_trend(np.array(1)) == "上涨"
+    assert interpret_trend(np.array([2])) == "下跌"
+    assert interpret_execution(np.int64(0)) == "立即执行"
+    assert final_action(np.array(1), np.array([1]), np.array(0))["action"] == ActionCode.BUY
+
+
+def test_interpret_out_of_range_is_unknown():
+    """越界动作值解释为未知"""
+    assert interpret_trend(5) == "未知<震荡>"
+    assert final_action(0, -1, 0)["action"] == ActionCode.UNKNOWN
+
+
+def test_malformed_action_raises():
+    """形状错误的动作直接报错，不当作未知动作"""
+    with pytest.raises(ValueError):
+        interpret_trend(np.array([1, 2]))
+    with pytest.raises(TypeError):
+        final_action(None, 1, 0)
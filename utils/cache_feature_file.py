@@ -1,11 +1,24 @@
 import os
-import portalocker
+import numpy as np
 import pickle
 import hashlib
+import io
+import struct
+import zlib
 import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Optional
 import time
 
+# .npy 文件头，用于区分 numpy 格式与 pickle 格式的缓存文件
+NPY_MAGIC: bytes = b"\x93NUMPY"
+
+# 带校验的缓存文件头: 4字节标识 + 4字节 CRC32（小端），之后是 .npy 或 pickle 数据
+CRC_MAGIC: bytes = b"CFC1"
+CRC_HEADER = struct.Struct("<4sI")
+
+
 class CacheFeatureFile:
     """
     基于文件系统的缓存管理器，支持高并发访问
@@ -13,7 +26,7 @@ class CacheFeatureFile:
     _instances = {}
     _lock = threading.Lock()
 
-    def __init__(self, cache_dir: str, prefix: str = "cache", subdir_length: int = 3):
+    def __init__(self, cache_dir: str, prefix: str = "cache", subdir_length: int = 3, hot_size: int = 1024):
         """
         初始化缓存管理器
         
@@ -21,35 +34,69 @@ class CacheFeatureFile:
             cache_dir: 缓存目录
             prefix: 缓存文件前缀
             subdir_length: 用于创建子目录的缓存键前缀长度
+            hot_size: 内存中保留的最近使用缓存数量，0 表示不使用内存缓存
         """
         self.cache_dir = cache_dir
         self.prefix = prefix
         self.subdir_length = subdir_length
+        # 已创建的子目录，避免每次读写都调用 makedirs
+        self._created_subdirs: set = set()
+        # 内存 LRU 层: 缓存键 -> 数据，命中时跳过读文件和反序列化
+        self._hot: OrderedDict = OrderedDict()
+        self._hot_max: int = hot_size
+        self._hot_lock = threading.Lock()
         os.makedirs(cache_dir, exist_ok=True)
         
     @classmethod
-    def get_instance(cls, cache_dir: str, prefix: str = "cache", subdir_length: int = 3) -> 'CacheFeatureFile':
+    def get_instance(cls, cache_dir: str, prefix: str = "cache", subdir_length: int = 3,
+                     hot_size: int = 1024) -> 'CacheFeatureFile':
         """
-        获取缓存管理器实例（单例模式）
+        获取缓存管理器实例（单例模式），hot_size 只在首次创建实例时生效
         """
         key = f"{cache_dir}_{prefix}_{subdir_length}"
         if key not in cls._instances:
             with cls._lock:
                 if key not in cls._instances:
-                    cls._instances[key] = cls(cache_dir, prefix, subdir_length)
+                    cls._instances[key] = cls(cache_dir, prefix, subdir_length, hot_size)
         return cls._instances[key]
 
+    def _hot_get(self, cache_key: str) -> Optional[Any]:
+        """
+        从内存 LRU 层读取，命中时移到最近使用的位置
+        """
+        with self._hot_lock:
+            data = self._hot.get(cache_key)
+            if data is not None:
+                self._hot.move_to_end(cache_key)
+            return data
+
+    def _hot_put(self, cache_key: str, data: Any) -> None:
+        """
+        写入内存 LRU 层，超出容量时淘汰最久未使用的数据
+        """
+        if self._hot_max <= 0:
+            return
+        with self._hot_lock:
+            self._hot[cache_key] = data
+            self._hot.move_to_end(cache_key)
+            if len(self._hot) > self._hot_max:
+                self._hot.popitem(last=False)
+
     def _get_cache_key(self, *args, **kwargs) -> str:
         """
         生成缓存键
         """
-        # 将所有参数转换为字符串并连接
+        # 将所有参数转换为字符串，以 "_" 分隔依次送入哈希，不拼接中间字符串
         key_parts = [str(arg) for arg in args]
         key_parts.extend(f"{k}={v}" for k, v in sorted(kwargs.items()))
-        key_str = "_".join(key_parts)
-        
-        # 使用MD5生成固定长度的键
-        return hashlib.md5(key_str.encode()).hexdigest()
+
+        # 键只用作文件名，不需要密码学强度；BLAKE2b 比 MD5 快，16字节摘要与原来的长度一致
+        hasher = hashlib.blake2b(digest_size=16)
+        for i, part in enumerate(key_parts):
+            if i:
+                hasher.update(b"_")
+            hasher.update(part.encode())
+        return hasher.hexdigest()
 
     def _get_cache_path(self, cache_key: str) -> str:
         """
@@ -58,7 +105,10 @@ class CacheFeatureFile:
         # 使用缓存键的前几个字符作为子目录名
         subdir = cache_key[:self.subdir_length]
         subdir_path = os.path.join(self.cache_dir, subdir)
-        os.makedirs(subdir_path, exist_ok=True)
+        # set.add 在 GIL 下是原子的，并发时最多重复调用一次 makedirs(exist_ok=True)
+        if subdir not in self._created_subdirs:
+            os.makedirs(subdir_path, exist_ok=True)
+            self._created_subdirs.add(subdir)
         return os.path.join(subdir_path, f"{self.prefix}_{cache_key}.pkl")
 
     def get(self,t="15m", start=0, end=0, step_1m=0,  *args, **kwargs) -> Optional[Any]:
@@ -66,42 +116,84 @@ class CacheFeatureFile:
         获取缓存数据
         """
         cache_key = f"{start}_{end}_{step_1m}_{t}"
+        data = self._hot_get(cache_key)
+        if data is not None:
+            return data
         cache_path = self._get_cache_path(cache_key)
-        
+
+        # 一次 stat 同时得到是否存在、大小和修改时间
         try:
-            if os.path.exists(cache_path):
-                # 大小是否小于10字节
-                if os.path.getsize(cache_path) < 10:
-                    # 看是否大于10秒
-                    if time.time() - os.path.getmtime(cache_path) < 10:
-                        os.remove(cache_path)
+            st = os.stat(cache_path)
+        except OSError:
+            return None
+        # 大小是否小于10字节
+        if st.st_size < 10:
+            # 看是否大于10秒
+            if time.time() - st.st_mtime < 10:
+                self._remove_recent(cache_path)
+            return None
+        try:
+            # 写入方先写临时文件再原子替换，读取时看到的总是完整文件，不需要加锁
+            with open(cache_path, 'rb') as f:
+                buf = f.read()
+            payload = memoryview(buf)
+            # 带校验头的文件先校验 CRC，损坏时不做反序列化直接删除
+            if buf[:len(CRC_MAGIC)] == CRC_MAGIC:
+                _, crc = CRC_HEADER.unpack_from(buf)
+                payload = payload[CRC_HEADER.size:]
+                if zlib.crc32(payload) != crc:
+                    os.remove(cache_path)
                     return None
-                with open(cache_path, 'rb') as f:
-                    # 加锁
-                    portalocker.lock(f, portalocker.LOCK_SH)  # 共享锁（读锁）
-                    try:
-                        data = pickle.load(f)
-                        return data
-                    except :
-                        return None
-                    finally:
-                        portalocker.unlock(f) # 解锁
+            data = self._decode(payload)
+            self._hot_put(cache_key, data)
+            return data
+        except (pickle.UnpicklingError, EOFError, ValueError):
+            # 无校验头的旧文件损坏
+            return None
         except (OSError, pickle.PickleError) as e:
             print(f"Error reading cache: {e} 88 f:{cache_path}")
             # 如果读取失败，删除可能损坏的缓存文件
-            try:
-                if time.time() - os.path.getmtime(cache_path) < 10:
-                    os.remove(cache_path)
-            except OSError:
-                pass
+            self._remove_recent(cache_path)
             return None
         except Exception as e:
-            if os.path.getsize(cache_path) < 10: # 看是否大于10秒
-                if time.time() - os.path.getmtime(cache_path) < 10:
-                    os.remove(cache_path)
             print(f"Error reading cache: {e} 99 f:{cache_path}")
         return None
 
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        """
+        序列化缓存数据: 不含 Python 对象的 ndarray 用 .npy 格式，加载时不需要重建对象，其余用 pickle
+        """
+        if isinstance(value, np.ndarray) and not value.dtype.hasobject:
+            out = io.BytesIO()
+            np.save(out, value, allow_pickle=False)
+            return out.getvalue()
+        return pickle.dumps(value, protocol=5)
+
+    @staticmethod
+    def _decode(payload: memoryview) -> Any:
+        """
+        按数据头选择 np.load 或 pickle.loads 反序列化
+        """
+        if payload[:len(NPY_MAGIC)] == NPY_MAGIC:
+            return np.load(io.BytesIO(payload), allow_pickle=False)
+        return pickle.loads(payload)
+
+    @staticmethod
+    def _remove_recent(cache_path: str) -> None:
+        """
+        删除10秒内修改过的缓存文件（可能是写入中断留下的损坏文件）
+
+        Args:
+            cache_path: 缓存文件路径
+        """
+        try:
+            st = os.stat(cache_path)
+            if time.time() - st.st_mtime < 10:
+                os.remove(cache_path)
+        except OSError:
+            pass
+
     def set(self, value: Any, t="15m", start=0, end=0, step_1m=0, *args, **kwargs) -> None:
         """
         设置缓存数据
@@ -110,28 +202,40 @@ class CacheFeatureFile:
         cache_key = f"{start}_{end}_{step_1m}_{t}"
         cache_path = self._get_cache_path(cache_key)
         
+        # 每个进程/线程写自己的临时文件，写完后原子替换，不需要文件锁
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
         try:
-            with open(cache_path, 'wb') as f:
-                # 加锁
-                portalocker.lock(f, portalocker.LOCK_EX)  # 独占锁（写锁）
-                try:
-                    pickle.dump(value, f)
-                    f.flush()  # 确保数据写入磁盘
-                finally:
-                    # 解锁
-                    portalocker.unlock(f)
-        except (OSError, pickle.PickleError) as e:
-            # 如果写入失败，删除可能损坏的缓存文件
+            payload = self._encode(value)
             try:
-                if time.time() - os.path.getmtime(cache_path) < 10:
-                    os.remove(cache_path)
+                self._write_atomic(tmp_path, cache_path, payload)
+            except FileNotFoundError:
+                # 子目录可能已被其他进程的 clear_expired 删除，重建后重试一次
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                self._write_atomic(tmp_path, cache_path, payload)
+            self._hot_put(cache_key, value)
+        except Exception as e:
+            # 写入失败只删除临时文件，已有的完整缓存文件不受影响
+            try:
+                os.unlink(tmp_path)
             except OSError:
                 pass
-        except Exception as e:
-            if os.path.getsize(cache_path) < 10: # 看是否大于10秒
-                if time.time() - os.path.getmtime(cache_path) < 10:
-                    os.remove(cache_path)
-            print(f"Error writing cache: {e} 112 f:{cache_path}")
+            if not isinstance(e, (OSError, pickle.PickleError)):
+                print(f"Error writing cache: {e} 112 f:{cache_path}")
+
+    @staticmethod
+    def _write_atomic(tmp_path: str, cache_path: str, payload: bytes) -> None:
+        """
+        写入带 CRC 头的临时文件后原子替换为缓存文件
+
+        Args:
+            tmp_path: 临时文件路径
+            cache_path: 缓存文件路径
+            payload: 序列化后的数据
+        """
+        with open(tmp_path, 'wb') as f:
+            f.write(CRC_HEADER.pack(CRC_MAGIC, zlib.crc32(payload)))
+            f.write(payload)
+        os.replace(tmp_path, cache_path)
 
     def clear(self) -> None:
         """
@@ -140,6 +244,9 @@ class CacheFeatureFile:
         try:
             import shutil
             shutil.rmtree(self.cache_dir)
+            self._created_subdirs.clear()
+            with self._hot_lock:
+                self._hot.clear()
             os.makedirs(self.cache_dir, exist_ok=True)
         except OSError as e:
             print(f"Error clearing cache: {e}")
@@ -151,24 +258,65 @@ class CacheFeatureFile:
         Args:
             max_age_seconds: 缓存文件的最大年龄（秒）
         """
+        # 内存中的数据无法与文件年龄对应，整体清空
+        with self._hot_lock:
+            self._hot.clear()
+        cutoff = time.time() - max_age_seconds
         try:
-            current_time = time.time()
-            for root, dirs, files in os.walk(self.cache_dir):
-                for file in files:
-                    if file.endswith('.pkl'):
-                        file_path = os.path.join(root, file)
-                        if current_time - os.path.getmtime(file_path) > max_age_seconds:
-                            try:
-                                os.remove(file_path)
-                            except OSError:
-                                pass
-                # 删除空目录
-                for dirV in dirs:
-                    dir_path = os.path.join(root, dirV)
-                    try:
-                        os.rmdir(dir_path)
-                    except OSError:
-                        # 目录不为空或其他错误，跳过
-                        pass
+            subdirs = self._clear_expired_dir(self.cache_dir, cutoff)
+            # 各子目录互不相关，并发清理
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                removed = list(executor.map(lambda d: self._clear_expired_tree(d, cutoff), subdirs))
+            # 删除空目录
+            for entry_path, empty in zip(subdirs, removed):
+                if empty:
+                    self._created_subdirs.discard(os.path.basename(entry_path))
         except OSError as e:
             print(f"Error clearing expired cache: {e}")
+
+    @staticmethod
+    def _clear_expired_dir(path: str, cutoff: float) -> list:
+        """
+        删除目录下修改时间早于 cutoff 的缓存文件（DirEntry 自带 stat 结果，不再额外 stat）
+
+        Args:
+            path: 目录
+            cutoff: 修改时间阈值
+
+        Returns:
+            子目录路径列表
+        """
+        subdirs = []
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                # 写入中断残留的临时文件同样按修改时间清理
+                elif entry.name.endswith(('.pkl', '.tmp')) and entry.is_file():
+                    try:
+                        if entry.stat().st_mtime < cutoff:
+                            os.unlink(entry.path)
+                    except FileNotFoundError:
+                        pass
+        return subdirs
+
+    @classmethod
+    def _clear_expired_tree(cls, path: str, cutoff: float) -> bool:
+        """
+        递归清理子目录，清理后为空的目录一并删除
+
+        Args:
+            path: 目录
+            cutoff: 修改时间阈值
+
+        Returns:
+            目录是否已删除
+        """
+        try:
+            for subdir in cls._clear_expired_dir(path, cutoff):
+                cls._clear_expired_tree(subdir, cutoff)
+            os.rmdir(path)
+            return True
+        except OSError:
+            # 目录不为空或其他错误，跳过
+            return False
@@ -1,14 +1,27 @@
+import fcntl
+import mmap
+import os
 import sqlite3
 import pickle
+import threading
 
 from utils.logger import Logger
 
 logger = Logger.get_logger()
 
+# 批量查询时每条语句包含的 (start_idx, end_idx) 个数，避免超过 SQLite 参数个数上限
+IN_BATCH_SIZE: int = 400
+
+# 单个数据文件的大小上限，超过后写入新的数据文件
+DATA_FILE_MAX_BYTES: int = 1 << 30
+
 
 class CacheFeatureSQLite:
     """
     使用 SQLite 存储滑动窗口归一化数据的缓存类。
+
+    序列化后的数据追加写入数据文件，SQLite 只保存 (start_idx, end_idx) -> (文件号, 偏移, 长度) 的索引，
+    读取时通过 mmap 直接反序列化。多个进程写入同一个缓存时，通过锁文件串行追加数据并提交索引。
     """
 
     def __init__(self, k: str = "1m", db_path: str = "resource/cache/normalized_data.db", window_size:int = 512):
@@ -18,21 +31,91 @@ class CacheFeatureSQLite:
         :param db_path: SQLite 数据库文件路径
         """
         self.db_path: str = db_path
-        self.table: str = f"sqlite_cache_{k}_ws{window_size}"
+        # SQLite 保留 sqlite_ 开头的表名，索引表不能使用该前缀
+        self.table: str = f"cache_idx_{k}_ws{window_size}"
         self.f_s: str = "s"  # start_idx
         self.f_e: str = "e"  # end_idx
-        self.f_d: str = "d"  # data
-        self.connection = sqlite3.connect(self.db_path)
+        self.f_n: str = "n"  # 数据文件号
+        self.f_o: str = "o"  # 数据偏移
+        self.f_l: str = "l"  # 数据长度
+        self._data_prefix: str = f"{os.path.splitext(db_path)[0]}_{self.table}"
+        # 每个线程一个连接，WAL 模式下多个线程可以并发读
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        # SQLite 同一时间只允许一个写事务，写操作串行执行
+        self._write_lock = threading.Lock()
         self._create_table()
+        self._insert_sql: str = (f"INSERT OR REPLACE INTO `{self.table}` (`{self.f_s}`, `{self.f_e}`, `{self.f_n}`, `{self.f_o}`, `{self.f_l}`) "
+                                 f"VALUES (?, ?, ?, ?, ?);")
+        # 追加写入的数据文件，从索引中最大的文件号继续写
+        row = self.connection.execute(f"SELECT MAX(`{self.f_n}`) FROM `{self.table}`;").fetchone()
+        self._file_no: int = row[0] or 0
+        self._writer = open(self._data_path(self._file_no), 'ab')
+        # 进程间的写锁，覆盖该表的所有数据文件
+        self._lock_file = open(f"{self._data_prefix}.lock", 'ab')
+        # 文件号 -> 只读 mmap，数据文件增长后重新映射
+        self._maps = {}
+        self._maps_lock = threading.Lock()
+
+    def _data_path(self, file_no: int) -> str:
+        """
+        数据文件路径。
+
+        :param file_no: 数据文件号
+        :return: 文件路径
+        """
+        return f"{self._data_prefix}_{file_no:04d}.bin"
+
+    def _read(self, file_no: int, offset: int, length: int):
+        """
+        通过 mmap 读取并反序列化一条数据。
+
+        :param file_no: 数据文件号
+        :param offset: 数据偏移
+        :param length: 数据长度
+        :return: 反序列化后的数据
+        """
+        with self._maps_lock:
+            mm = self._maps.get(file_no)
+            if mm is None or len(mm) < offset + length:
+                # 旧的映射可能仍被其他线程使用，不主动关闭，由垃圾回收释放
+                with open(self._data_path(file_no), 'rb') as f:
+                    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[file_no] = mm
+        with memoryview(mm) as view, view[offset:offset + length] as blob:
+            return pickle.loads(blob)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """
+        当前线程的数据库连接，首次使用时创建。
+        """
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            # WAL 模式追加写，降低 fsync 次数
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA mmap_size=268435456")
+            conn.execute("PRAGMA cache_size=-65536")
+            self._local.connection = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
 
     def _create_table(self):
         """
         创建用于存储窗口数据的表（如果不存在）。
         """
-        query = f"CREATE TABLE IF NOT EXISTS `{self.table}` (`{self.f_s}` INTEGER NOT NULL, `{self.f_e}` INTEGER NOT NULL, `{self.f_d}` BLOB NOT NULL, PRIMARY KEY (`{self.f_s}`, `{self.f_e}`));"
+        query = (f"CREATE TABLE IF NOT EXISTS `{self.table}` (`{self.f_s}` INTEGER NOT NULL, `{self.f_e}` INTEGER NOT NULL, "
+                 f"`{self.f_n}` INTEGER NOT NULL, `{self.f_o}` INTEGER NOT NULL, `{self.f_l}` INTEGER NOT NULL, "
+                 f"PRIMARY KEY (`{self.f_s}`, `{self.f_e}`));")
         # print(f"sql:{query}")
-        self.connection.execute(query)
-        self.connection.commit()
+        with self._write_lock:
+            self.connection.execute(query)
+            self.connection.commit()
         logger.info(f"缓存{self.db_path}表已创建")
 
     def save(self, start_idx, end_idx, data):
@@ -43,13 +126,39 @@ class CacheFeatureSQLite:
         :param end_idx: 窗口结束索引
         :param data: 要保存的 DataFrame 数据
         """
-        # 将 DataFrame 序列化为二进制
-        data_blob = pickle.dumps(data)
-        query = f"INSERT OR REPLACE INTO `{self.table}` (`{self.f_s}`, `{self.f_e}`, `{self.f_d}`) VALUES (?, ?, ?);"
-        # print(f"sql:{query}")
-        self.connection.execute(query, (start_idx, end_idx, data_blob))
-        self.connection.commit()
-        print(f"窗口 {start_idx}-{end_idx} 的数据已存储到缓存")
+        self.save_many([(start_idx, end_idx, data)])
+
+    def save_many(self, rows):
+        """
+        在一个事务中批量保存窗口数据。
+
+        :param rows: (start_idx, end_idx, data) 的可迭代对象
+        """
+        # 将 DataFrame 序列化为二进制，追加到数据文件后一次写入索引
+        conn = self.connection
+        blobs = [(s, e, pickle.dumps(d, protocol=5)) for s, e, d in rows]
+        with self._write_lock:
+            # 其他进程可能同时写入同一个缓存，追加数据和提交索引期间持有文件锁
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                # 其他进程可能已追加数据，定位到文件末尾后再记录偏移
+                self._writer.seek(0, os.SEEK_END)
+                index = []
+                for s, e, blob in blobs:
+                    # 当前数据文件超过上限时换到新文件
+                    if self._writer.tell() >= DATA_FILE_MAX_BYTES:
+                        self._writer.close()
+                        self._file_no += 1
+                        self._writer = open(self._data_path(self._file_no), 'ab')
+                        self._writer.seek(0, os.SEEK_END)
+                    index.append((s, e, self._file_no, self._writer.tell(), len(blob)))
+                    self._writer.write(blob)
+                # 数据先落到文件，索引可见时数据一定可读
+                self._writer.flush()
+                with conn:
+                    conn.executemany(self._insert_sql, index)
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
 
     def load(self, start_idx, end_idx):
         """
@@ -59,13 +168,12 @@ class CacheFeatureSQLite:
         :param end_idx: 窗口结束索引
         :return: 缓存的 DataFrame 数据，如果不存在返回 None
         """
-        query = f"SELECT `{self.f_d}` FROM `{self.table}` WHERE `{self.f_s}` = ? AND `{self.f_e}` = ?;"
+        query = f"SELECT `{self.f_n}`, `{self.f_o}`, `{self.f_l}` FROM `{self.table}` WHERE `{self.f_s}` = ? AND `{self.f_e}` = ?;"
         # print(f"sql:{query}")
         cursor = self.connection.execute(query, (start_idx, end_idx))
         row = cursor.fetchone()
         if row:
-            data_blob = row[0]
-            return pickle.loads(data_blob)
+            return self._read(*row)
         return None
 
     def exists(self, start_idx, end_idx):
@@ -81,22 +189,70 @@ class CacheFeatureSQLite:
         cursor = self.connection.execute(query, (start_idx, end_idx))
         return cursor.fetchone() is not None
 
+    def _select_many(self, fields, ranges):
+        """
+        按 (start_idx, end_idx) 批量查询，每批一条 IN (VALUES ...) 语句。
+
+        :param fields: 查询的字段
+        :param ranges: (start_idx, end_idx) 列表
+        :return: 查询到的所有行
+        """
+        rows = []
+        columns = ", ".join(f"`{f}`" for f in fields)
+        for i in range(0, len(ranges), IN_BATCH_SIZE):
+            batch = ranges[i:i + IN_BATCH_SIZE]
+            values = ", ".join(["(?, ?)"] * len(batch))
+            # 相同批量大小的语句文本相同，由连接的语句缓存复用
+            query = f"SELECT {columns} FROM `{self.table}` WHERE (`{self.f_s}`, `{self.f_e}`) IN (VALUES {values});"
+            params = [x for r in batch for x in r]
+            rows.extend(self.connection.execute(query, params).fetchall())
+        return rows
+
+    def exists_many(self, ranges):
+        """
+        批量检查窗口是否已存在缓存。
+
+        :param ranges: (start_idx, end_idx) 列表
+        :return: 已存在的 (start_idx, end_idx) 集合
+        """
+        return set(self._select_many((self.f_s, self.f_e), ranges))
+
+    def load_many(self, ranges):
+        """
+        批量加载窗口数据，未命中的窗口不在返回结果中。
+
+        :param ranges: (start_idx, end_idx) 列表
+        :return: {(start_idx, end_idx): 缓存的数据}
+        """
+        fields = (self.f_s, self.f_e, self.f_n, self.f_o, self.f_l)
+        return {(s, e): self._read(n, o, l) for s, e, n, o, l in self._select_many(fields, ranges)}
+
     def delete(self, start_idx, end_idx):
         """
-        删除指定窗口的数据。
+        删除指定窗口的数据（只删除索引，数据文件中的内容不回收）。
 
         :param start_idx: 窗口起始索引
         :param end_idx: 窗口结束索引
         """
         query = f"DELETE FROM `{self.table}` WHERE `{self.f_s}` = ? AND `{self.f_e}` = ?;"
         # print(f"sql:{query}")
-        self.connection.execute(query, (start_idx, end_idx))
-        self.connection.commit()
+        with self._write_lock:
+            self.connection.execute(query, (start_idx, end_idx))
+            self.connection.commit()
         print(f"窗口 {start_idx}-{end_idx} 的数据已从缓存中删除")
 
     def close(self):
         """
-        关闭数据库连接。
+        关闭所有线程的数据库连接和数据文件。
         """
-        self.connection.close()
+        with self._write_lock:
+            self._writer.close()
+            self._lock_file.close()
+        with self._maps_lock:
+            self._maps.clear()
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
         print("数据库连接已关闭")
@@ -14,26 +14,38 @@ df = pd.DataFrame(data)
 window_size = 512
 cache = CacheFeatureSQLite(db_path="cache/normalized_data.db", window_size=window_size)
 
-# 滑动窗口归一化和缓存
-for start_idx in range(0, len(df), window_size):
-    end_idx = min(start_idx + window_size, len(df))  # 防止越界
+# 所有窗口的起止索引
+ranges = [(start_idx, min(start_idx + window_size, len(df))) for start_idx in range(0, len(df), window_size)]
+# 一次加载所有已缓存的窗口
+cached = cache.load_many(ranges)
+
+# 整表按窗口分块一次归一化（最小-最大归一化示例），末尾不足一个窗口的部分用 NaN 补齐
+arr = df.to_numpy(dtype=np.float32)
+pad = len(ranges) * window_size - len(arr)
+blocks = np.pad(arr, ((0, pad), (0, 0)), constant_values=np.nan).reshape(-1, window_size, arr.shape[1])
+mn = np.nanmin(blocks, axis=1, keepdims=True)
+mx = np.nanmax(blocks, axis=1, keepdims=True)
+normalized = (blocks - mn) / (mx - mn + 1e-12)
 
+# 滑动窗口归一化和缓存
+pending = []
+for i, (start_idx, end_idx) in enumerate(ranges):
     # 检查缓存是否已存在
-    if cache.exists(start_idx, end_idx):
-        normalized_window = cache.load(start_idx, end_idx)
-    else:
-        # 提取当前窗口数据
-        window_data = df.iloc[start_idx:end_idx]
+    normalized_window = cached.get((start_idx, end_idx))
+    if normalized_window is None:
+        normalized_window = pd.DataFrame(normalized[i, :end_idx - start_idx], columns=df.columns,
+                                         index=df.index[start_idx:end_idx])
 
-        # 归一化处理（最小-最大归一化示例）
-        normalized_window = (window_data - window_data.min()) / (window_data.max() - window_data.min())
-
-        # 添加到缓存中
-        cache.save(start_idx, end_idx, normalized_window)
+        # 未命中的窗口最后一次写入缓存
+        pending.append((start_idx, end_idx, normalized_window))
 
     # 使用归一化数据（这里仅打印示例）
     print(f"窗口 {start_idx} - {end_idx} 的归一化数据:")
     print(normalized_window.head())
 
+# 一次写入所有未命中的窗口
+if pending:
+    cache.save_many(pending)
+
 # 关闭数据库连接
 cache.close()
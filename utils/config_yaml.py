@@ -2,12 +2,59 @@
 配置管理模块
 """
 
+import copy
 import os
 import yaml
 from dotenv import load_dotenv
 from typing import Any, Dict, Optional
 from . import singleton
 
+# libyaml 的 C 加载器，未编译 libyaml 时退回纯 Python 加载器
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# 已解析的配置文件: 路径 -> (修改时间ns, 文件大小, 解析结果)
+_YAML_CACHE: Dict[str, tuple] = {}
+
+
+def _load_yaml_cached(path: str) -> Any:
+    """
+    读取并解析 YAML 文件，文件未修改（修改时间与大小不变）时直接使用缓存的解析结果
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        解析结果的副本（调用方可以修改）
+    """
+    st = os.stat(path)
+    cached = _YAML_CACHE.get(path)
+    if cached is None or cached[0] != st.st_mtime_ns or cached[1] != st.st_size:
+        # 以二进制读取，由 libyaml 直接解码字节
+        with open(path, 'rb') as f:
+            cached = (st.st_mtime_ns, st.st_size, yaml.load(f.read(), Loader=_YAML_LOADER))
+        _YAML_CACHE[path] = cached
+    # merge/replace 会修改配置，返回深拷贝保证缓存不被改动
+    return copy.deepcopy(cached[2])
+
+
+def _load_first_existing(kind: str, *paths: str) -> Any:
+    """
+    按顺序加载第一个存在的 YAML 文件，直接尝试读取而不是先判断文件是否存在
+
+    Args:
+        kind: 配置类型（base/custom），用于错误信息
+        paths: 候选文件路径
+
+    Returns:
+        解析结果的副本
+    """
+    for path in paths:
+        try:
+            return _load_yaml_cached(path)
+        except FileNotFoundError:
+            continue
+    raise FileNotFoundError(f"Config {kind} file not found: {paths[-1]}")
+
 
 @singleton
 class ConfigYaml:
@@ -26,51 +73,66 @@ class ConfigYaml:
 
         # 加载配置
         self._config: Dict[str, Any] = self.load()
+        # 点分路径 -> 配置值，get 只做一次字典查找
+        self._flat: Dict[str, Any] = _flatten(self._config)
 
     def reload(self):
         """重新加载配置"""
         self._config = self.load()
+        self._flat = _flatten(self._config)
 
     def load(self) -> Dict[str, Any]:
         """加载配置文件"""
         root = os.path.dirname(os.path.abspath(__file__))
         root = os.path.dirname(root)
-        base = os.path.join(root, self._path, f'{self._custom}.yaml')
-        if not os.path.exists(base):
-            base = os.path.join(root, self._path, f'base.yaml')
-            if not os.path.exists(base):
-                raise FileNotFoundError(f"Config base file not found: {base}")
-
-        custom = os.path.join(root, self._path, f'custom-{self._custom}.yaml')
-        if not os.path.exists(custom):
-            custom = os.path.join(root, self._path, f'custom-default.yaml')
-            if not os.path.exists(custom):
-                raise FileNotFoundError(f"Config custom file not found: {custom}")
-
-        with open(base, 'r', encoding='utf-8') as f:
-            baseC = yaml.safe_load(f)
-
-        with open(custom, 'r', encoding='utf-8') as f:
-            customC = yaml.safe_load(f)
-
-        config = merge(baseC, customC)
-        config = replace(config)
+        baseC = _load_first_existing(
+            'base',
+            os.path.join(root, self._path, f'{self._custom}.yaml'),
+            os.path.join(root, self._path, f'base.yaml'),
+        )
+        customC = _load_first_existing(
+            'custom',
+            os.path.join(root, self._path, f'custom-{self._custom}.yaml'),
+            os.path.join(root, self._path, f'custom-default.yaml'),
+        )
+
+        # baseC 是缓存的副本，直接原地合并
+        _merge_into(baseC, customC)
+        config = replace(baseC)
         return config
 
     def get(self, key: str, default: Any = None) -> Any:
-        """获取配置值"""
-        try:
-            value = self._config
-            for k in key.split('.'):
-                value = value[k]
-            return value
-        except (KeyError, TypeError):
-            return default
+        """获取配置值，key 为点分路径，如 binance.api_key"""
+        return self._flat.get(key, default)
 
     def all(self) -> Dict[str, Any]:
         """获取完整配置"""
         return self._config
 
+def _flatten(node: Dict[str, Any], prefix: str = '', out: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    把嵌套配置展开为 {点分路径: 值}，子字典本身也保留在其路径下
+
+    Args:
+        node: 配置字典
+        prefix: 当前路径前缀
+        out: 输出字典
+
+    Returns:
+        展开后的字典
+    """
+    if out is None:
+        out = {}
+    for key, value in node.items():
+        # 与按 '.' 切分逐级查找一致，只展开字符串键
+        if not isinstance(key, str):
+            continue
+        path = f"{prefix}{key}"
+        out[path] = value
+        if type(value) is dict:
+            _flatten(value, f"{path}.", out)
+    return out
+
 def replace(config: Dict[str, Any]) -> Dict[str, Any]:
     # 加载环境变量
     load_dotenv()
@@ -111,16 +173,34 @@ def merge(config1: Dict, config2: Dict) -> Dict:
     Returns:
         Dict: 合并后的配置
     """
-    merged = config1.copy()
-
-    for key, value in config2.items():
-        if (
-                key in merged and
-                isinstance(merged[key], dict) and
-                isinstance(value, dict)
-        ):
-            merged[key] = merge(merged[key], value)
-        else:
-            merged[key] = value
-
+    merged = copy.deepcopy(config1)
+    # 自定义配置为空或与基础配置是同一对象时，合并结果就是基础配置
+    if not config2 or config1 is config2:
+        return merged
+    _merge_into(merged, config2)
     return merged
+
+# 区分“键不存在”与“值为 None”
+_MISSING = object()
+
+def _merge_into(dst: Dict, src: Dict) -> None:
+    """
+    把 src 递归合并到 dst 中（原地修改 dst），目标键不存在或不是字典时直接赋值。
+    用显式栈代替递归，嵌套层级不再产生额外的函数调用
+
+    Args:
+        dst: 基础配置，调用方已持有其所有权
+        src: 自定义配置
+    """
+    stack = [(dst, src)]
+    while stack:
+        dst, src = stack.pop()
+        for key, value in src.items():
+            current = dst.get(key, _MISSING)
+            # 同一对象无需合并或赋值（键不存在时 current 为 _MISSING，不会误跳过 None 值）
+            if current is value:
+                continue
+            if type(current) is dict and type(value) is dict:
+                stack.append((current, value))
+            else:
+                dst[key] = value
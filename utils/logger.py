@@ -6,6 +6,7 @@
 - 日志格式化
 - 文件日志
 - 控制台日志
+- 后台线程异步输出
 - 日志级别管理
 
 使用示例：
@@ -23,10 +24,18 @@ logger.info('Starting trading...')
   - 提供统一的日志接口
 """
 
+import atexit
 import logging
+import logging.handlers
+import queue
 from datetime import datetime
 import os
 
+# 日志格式不使用线程/进程信息，创建日志记录时跳过这些字段的采集
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+
 class Logger:
     """日志管理类"""
     
@@ -65,13 +74,21 @@ class Logger:
         
         # 日志格式
         formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            '{asctime} - {name} - {levelname} - {message}', style='{'
         )
         file_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)
         
+        # 调用方只把日志放入队列，由后台线程写文件和控制台
+        log_queue = queue.Queue(-1)
+        listener = logging.handlers.QueueListener(
+            log_queue, file_handler, console_handler, respect_handler_level=True
+        )
+        listener.start()
+        # 退出时停止监听，处理完队列中剩余的日志
+        atexit.register(listener.stop)
+        
         # 添加处理器
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
         
         return logger
@@ -9,10 +9,16 @@
 - API请求
 """
 
-import json
+import copy
+import functools
+import logging
+import os
+import threading
 import time
 from typing import Optional, Union, Dict, List, Any, Tuple
 
+import orjson
+
 from utils.logger import Logger
 
 logger = Logger.get_logger()
@@ -29,15 +35,24 @@ def singleton(cls):
         cls: 类
 
     Returns:
-        function: 获取实例的函数
+        function: 获取实例的函数，get_instance.instance() 返回已创建的实例（未创建时为 None）
     """
-    instances = {}
+    # 单元素列表保存实例：实例已存在时只需一次局部读取；首次创建加锁，避免多线程重复构造
+    slot = [None]
+    lock = threading.Lock()
 
     def get_instance(*args, **kwargs):
-        if cls not in instances:
-            instances[cls] = cls(*args, **kwargs)
-        return instances[cls]
-
+        instance = slot[0]
+        if instance is not None:
+            return instance
+        with lock:
+            if slot[0] is None:
+                slot[0] = cls(*args, **kwargs)
+        return slot[0]
+
+    # 保留类名与文档；不合并类的 __dict__，以免把方法拷到函数上
+    functools.update_wrapper(get_instance, cls, updated=())
+    get_instance.instance = lambda: slot[0]
     return get_instance
 
 
@@ -90,42 +105,53 @@ def retry(
         Any: 函数返回值
     """
 
-    def wrapper(*args, **kwargs):
-        retries = 0
-        cur_delay = delay
+    # 每次重试的等待时间在装饰时一次算好
+    delays = tuple(delay * backoff**i for i in range(max_retries))
+    last = max_retries - 1
+    name = func.__name__
 
-        while retries < max_retries:
+    def wrapper(*args, **kwargs):
+        for i, cur_delay in enumerate(delays):
             try:
                 return func(*args, **kwargs)
             except exceptions as e:
-                retries += 1
-                if retries == max_retries:
-                    raise e
+                if i == last:
+                    raise
 
-                logger.warning(
-                    f"Retry {retries}/{max_retries} for {func.__name__} "
-                    f"after {cur_delay}s due to {str(e)}"
-                )
+                if logger.isEnabledFor(logging.WARNING):
+                    logger.warning(
+                        f"Retry {i + 1}/{max_retries} for {name} "
+                        f"after {cur_delay}s due to {str(e)}"
+                    )
 
                 time.sleep(cur_delay)
-                cur_delay *= backoff
 
     return wrapper
 
 
+# 已解析的 JSON 文件：路径 -> (修改时间, 大小, 解析结果)
+_JSON_CACHE: Dict[str, tuple] = {}
+
+
 def load_json(file_path: str) -> Dict:
     """
-    加载JSON文件
+    加载JSON文件，文件未修改（修改时间与大小不变）时直接返回缓存的解析结果
 
     Args:
         file_path: 文件路径
 
     Returns:
-        Dict: JSON数据
+        Dict: JSON数据的副本（调用方可以修改）
     """
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        st = os.stat(file_path)
+        cached = _JSON_CACHE.get(file_path)
+        if cached is None or cached[0] != st.st_mtime_ns or cached[1] != st.st_size:
+            with open(file_path, "rb") as f:
+                cached = (st.st_mtime_ns, st.st_size, orjson.loads(f.read()))
+            _JSON_CACHE[file_path] = cached
+        # 返回深拷贝保证缓存不被调用方改动
+        return copy.deepcopy(cached[2])
     except Exception as e:
         logger.error(f"Failed to load JSON file {file_path}: {e}")
         return {}
@@ -7,6 +7,8 @@ import json
 import time
 import glob
 from datetime import datetime, timedelta
+from functools import lru_cache
+from dateutil.relativedelta import relativedelta
 from typing import Optional, Union, Dict, List, Any, Tuple
 from utils.logger import Logger
 
@@ -39,7 +41,7 @@ def date_to_str(date: datetime.date) -> str:
         str: 日期字符串(YYYY-MM-DD)
     """
     try:
-        return date.strftime("%Y-%m-%d")
+        return f"{date.year:04d}-{date.month:02d}-{date.day:02d}"
     except Exception as e:
         logger.error(f"Failed to convert date to string: {e}")
         return ""
@@ -56,12 +58,36 @@ def str_to_date(date_str: str) -> datetime.date:
         datetime.date: 日期对象
     """
     try:
+        # 标准的 YYYY-MM-DD 走 C 实现的 fromisoformat，其他写法（如未补零）交给 strptime
+        if len(date_str) == 10 and date_str[4] == "-" and date_str[7] == "-":
+            return datetime.fromisoformat(date_str).date()
         return datetime.strptime(date_str, "%Y-%m-%d").date()
     except Exception as e:
         logger.error(f"Failed to convert string to date: {e}")
         return None
 
 
+def str_to_date_array(date_strs: Union[List[str], np.ndarray, pd.Series]) -> np.ndarray | None:
+    """
+    批量字符串转日期
+
+    Args:
+        date_strs: 日期字符串序列(YYYY-MM-DD)
+
+    Returns:
+        np.ndarray: datetime.date 对象数组
+    """
+    try:
+        return pd.to_datetime(np.asarray(date_strs), format="%Y-%m-%d", cache=True).date
+    except Exception as e:
+        logger.error(f"Failed to convert strings to dates: {e}")
+        return None
+
+
+# 时间戳单位与秒的换算倍数，未知单位按秒处理
+_UNIT_DIV: Dict[str, int] = {"s": 1, "ms": 1000, "us": 1000000, "ns": 1000000000}
+
+
 def timestamp_to_datetime(
     timestamp: Union[int, float], unit: str = "ms"
 ) -> datetime | None:
@@ -76,14 +102,7 @@ def timestamp_to_datetime(
         datetime: datetime对象
     """
     try:
-        if unit == "ms":
-            return datetime.fromtimestamp(timestamp / 1000)
-        elif unit == "us":
-            return datetime.fromtimestamp(timestamp / 1000000)
-        elif unit == "ns":
-            return datetime.fromtimestamp(timestamp / 1000000000)
-        else:
-            return datetime.fromtimestamp(timestamp)
+        return datetime.fromtimestamp(timestamp / _UNIT_DIV.get(unit, 1))
     except Exception as e:
         logger.error(f"Failed to convert timestamp to datetime: {e}")
         return None
@@ -101,15 +120,7 @@ def datetime_to_timestamp(dt: datetime, unit: str = "ms") -> int:
         int: 时间戳
     """
     try:
-        timestamp = int(dt.timestamp())
-        if unit == "ms":
-            return timestamp * 1000
-        elif unit == "us":
-            return timestamp * 1000000
-        elif unit == "ns":
-            return timestamp * 1000000000
-        else:
-            return timestamp
+        return int(dt.timestamp()) * _UNIT_DIV.get(unit, 1)
     except Exception as e:
         logger.error(f"Failed to convert datetime to timestamp: {e}")
         return 0
@@ -151,21 +162,33 @@ def interval_timestamps(
         if unit not in interval_map:
             raise ValueError(f"Invalid interval: {interval}")
 
-        # 生成时间戳
-        timestamps = []
-        current = start_time
-
-        while current <= end_time:
-            timestamps.append(datetime_to_timestamp(current))
-            kwargs = {interval_map[unit]: value}
-            current += timedelta(**kwargs)
-
-        return timestamps
+        # 月份长度不固定，按月逐个生成
+        if unit == "M":
+            timestamps = []
+            current = start_time
+            while current <= end_time:
+                timestamps.append(datetime_to_timestamp(current))
+                current = start_time + relativedelta(months=value * len(timestamps))
+            return timestamps
+
+        # 生成时间戳（步长与数量在循环外一次算好）
+        step = timedelta(**{interval_map[unit]: value})
+        count = (end_time - start_time) // step + 1 if end_time >= start_time else 0
+        if count == 0:
+            return []
+        # 本地时区无夏令时且区间首尾偏移一致时，时间戳是等差数列，一次向量运算生成
+        if not time.daylight and start_time.astimezone().utcoffset() == end_time.astimezone().utcoffset():
+            step_s = int(step.total_seconds())
+            base_s = datetime_to_timestamp(start_time, unit="s")
+            return ((base_s + np.arange(count, dtype=np.int64) * step_s) * 1000).tolist()
+        # 跨夏令时切换时逐个转换
+        return [datetime_to_timestamp(start_time + step * i) for i in range(count)]
     except Exception as e:
         logger.error(f"Failed to get interval timestamps: {e}")
         return []
 
 
+@lru_cache(maxsize=128)
 def parse_timeframe(timeframe: str) -> int:
     """
     解析时间周期